@@ -0,0 +1,62 @@
+"""Benchmark parse_test_results_json: json.load path vs streaming path.
+
+Builds a synthetic single-run report with benchmarks/generate.py and parses
+it once per mode in a fresh subprocess, so peak RSS is not shared
+between runs.
+
+    python benchmarks/bench_json_parser.py --tests 300000
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timezone
+from generate import build_suite, generate_run, write_json_report
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = """
+import resource, sys, time
+sys.path.insert(0, {root!r})
+from parsers import parse_test_results_json
+start = time.perf_counter()
+df = parse_test_results_json({path!r}, stream={stream})
+elapsed = time.perf_counter() - start
+peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print(f"{{elapsed:.3f}} {{peak_mb:.1f}} {{len(df)}}")
+"""
+
+
+def build_report(path, n_tests, seed=0):
+    """Write a test-results.json with a single run of n_tests tests"""
+    suite = build_suite(n_tests, seed=seed)
+    summary, tests = generate_run(suite, datetime(2026, 1, 1, tzinfo=timezone.utc), seed=seed)
+    write_json_report(path, summary, tests)
+
+
+def run_mode(path, stream):
+    code = CHILD.format(root=ROOT, path=path, stream=stream)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    elapsed, peak_mb, rows = out.stdout.split()
+    return float(elapsed), float(peak_mb), int(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tests", type=int, default=300000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "test-results.json")
+        build_report(path, args.tests)
+        size_mb = os.path.getsize(path) / 1024 / 1024
+        print(f"Report: {args.tests} tests, {size_mb:.1f} MB")
+        print(f"{'mode':<12}{'time (s)':>10}{'peak RSS (MB)':>16}")
+        for label, stream in (("json.load", False), ("streaming", True)):
+            elapsed, peak_mb, rows = run_mode(path, stream)
+            print(f"{label:<12}{elapsed:>10.2f}{peak_mb:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Memory report for the compact results schema (parsers.RESULT_SCHEMA).
+
+Builds a synthetic history of --runs copies of data/test-results-qa.json,
+each decoded separately so strings are not shared between runs (as when
+parsing real reports), and compares the frame the parsers produced before
+the schema (plain strings, float64, string timestamps) with the compact one.
+
+    python benchmarks/bench_schema.py --runs 1000
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from parsers import RESULT_COLUMNS, apply_result_schema, _module_from_file  # noqa: E402
+
+SAMPLE = os.path.join(ROOT, "data", "test-results-qa.json")
+
+
+def build_history(n_runs):
+    """Rows as the parsers built them before the compact schema"""
+    with open(SAMPLE, 'r', encoding='utf-8') as f:
+        text = f.read()
+    start = datetime(2026, 1, 1)
+    columns = {col: [] for col in RESULT_COLUMNS}
+    for i in range(n_runs):
+        data = json.loads(text)
+        start_time = (start + timedelta(minutes=30 * i)).isoformat() + "Z"
+        for t in data['tests']:
+            columns["suite"].append("Playwright")
+            columns["name"].append(t['title'])
+            columns["module"].append(_module_from_file(t['file']))
+            columns["status"].append(t['status'].capitalize())
+            columns["time"].append(t['duration'] / 1000)
+            columns["timestamp"].append(start_time)
+            columns["browser"].append("chromium")
+            columns["file"].append(t['file'])
+            columns["line"].append(t['line'])
+            columns["error_message"].append((t.get('error') or {}).get('message'))
+    return columns
+
+
+def report(label, df):
+    usage = df.memory_usage(deep=True, index=False)
+    print(f"\n{label}: {usage.sum() / 1024 / 1024:.1f} MB")
+    for col in df.columns:
+        print(f"  {col:<14}{str(df[col].dtype)[:24]:<26}{usage[col] / 1024 / 1024:>8.1f} MB")
+    return usage.sum()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=1000)
+    args = parser.parse_args()
+
+    columns = build_history(args.runs)
+    print(f"History: {args.runs} runs, {len(columns['name'])} rows")
+
+    legacy = report("Before (object columns)", pd.DataFrame(columns, dtype=object).astype({"time": "float64", "line": "int64"}))
+    compact = report("Compact schema", apply_result_schema(pd.DataFrame(columns)))
+    print(f"\nReduction: {legacy / compact:.1f}x ({(1 - compact / legacy) * 100:.0f}% less memory)")
+
+
+if __name__ == "__main__":
+    main()
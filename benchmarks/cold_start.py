@@ -0,0 +1,85 @@
+"""Time to first render of the main page in fresh processes.
+
+Every sample starts a new Python process, as a cold start does, and times
+everything from interpreter start until the first script run of the page
+finishes: imports, data loading, aggregation and chart building. Reported
+are the median and best of --runs samples, split into importing streamlit and running the page (its own
+imports included).
+
+    python benchmarks/cold_start.py --runs 5
+    python benchmarks/cold_start.py --runs 5 --fresh-store   # no store, no snapshot
+
+With --fresh-store the store is a temporary directory deleted before every
+sample, never data/store (the only copy of the ingested history), unless
+--store-dir names one explicitly.
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SAMPLE = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+imported = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=300).run()
+done = time.perf_counter()
+print(json.dumps({"import": imported - start, "render": done - imported, "errors": len(at.exception)}))
+"""
+
+
+def sample(app_path, store_dir):
+    env = {**os.environ, "PYTHONPATH": ROOT, "QA_STORE_DIR": store_dir}
+    out = subprocess.run([sys.executable, "-c", SAMPLE, app_path], cwd=ROOT, env=env,
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app", default=os.path.join(ROOT, "streamlit_app.py"), help="Page to render")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh processes to sample")
+    parser.add_argument("--store-dir", default=None,
+                        help="Store to use (default: data/store, or a temporary one with --fresh-store)")
+    parser.add_argument("--fresh-store", action="store_true",
+                        help="Delete the store before every sample (first start after a deploy)")
+    args = parser.parse_args()
+    temporary = args.store_dir is None and args.fresh_store
+    if temporary:
+        args.store_dir = tempfile.mkdtemp(prefix="qa-cold-start-")
+    elif args.store_dir is None:
+        args.store_dir = os.path.join(ROOT, "data", "store")
+
+    # One untimed run so that every timed sample finds the same store
+    if not args.fresh_store:
+        sample(args.app, args.store_dir)
+
+    samples = []
+    try:
+        for _ in range(args.runs):
+            if args.fresh_store:
+                shutil.rmtree(args.store_dir, ignore_errors=True)
+            samples.append(sample(args.app, args.store_dir))
+    finally:
+        if temporary:
+            shutil.rmtree(args.store_dir, ignore_errors=True)
+
+    print(f"{'':<10}{'median (s)':>12}{'best (s)':>10}")
+    for part in ("import", "render"):
+        values = [s[part] for s in samples]
+        print(f"{part:<10}{statistics.median(values):>12.3f}{min(values):>10.3f}")
+    totals = [s["import"] + s["render"] for s in samples]
+    print(f"{'total':<10}{statistics.median(totals):>12.3f}{min(totals):>10.3f}")
+    if any(s["errors"] for s in samples):
+        print("The page raised exceptions in some samples", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
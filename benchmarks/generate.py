@@ -0,0 +1,235 @@
+"""Synthetic Playwright report generator for benchmarks.
+
+Produces test-results JSON (the format written by the dropea-qa reporter)
+and Playwright JUnit XML with a configurable number of tests, runs,
+environments, failure rate and error payload size. Titles and spec files
+are derived from data/test-results-qa.json so reports look like real ones.
+
+    python benchmarks/generate.py --out /tmp/synthetic --tests 2000 --runs 500 --envs QA,DEV
+"""
+import argparse
+import heapq
+import json
+import os
+import random
+import re
+from datetime import datetime, timedelta, timezone
+from xml.sax.saxutils import quoteattr, escape
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE = os.path.join(ROOT, "data", "test-results-qa.json")
+
+ERROR_TEMPLATE = (
+    "Error: \x1b[2mexpect(\x1b[22m\x1b[31mlocator\x1b[39m\x1b[2m).\x1b[22m{matcher}\x1b[2m(\x1b[22m\x1b[2m)\x1b[22m failed\n\n"
+    "Locator:  getByRole('button', {{ name: /{target}/i }})\nExpected: {expected}\nReceived: {received}\n"
+    "Timeout:  {timeout}ms\n\nCall log:\n"
+)
+ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;]*m")
+ERROR_KINDS = [
+    ("toBeEnabled", "iniciar sesión", "enabled", "disabled"),
+    ("toBeVisible", "guardar", "visible", "hidden"),
+    ("toHaveText", "total", "\"12,00 €\"", "\"0,00 €\""),
+    ("toHaveURL", "pedidos", "/pedidos", "/login"),
+]
+
+
+def _sample_tests():
+    with open(SAMPLE, 'r', encoding='utf-8') as f:
+        return json.load(f)['tests']
+
+
+def build_suite(n_tests, failure_rate=0.05, flaky_share=0.1, seed=0):
+    """Test definitions: title, file, line, base duration and failure probability.
+
+    Most tests fail rarely; `flaky_share` of them fail intermittently and a
+    few are broken, so failures are spread the way real suites behave.
+    """
+    rng = random.Random(seed)
+    sample = _sample_tests()
+    suite = []
+    for i in range(n_tests):
+        template = sample[i % len(sample)]
+        copy = i // len(sample)
+        title = template['title'] if copy == 0 else f"{template['title']} [{copy}]"
+        roll = rng.random()
+        if roll < 0.01:
+            fail_p = 1.0
+        elif roll < 0.01 + flaky_share:
+            fail_p = min(1.0, failure_rate * 5)
+        else:
+            fail_p = failure_rate / 2
+        suite.append({
+            "title": title,
+            "file": template['file'],
+            "line": template['line'] + copy * 1000,
+            "duration": max(200.0, rng.lognormvariate(8.5, 0.9)),
+            "fail_p": fail_p,
+            "skip_p": 0.02 if rng.random() < 0.1 else 0.0,
+        })
+    return suite
+
+
+def _error_payload(rng, error_size, test):
+    matcher, target, expected, received = rng.choice(ERROR_KINDS)
+    message = ERROR_TEMPLATE.format(matcher=matcher, target=target, expected=expected,
+                                    received=received, timeout=rng.choice([5000, 10000, 30000]))
+    log_line = f"\x1b[2m  - waiting for getByRole('button', {{ name: /{target}/i }})\x1b[22m\n"
+    while len(message) < error_size // 2:
+        message += log_line
+    stack = message + f"\n    at {test['file']}:{test['line'] + 9}:{rng.randint(3, 40)}"
+    while len(stack) < error_size:
+        stack += f"\n    at Page.{rng.choice(['click', 'fill', 'goto'])} (node_modules/playwright-core/lib/client/page.js:{rng.randint(100, 900)}:21)"
+    return {"message": message, "stack": stack}
+
+
+def _schedule(tests, start_time, workers):
+    """Set startTime and parallelIndex the way Playwright runs the suite.
+
+    Setup projects (*.setup.js) run first on worker 0, one after another;
+    then each spec file runs whole on the first free worker. Returns the
+    wall-clock time in milliseconds.
+    """
+    ready = 0.0
+    by_file = {}
+    for t in tests:
+        if '.setup.' in t['file']:
+            t['startTime'], t['parallelIndex'] = ready, 0
+            ready += t['duration']
+        else:
+            by_file.setdefault(t['file'], []).append(t)
+    free = [(ready, w) for w in range(workers)]
+    for file_tests in by_file.values():
+        at, worker = heapq.heappop(free)
+        for t in file_tests:
+            t['startTime'], t['parallelIndex'] = at, worker
+            at += t['duration']
+        heapq.heappush(free, (at, worker))
+    for t in tests:
+        offset = timedelta(milliseconds=t['startTime'])
+        t['startTime'] = (start_time + offset).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+    return max(at for at, _ in free)
+
+
+def generate_run(suite, start_time, error_size=2000, seed=0, workers=4):
+    """One run of the suite: (summary, tests) in test-results.json format"""
+    rng = random.Random(seed)
+    tests = []
+    counts = {"passed": 0, "failed": 0, "skipped": 0}
+    for test in suite:
+        roll = rng.random()
+        if roll < test['skip_p']:
+            status, duration = "skipped", 0
+        elif roll < test['skip_p'] + test['fail_p']:
+            status, duration = "failed", test['duration'] * rng.uniform(1.0, 3.0)
+        else:
+            status, duration = "passed", test['duration'] * rng.uniform(0.8, 1.25)
+        counts[status] += 1
+        tests.append({
+            "title": test['title'],
+            "file": test['file'],
+            "line": test['line'],
+            "status": status,
+            "duration": round(duration, 3),
+            "error": _error_payload(rng, error_size, test) if status == "failed" else None
+        })
+
+    wall_ms = _schedule(tests, start_time, workers)
+    summary = {
+        "total": len(tests),
+        **counts,
+        "duration": round(wall_ms, 3),
+        "startTime": start_time.isoformat(timespec='milliseconds').replace('+00:00', 'Z'),
+        "endTime": (start_time + timedelta(milliseconds=wall_ms)).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+    }
+    return summary, tests
+
+
+def write_json_report(path, summary, tests):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"summary": summary, "tests": tests}, f, indent=2, ensure_ascii=False)
+
+
+def write_junit_report(path, summary, tests, browser="chromium"):
+    """Write a run as Playwright JUnit XML, one testsuite per spec file"""
+    by_file = {}
+    for t in tests:
+        by_file.setdefault(t['file'], []).append(t)
+    timestamp = summary['startTime'].rstrip('Z')
+
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write(f'<testsuites tests="{summary["total"]}" failures="{summary["failed"]}" '
+                f'skipped="{summary["skipped"]}" time="{summary["duration"] / 1000:.3f}">\n')
+        for file_path, file_tests in by_file.items():
+            name = file_path.replace('\\', '/').split('/')[-1]
+            f.write(f'<testsuite name={quoteattr(name)} timestamp="{timestamp}" hostname="{browser}" '
+                    f'tests="{len(file_tests)}" time="{sum(t["duration"] for t in file_tests) / 1000:.3f}">\n')
+            for t in file_tests:
+                f.write(f'<testcase name={quoteattr(t["title"])} classname={quoteattr(name)} '
+                        f'time="{t["duration"] / 1000:.3f}">')
+                if t['status'] == 'failed':
+                    # Like Playwright's reporter, strip ANSI colours: escape bytes are not valid XML
+                    stack = ANSI_ESCAPE.sub('', t['error']['stack'])
+                    message = stack.split('\n', 1)[0]
+                    f.write(f'<failure message={quoteattr(message)} type="FAILURE">{escape(stack)}</failure>')
+                elif t['status'] == 'skipped':
+                    f.write('<skipped/>')
+                f.write('</testcase>\n')
+            f.write('</testsuite>\n')
+        f.write('</testsuites>\n')
+
+
+def generate_history(out_dir, n_tests=500, n_runs=10, envs=("QA",), failure_rate=0.05,
+                     error_size=2000, formats=("json",), interval_minutes=60, seed=0, workers=4):
+    """Write n_runs reports per environment into out_dir.
+
+    Files are named run-{env}-{run:05d}.json / junit-{env}-{run:05d}.xml;
+    the latest run of each environment is also written as test-results-{env}.json
+    so out_dir can be used as a dashboard data directory. Returns the paths.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    suite = build_suite(n_tests, failure_rate, seed=seed)
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    paths = []
+    for env_index, env in enumerate(envs):
+        env_lower = env.lower()
+        for run in range(n_runs):
+            start_time = start + timedelta(minutes=interval_minutes * run + env_index)
+            summary, tests = generate_run(suite, start_time, error_size, seed=seed + run * 7919 + env_index,
+                                         workers=workers)
+            if "json" in formats:
+                path = os.path.join(out_dir, f"run-{env_lower}-{run:05d}.json")
+                write_json_report(path, summary, tests)
+                paths.append(path)
+            if "junit" in formats:
+                path = os.path.join(out_dir, f"junit-{env_lower}-{run:05d}.xml")
+                write_junit_report(path, summary, tests)
+                paths.append(path)
+        if "json" in formats:
+            write_json_report(os.path.join(out_dir, f"test-results-{env_lower}.json"), summary, tests)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--out", required=True, help="Output directory")
+    parser.add_argument("--tests", type=int, default=500, help="Tests per run")
+    parser.add_argument("--runs", type=int, default=10, help="Runs per environment")
+    parser.add_argument("--envs", default="QA", help="Comma-separated environments")
+    parser.add_argument("--failure-rate", type=float, default=0.05)
+    parser.add_argument("--error-size", type=int, default=2000, help="Bytes of error message + stack")
+    parser.add_argument("--format", choices=["json", "junit", "both"], default="json")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=4, help="Playwright workers to simulate")
+    args = parser.parse_args()
+
+    formats = ("json", "junit") if args.format == "both" else (args.format,)
+    envs = [e.strip().upper() for e in args.envs.split(",") if e.strip()]
+    paths = generate_history(args.out, args.tests, args.runs, envs, args.failure_rate,
+                             args.error_size, formats, seed=args.seed,
+                             workers=args.workers)
+    print(f"Wrote {len(paths)} reports ({args.tests * args.runs * len(envs)} test rows) to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
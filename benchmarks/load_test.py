@@ -0,0 +1,253 @@
+"""Concurrent-session load test against a running dashboard server.
+
+Starts the app with `streamlit run` (or targets --url) and opens --sessions
+websocket sessions the way browsers do, ramping them up over --ramp
+seconds. Each session renders a page, then reruns it --reruns times with a
+random think time in between, cycling through --pages. With --warmup the
+store and snapshot are built before the sessions arrive, as after a
+deploy that has already served one request. Reported are the
+latency percentiles of first renders and reruns, script errors, and the
+server's resident memory: idle, peak, and with every session still
+connected.
+
+    python benchmarks/load_test.py --sessions 40 --reruns 5
+    python benchmarks/load_test.py --sessions 40 --tests 20000 --warmup   # synthetic data, warm store
+    python benchmarks/load_test.py --sessions 40 --pages "",Flaky_Tests,Timeline
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def synthetic_app(app, n_tests, n_runs=5, envs=("QA", "DEV")):
+    """Copy of the app whose data/ holds generated reports of n_tests tests"""
+    sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+    from generate import generate_history
+    app_dir = tempfile.mkdtemp(prefix="qa-load-")
+    for name in os.listdir(ROOT):
+        if name.endswith(".py"):
+            shutil.copy(os.path.join(ROOT, name), app_dir)
+    shutil.copytree(os.path.join(ROOT, "pages"), os.path.join(app_dir, "pages"))
+    data_dir = os.path.join(app_dir, "data")
+    generate_history(data_dir, n_tests, n_runs, envs)
+    latest = sorted(f for f in os.listdir(data_dir) if f.startswith("test-results-"))[-1]
+    shutil.copy(os.path.join(data_dir, latest), os.path.join(data_dir, "test-results.json"))
+    for name in os.listdir(data_dir):
+        if name.startswith("run-"):
+            os.remove(os.path.join(data_dir, name))
+    return os.path.join(app_dir, os.path.basename(app)), app_dir
+
+
+def _rss_mb(pid):
+    """Resident memory of a process in MB (Linux /proc), or None"""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        return None
+    return None
+
+
+class RssSampler(threading.Thread):
+    """Samples a process's RSS in the background and keeps the peak"""
+
+    def __init__(self, pid, interval=0.1):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.peak = 0.0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            self.peak = max(self.peak, _rss_mb(self.pid) or 0.0)
+            time.sleep(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def start_server(app, port, env=None):
+    """Run the app headless on a port and wait until it answers its health check"""
+    cmd = [
+        sys.executable, "-m", "streamlit", "run", app, "--server.headless", "true",
+        "--server.port", str(port), "--server.enableXsrfProtection", "false",
+        "--browser.gatherUsageStats", "false"
+    ]
+    proc = subprocess.Popen(cmd, cwd=os.path.dirname(app), env={**os.environ, **(env or {})},
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/_stcore/health", timeout=1)
+            return proc
+        except OSError:
+            if proc.poll() is not None:
+                raise RuntimeError("streamlit exited before becoming healthy")
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("streamlit did not become healthy within 60s")
+
+
+async def _render(ws, page):
+    """Run a page in a session; (seconds until the script finished, error elements)"""
+    from streamlit.proto.BackMsg_pb2 import BackMsg
+    from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+    msg = BackMsg()
+    msg.rerun_script.query_string = ""
+    msg.rerun_script.page_name = page
+    start = time.perf_counter()
+    await ws.send(msg.SerializeToString())
+    errors = 0
+    while True:
+        forward = ForwardMsg()
+        forward.ParseFromString(await ws.recv())
+        kind = forward.WhichOneof('type')
+        if kind == 'delta' and forward.delta.WhichOneof('type') == 'new_element':
+            errors += forward.delta.new_element.WhichOneof('type') == 'exception'
+        elif kind == 'script_finished':
+            # 0 = finished successfully; anything else is a compile error or stop
+            return time.perf_counter() - start, errors + (forward.script_finished != 0)
+
+
+async def _session(url, index, args, results, done, release):
+    import websockets
+    rng = random.Random(index)
+    await asyncio.sleep(args.ramp * index / max(1, args.sessions))
+    async with websockets.connect(url, subprotocols=["streamlit"], max_size=None) as ws:
+        for rerun in range(args.reruns + 1):
+            page = args.pages[(index + rerun) % len(args.pages)]
+            seconds, errors = await _render(ws, page)
+            results["first" if rerun == 0 else "rerun"].append(seconds)
+            results["errors"] += errors
+            if rerun < args.reruns:
+                await asyncio.sleep(rng.uniform(0, 2 * args.think))
+        done.append(index)
+        # Stay connected until every session is done, so held memory is measured
+        await release.wait()
+
+
+async def warm_up(url, pages):
+    import websockets
+    async with websockets.connect(url, subprotocols=["streamlit"], max_size=None) as ws:
+        # The first render waits for the refresher's first snapshot
+        for page in pages:
+            await _render(ws, page)
+
+
+async def run_sessions(url, args, on_all_done):
+    results = {"first": [], "rerun": [], "errors": 0}
+    done = []
+    release = asyncio.Event()
+
+    async def watch():
+        while len(done) < args.sessions:
+            await asyncio.sleep(0.1)
+        await asyncio.sleep(1.0)
+        on_all_done()
+        release.set()
+
+    sessions = [_session(url, i, args, results, done, release) for i in range(args.sessions)]
+    await asyncio.gather(watch(), *sessions)
+    return results
+
+
+def percentiles(values):
+    if not values:
+        return {}
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return {"n": len(values), "p50": p50, "p90": p90, "p99": p99, "max": max(values)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=30, help="Concurrent sessions")
+    parser.add_argument("--reruns", type=int, default=5, help="Reruns per session after the first render")
+    parser.add_argument("--think", type=float, default=0.5, help="Mean seconds between reruns")
+    parser.add_argument("--ramp", type=float, default=2.0, help="Seconds over which sessions connect")
+    parser.add_argument("--pages", default="", help="Comma-separated page names ('' is the main page)")
+    parser.add_argument("--app", default=os.path.join(ROOT, "streamlit_app.py"))
+    parser.add_argument("--tests", type=int, default=0,
+                        help="Serve a copy of the app with synthetic reports of this many tests (0: data/)")
+    parser.add_argument("--port", type=int, default=8599)
+    parser.add_argument("--url", default=None, help="Websocket of a running server (no memory figures)")
+    parser.add_argument("--warmup", action="store_true",
+                        help="Render every page once before the sessions start (store and snapshot built)")
+    parser.add_argument("--out", default=None, help="Also write the results as JSON")
+    args = parser.parse_args()
+    args.pages = args.pages.split(",")
+
+    app, app_dir = synthetic_app(args.app, args.tests) if args.tests and not args.url else (args.app, None)
+    proc = None if args.url else start_server(app, args.port)
+    url = args.url or f"ws://127.0.0.1:{args.port}/_stcore/stream"
+    memory = {}
+    try:
+        sampler = None
+        if args.warmup:
+            asyncio.run(warm_up(url, args.pages))
+        if proc is not None:
+            time.sleep(1.0)
+            memory["idle_mb"] = _rss_mb(proc.pid)
+            sampler = RssSampler(proc.pid)
+            sampler.start()
+
+        def on_all_done():
+            if proc is not None:
+                memory["held_mb"] = _rss_mb(proc.pid)
+
+        start = time.perf_counter()
+        results = asyncio.run(run_sessions(url, args, on_all_done))
+        elapsed = time.perf_counter() - start
+        if sampler is not None:
+            sampler.stop()
+            memory["peak_mb"] = sampler.peak
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=30)
+        if app_dir is not None:
+            shutil.rmtree(app_dir, ignore_errors=True)
+
+    report = {
+        "sessions": args.sessions,
+        "reruns": args.reruns,
+        "pages": args.pages,
+        "elapsed": elapsed,
+        "errors": results["errors"],
+        "first_render": percentiles(results["first"]),
+        "rerun": percentiles(results["rerun"]),
+        **memory
+    }
+    print(f"{args.sessions} sessions x {args.reruns + 1} renders in {elapsed:.1f}s, {results['errors']} errors")
+    print(f"{'':<14}{'n':>6}{'p50 (s)':>10}{'p90 (s)':>10}{'p99 (s)':>10}{'max (s)':>10}")
+    for label, key in (("first render", "first_render"), ("rerun", "rerun")):
+        stats = report[key]
+        if stats:
+            print(f"{label:<14}{stats['n']:>6}{stats['p50']:>10.3f}{stats['p90']:>10.3f}"
+                  f"{stats['p99']:>10.3f}{stats['max']:>10.3f}")
+    if memory:
+        per_session = (memory["held_mb"] - memory["idle_mb"]) / args.sessions
+        print(f"RSS: idle {memory['idle_mb']:.0f} MB, peak {memory['peak_mb']:.0f} MB, "
+              f"held {memory['held_mb']:.0f} MB ({per_session:.1f} MB per session)")
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
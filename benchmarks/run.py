@@ -0,0 +1,295 @@
+"""Benchmark suite for the dashboard data path.
+
+Generates a synthetic history with benchmarks/generate.py, then times each
+stage the app goes through: parsing (JSON and JUnit), get_all_test_results,
+ingestion into the run store, history loading, calculate_metrics, the
+metric cube, sidebar filtering, chart data preparation, flakiness,
+run-to-run diffs, duration regressions, execution timelines and trends.
+
+Every stage is timed best-of --repeat without instrumentation, then run
+once more under tracemalloc for its peak Python/numpy allocation. Results
+are written to benchmarks/results/<label>.json; pass --compare with an
+earlier results file to see the change per stage.
+
+    python benchmarks/run.py --tests 2000 --runs 25 --envs QA,DEV --label baseline
+    python benchmarks/run.py --tests 2000 --runs 25 --envs QA,DEV --compare benchmarks/results/baseline.json
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import pandas as pd
+from generate import generate_history
+from parsers import (
+    parse_test_results_json, parse_playwright_junit, get_all_test_results,
+    calculate_metrics, _parse_cache
+)
+from store import ingest_report, load_history
+from cube import (
+    build_cube, filter_mask, slice_cube, cube_metrics, cube_status_counts,
+    cube_module_status, cube_module_time, histogram_bins
+)
+from flaky import compute_flakiness
+from diff import diff_runs
+from regressions import regressions_from_store
+from timeline import build_schedule, analyze_schedule, idle_gaps, lane_segments
+from trends import trends_from_store, module_trends_from_store, module_series, downsample, RUN_METRICS
+
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+
+
+def _git_revision():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError):
+        return float('nan')
+
+
+def build_stages(data_dir, run_files):
+    """Ordered (name, setup, stage) triples.
+
+    setup runs before every repetition and is not timed; stage receives its
+    result and returns the number of rows it processed. State produced by
+    one stage for the next ones is kept in `state`.
+    """
+    state = {}
+    json_report = os.path.join(data_dir, "test-results.json")
+    junit_report = os.path.join(data_dir, "junit-report.xml")
+
+    def parse_json(_):
+        return len(parse_test_results_json(json_report))
+
+    def parse_junit(_):
+        return len(parse_playwright_junit(junit_report))
+
+    def all_results(_):
+        state['latest'] = get_all_test_results(data_dir)
+        return len(state['latest'])
+
+    def fresh_store():
+        store_dir = os.path.join(data_dir, "store")
+        shutil.rmtree(store_dir, ignore_errors=True)
+        _parse_cache.clear()
+        return store_dir
+
+    def ingest(store_dir):
+        for path in run_files:
+            env = os.path.basename(path).split('-')[1].upper()
+            ingest_report(path, store_dir, env=env)
+        state['store_dir'] = store_dir
+        return len(run_files)
+
+    def history(_):
+        state['history'] = load_history(state['store_dir'])
+        return len(state['history'])
+
+    def metrics(_):
+        calculate_metrics(state['history'])
+        return len(state['history'])
+
+    def cube(_):
+        state['cube'] = build_cube(state['history'])
+        return len(state['history'])
+
+    def filtering(_):
+        df, cube = state['history'], state['cube']
+        failed = cube[cube['status'] == 'Failed']
+        module = failed['module'].iloc[0] if len(failed) else None
+        filters = {"status": "Failed", "module": module, "suite": None}
+        filtered = df[filter_mask(df, **filters)]
+        cube_metrics(slice_cube(cube, **filters))
+        return len(filtered)
+
+    def charts(_):
+        cube = state['cube']
+        cube_status_counts(cube)
+        cube_module_status(cube)
+        cube_module_time(cube)
+        histogram_bins(state['history']['time'].to_numpy(), nbins=20)
+        return len(cube)
+
+    def flakiness(_):
+        return len(compute_flakiness(state['history']))
+
+    def run_diffs(_):
+        # Every run against the previous one of its environment, as at ingestion
+        history = state['history']
+        for _, env_rows in history.groupby('env', observed=True, sort=False):
+            runs = [rows for _, rows in env_rows.groupby('run_id', observed=True, sort=True)]
+            for before, after in zip(runs, runs[1:]):
+                diff_runs(before, after)
+        return len(history)
+
+    def duration_regressions(_):
+        # Detection over the per-environment duration windows kept at ingestion
+        return len(regressions_from_store(state['store_dir']))
+
+    def timelines(_):
+        # Every run's schedule as reported, and as rebuilt from durations alone
+        history = state['history']
+        for _, rows in history.groupby('run_id', observed=True, sort=False):
+            for df in (rows, rows.assign(start_offset=np.nan)):
+                schedule, _ = build_schedule(df, rows['start_offset'].max() + 1)
+                analyze_schedule(schedule)
+                idle_gaps(schedule)
+                lane_segments(schedule)
+        return len(history)
+
+    def trends(_):
+        # Every series of every environment, downsampled to a budget below its length
+        series = trends_from_store(state['store_dir'])
+        points = 0
+        for env, rows in series.groupby('env', sort=False):
+            budget = max(3, len(rows) // 4)
+            for metric in RUN_METRICS:
+                points += len(downsample(rows, metric, budget))
+            modules = module_trends_from_store(state['store_dir'], env)
+            per_module = module_series(modules, modules['module'].unique())
+            for _, module_rows in per_module.groupby('module', sort=False):
+                points += len(downsample(module_rows, 'avg_time', budget))
+        return points
+
+    def cold():
+        _parse_cache.clear()
+
+    return [
+        ("parse_json", cold, parse_json),
+        ("parse_junit", cold, parse_junit),
+        ("get_all_test_results", cold, all_results),
+        ("ingest", fresh_store, ingest),
+        ("load_history", cold, history),
+        ("calculate_metrics", None, metrics),
+        ("build_cube", None, cube),
+        ("filtering", None, filtering),
+        ("chart_data", None, charts),
+        ("flakiness", None, flakiness),
+        ("run_diffs", None, run_diffs),
+        ("regressions", cold, duration_regressions),
+        ("timelines", None, timelines),
+        ("trends", cold, trends),
+    ]
+
+
+def run_stage(setup, stage, repeat):
+    """Best wall time of `repeat` runs, then one traced run for peak memory"""
+    best = float('inf')
+    rows = 0
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        gc.collect()
+        start = time.perf_counter()
+        rows = stage(arg)
+        best = min(best, time.perf_counter() - start)
+
+    arg = setup() if setup else None
+    gc.collect()
+    tracemalloc.start()
+    stage(arg)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"seconds": round(best, 4), "rows": int(rows), "peak_mb": round(peak / 1024 / 1024, 1),
+            "rss_mb": round(_rss_mb(), 1)}
+
+
+def compare(results, baseline):
+    print(f"\n{'stage':<22}{'base (s)':>10}{'now (s)':>10}{'ratio':>8}{'base MB':>10}{'now MB':>10}")
+    for name, now in results['stages'].items():
+        base = baseline['stages'].get(name)
+        if base is None:
+            print(f"{name:<22}{'-':>10}{now['seconds']:>10.3f}{'-':>8}{'-':>10}{now['peak_mb']:>10.1f}")
+            continue
+        ratio = now['seconds'] / base['seconds'] if base['seconds'] else float('nan')
+        print(f"{name:<22}{base['seconds']:>10.3f}{now['seconds']:>10.3f}{ratio:>8.2f}"
+              f"{base['peak_mb']:>10.1f}{now['peak_mb']:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tests", type=int, default=2000, help="Tests per run")
+    parser.add_argument("--runs", type=int, default=25, help="Runs per environment")
+    parser.add_argument("--envs", default="QA,DEV", help="Comma-separated environments")
+    parser.add_argument("--failure-rate", type=float, default=0.05)
+    parser.add_argument("--error-size", type=int, default=2000, help="Bytes of error message + stack")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed repetitions per stage")
+    parser.add_argument("--stages", default="", help="Comma-separated subset of stages to run")
+    parser.add_argument("--label", default=None, help="Results file name (default: git revision)")
+    parser.add_argument("--compare", default=None, help="Earlier results JSON to compare against")
+    args = parser.parse_args()
+
+    envs = [e.strip().upper() for e in args.envs.split(",") if e.strip()]
+    label = args.label or _git_revision()
+    config = {
+        "tests": args.tests, "runs": args.runs, "envs": envs,
+        "failure_rate": args.failure_rate, "error_size": args.error_size, "repeat": args.repeat
+    }
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        print(f"Generating {args.tests * args.runs * len(envs)} rows "
+              f"({args.tests} tests x {args.runs} runs x {len(envs)} envs)...")
+        paths = generate_history(data_dir, args.tests, args.runs, envs, args.failure_rate,
+                                 args.error_size, formats=("json",))
+        # Latest run of the first environment doubles as the app's main report
+        shutil.copy(os.path.join(data_dir, f"test-results-{envs[0].lower()}.json"),
+                    os.path.join(data_dir, "test-results.json"))
+        generate_history(os.path.join(data_dir, "junit"), args.tests, 1, envs[:1], args.failure_rate,
+                         args.error_size, formats=("junit",))
+        shutil.move(os.path.join(data_dir, "junit", f"junit-{envs[0].lower()}-00000.xml"),
+                    os.path.join(data_dir, "junit-report.xml"))
+
+        selected = {s.strip() for s in args.stages.split(",") if s.strip()}
+        stages = {}
+        print(f"{'stage':<22}{'time (s)':>10}{'rows':>10}{'peak MB':>10}{'RSS MB':>10}")
+        for name, setup, stage in build_stages(data_dir, paths):
+            if selected and name not in selected:
+                continue
+            result = run_stage(setup, stage, args.repeat)
+            stages[name] = result
+            print(f"{name:<22}{result['seconds']:>10.3f}{result['rows']:>10}"
+                  f"{result['peak_mb']:>10.1f}{result['rss_mb']:>10.1f}")
+
+    results = {
+        "label": label,
+        "revision": _git_revision(),
+        "date": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "config": config,
+        "stages": stages
+    }
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    out_path = os.path.join(RESULTS_DIR, f"{label}.json")
+    with open(out_path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {out_path}")
+
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            compare(results, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+from cube import (
+    cube_status_counts, cube_module_status, cube_module_time, histogram_bins
+)
+
+
+# plotly is imported inside each builder, so importing this module stays
+# cheap; figures are built at render time from the cube, once per filter
+# selection and process (see cube.get_view).
+STATUS_COLORS = {
+    'Passed': '#2ca02c',
+    'Failed': '#d62728',
+    'Skipped': '#ff7f0e',
+    'Error': '#8B0000'
+}
+
+
+def status_chart(cube):
+    import plotly.express as px
+    status_counts = cube_status_counts(cube)
+    fig = px.pie(
+        values=status_counts.values,
+        names=status_counts.index,
+        title="Distribucion por Estado",
+        color_discrete_map=STATUS_COLORS
+    )
+    fig.update_traces(textposition='inside', textinfo='percent+label')
+    return fig
+
+
+def modules_chart(cube):
+    import plotly.express as px
+    fig = px.bar(
+        cube_module_status(cube),
+        x='module',
+        y='count',
+        color='status',
+        title="Tests por Modulo",
+        color_discrete_map=STATUS_COLORS
+    )
+    fig.update_layout(xaxis_tickangle=-45)
+    return fig
+
+
+def histogram_chart(times):
+    """Duration histogram, binned here so the figure carries 20 bars, not every test duration"""
+    import plotly.graph_objects as go
+    time_bins = histogram_bins(times, nbins=20)
+    fig = go.Figure(go.Bar(
+        x=(time_bins['start'] + time_bins['end']) / 2,
+        y=time_bins['count'],
+        width=time_bins['end'] - time_bins['start'],
+        customdata=time_bins[['start', 'end']],
+        hovertemplate="%{customdata[0]:.1f}s - %{customdata[1]:.1f}s<br>%{y} tests<extra></extra>"
+    ))
+    fig.update_layout(
+        title="Distribucion de Tiempos de Ejecucion",
+        xaxis_title='Tiempo (segundos)',
+        yaxis_title='Numero de Tests',
+        bargap=0
+    )
+    return fig
+
+
+def module_time_chart(cube):
+    """Mean duration of the 10 slowest modules; None with fewer than two modules"""
+    import plotly.express as px
+    avg_time = cube_module_time(cube)
+    if len(avg_time) <= 1:
+        return None
+    avg_time = avg_time.sort_values('time', ascending=False).head(10)
+    fig = px.bar(
+        avg_time,
+        x='module',
+        y='time',
+        error_y='time_std',
+        title="Tiempo Promedio por Modulo (Top 10)",
+        labels={'time': 'Tiempo Promedio (s)'}
+    )
+    fig.update_layout(xaxis_tickangle=-45)
+    return fig
@@ -0,0 +1,216 @@
+import pandas as pd
+import numpy as np
+import threading
+import weakref
+from collections import OrderedDict
+from sketches import PERCENTILES, group_digests, merge_digests
+
+
+CUBE_DIMENSIONS = ["suite", "status", "browser", "module", "environment", "tags"]
+CUBE_MEASURES = ["count", "time_sum", "time_sumsq", "time_max", "sketch"]
+
+ALL = 'Todos'
+
+_cubes = {}
+
+# Results derived from a cube per filter selection (see get_view)
+VIEW_CACHE_SIZE = 64
+_views = {}
+_views_lock = threading.Lock()
+
+
+def build_cube(df):
+    """Aggregate test rows over CUBE_DIMENSIONS.
+
+    Each cell holds the row count, the sum, sum of squares and max of the
+    duration, and a TDigest of the durations. That is enough to answer
+    counts, means, standard deviations and percentiles for any combination
+    of dimension filters.
+    """
+    if df.empty:
+        return pd.DataFrame(columns=CUBE_DIMENSIONS + CUBE_MEASURES)
+
+    time = df['time'].astype('float64')
+    frame = pd.DataFrame({
+        "suite": df['suite'],
+        "status": df['status'],
+        "browser": df['browser'] if 'browser' in df.columns else 'unknown',
+        "module": df['module'],
+        "environment": df['env'] if 'env' in df.columns else '',
+        "tags": df['tags'] if 'tags' in df.columns else '',
+        "time": time,
+        "time_sq": time * time
+    })
+    grouped = frame.groupby(CUBE_DIMENSIONS, observed=True, sort=False)
+    cube = grouped.agg(
+        count=('time', 'size'), time_sum=('time', 'sum'),
+        time_sumsq=('time_sq', 'sum'), time_max=('time', 'max')
+    ).reset_index()
+    # ngroup numbers cells in the same first-seen order as the aggregation
+    digests = group_digests(grouped.ngroup().to_numpy(), time.to_numpy())
+    cube['sketch'] = [digests[i] for i in range(len(cube))]
+    return cube
+
+
+def get_cube(df):
+    """Cube for df, built once per DataFrame object.
+
+    Loaded frames are shared and never mutated, so the object identity is a
+    data version: a new file version produces a new frame and a new cube.
+    """
+    key = id(df)
+    cube = _cubes.get(key)
+    if cube is None:
+        cube = build_cube(df)
+        _cubes[key] = cube
+        weakref.finalize(df, _cubes.pop, key, None)
+    return cube
+
+
+def _freeze(value):
+    if isinstance(value, (list, tuple, set)):
+        return tuple(sorted(map(str, value)))
+    return value
+
+
+def get_view(cube, filters, name, compute):
+    """compute() for one filter selection of a cube, computed once per process.
+
+    Sessions looking at the same data and filters share the result (a
+    sliced cube, metrics, a figure) instead of each building its own. Up
+    to VIEW_CACHE_SIZE selections are kept per cube, least recently used
+    first out. Results are shared and must not be mutated.
+    """
+    key = id(cube)
+    view_key = (name, tuple(sorted((k, _freeze(v)) for k, v in filters.items())))
+    with _views_lock:
+        views = _views.get(key)
+        if views is None:
+            views = _views[key] = OrderedDict()
+            weakref.finalize(cube, _views.pop, key, None)
+        if view_key in views:
+            views.move_to_end(view_key)
+            return views[view_key]
+    value = compute()
+    with _views_lock:
+        views[view_key] = value
+        while len(views) > VIEW_CACHE_SIZE:
+            views.popitem(last=False)
+    return value
+
+
+def dimension_values(cube, dimension):
+    """Distinct values of a dimension, in first-seen order"""
+    return list(pd.unique(cube[dimension]))
+
+
+def filter_mask(frame, **filters):
+    """Boolean mask for dimension filters.
+
+    A filter value is a single value or a list of accepted values; None or
+    'Todos' means no filter.
+    """
+    mask = np.ones(len(frame), dtype=bool)
+    for dimension, value in filters.items():
+        if value is None or (isinstance(value, str) and value == ALL) or dimension not in frame.columns:
+            continue
+        if isinstance(value, (list, tuple, set)):
+            mask &= frame[dimension].isin(value).to_numpy()
+        else:
+            mask &= (frame[dimension] == value).to_numpy()
+    return mask
+
+
+def slice_cube(cube, **filters):
+    """Cells of the cube matching the given dimension filters"""
+    return cube[filter_mask(cube, **filters)]
+
+
+def cube_metrics(cube):
+    """Same metrics as parsers.calculate_metrics, answered from cube cells"""
+    total_tests = int(cube['count'].sum())
+    if total_tests == 0:
+        return {
+            "total_tests": 0,
+            "passed": 0,
+            "failed": 0,
+            "skipped": 0,
+            "pass_rate": 0,
+            "avg_execution_time": 0,
+            "total_execution_time": 0,
+            **{f"p{p}_execution_time": 0 for p in PERCENTILES},
+            "max_execution_time": 0
+        }
+
+    by_status = cube.groupby('status', observed=True)['count'].sum()
+    passed = int(by_status.get('Passed', 0))
+    total_execution_time = float(cube['time_sum'].sum())
+    digest = merge_digests(cube['sketch'])
+
+    return {
+        "total_tests": total_tests,
+        "passed": passed,
+        "failed": int(by_status.get('Failed', 0)),
+        "skipped": int(by_status.get('Skipped', 0)),
+        "pass_rate": round(passed / total_tests * 100, 2),
+        "avg_execution_time": round(total_execution_time / total_tests, 2),
+        "total_execution_time": round(total_execution_time, 2),
+        **{f"p{p}_execution_time": round(digest.quantile(p / 100), 2) for p in PERCENTILES},
+        "max_execution_time": round(float(cube['time_max'].max()), 2)
+    }
+
+
+def cube_status_counts(cube):
+    """Row count per status, largest first"""
+    counts = cube.groupby('status', observed=True)['count'].sum()
+    return counts[counts > 0].sort_values(ascending=False)
+
+
+def cube_module_status(cube):
+    """Row count per (module, status) for the stacked module chart"""
+    return (
+        cube.groupby(['module', 'status'], observed=True)['count'].sum()
+        .reset_index()
+    )
+
+
+def cube_module_time(cube):
+    """Mean, standard deviation and max duration per module"""
+    grouped = cube.groupby('module', observed=True).agg(
+        count=('count', 'sum'), time_sum=('time_sum', 'sum'),
+        time_sumsq=('time_sumsq', 'sum'), time_max=('time_max', 'max')
+    )
+    mean = grouped['time_sum'] / grouped['count']
+    variance = (grouped['time_sumsq'] / grouped['count'] - mean ** 2).clip(lower=0)
+    return pd.DataFrame({
+        "module": grouped.index,
+        "count": grouped['count'].to_numpy(),
+        "time": mean.to_numpy(),
+        "time_std": np.sqrt(variance).to_numpy(),
+        "time_max": grouped['time_max'].to_numpy()
+    })
+
+
+def histogram_bins(values, nbins=20):
+    """Equal-width histogram of values as start, end and count per bin.
+
+    Binning here keeps chart payloads at one bar per bin instead of one
+    value per test row.
+    """
+    values = np.asarray(values, dtype='float64')
+    values = values[~np.isnan(values)]
+    if len(values) == 0:
+        return pd.DataFrame(columns=["start", "end", "count"])
+    counts, edges = np.histogram(values, bins=nbins)
+    return pd.DataFrame({"start": edges[:-1], "end": edges[1:], "count": counts})
+
+
+def cube_module_percentiles(cube, percentiles=PERCENTILES):
+    """Duration percentiles per module, merged from the cell digests"""
+    columns = ["module", "count"] + [f"p{p}" for p in percentiles] + ["max"]
+    rows = []
+    for module, cells in cube.groupby('module', observed=True, sort=False):
+        digest = merge_digests(cells['sketch'])
+        rows.append({"module": module, "count": int(cells['count'].sum()),
+                     **digest.percentiles(percentiles), "max": float(cells['time_max'].max())})
+    return pd.DataFrame(rows, columns=columns).sort_values(f"p{percentiles[-1]}", ascending=False, ignore_index=True)
@@ -0,0 +1,110 @@
+import pandas as pd
+import numpy as np
+from flaky import IDENTITY_COLUMNS, FAILED_STATUSES
+
+
+DIFF_COLUMNS = [
+    "change", "name", "module", "file", "line",
+    "status_before", "status_after", "time_before", "time_after", "time_ratio"
+]
+# Order in which changes are listed
+CHANGE_TYPES = ["newly_failing", "fixed", "slower", "added", "removed"]
+
+# A test is "slower" when it took SLOWER_RATIO times as long and at least
+# SLOWER_MIN_DELTA seconds more; the floor keeps sub-second noise out.
+SLOWER_RATIO = 1.5
+SLOWER_MIN_DELTA = 1.0
+
+
+def identity_hashes(df):
+    """64-bit hash of each row's test identity (file, line, name), comparable across frames"""
+    return pd.util.hash_pandas_object(df[IDENTITY_COLUMNS], index=False).to_numpy()
+
+
+def _latest_per_test(df):
+    """Row positions keeping one result per test identity (the last, e.g. after retries)"""
+    hashes = identity_hashes(df)
+    keep = ~pd.Index(hashes).duplicated(keep='last')
+    return np.flatnonzero(keep), hashes[keep]
+
+
+def _rows(df, positions, change, status_before=None, status_after=None, time_before=None, time_after=None):
+    base = df.iloc[positions]
+    n = len(positions)
+    missing = np.full(n, np.nan)
+    frame = pd.DataFrame({
+        "change": change,
+        "name": base['name'].astype(str).to_numpy(),
+        "module": base['module'].astype(str).to_numpy(),
+        "file": base['file'].astype(str).to_numpy(),
+        "line": base['line'].to_numpy(),
+        "status_before": status_before if status_before is not None else np.full(n, None),
+        "status_after": status_after if status_after is not None else np.full(n, None),
+        "time_before": time_before if time_before is not None else missing,
+        "time_after": time_after if time_after is not None else missing,
+    })
+    frame['time_ratio'] = frame['time_after'] / frame['time_before'].where(frame['time_before'] > 0)
+    return frame
+
+
+def diff_runs(before, after, slower_ratio=SLOWER_RATIO, min_delta=SLOWER_MIN_DELTA):
+    """Tests that changed between two runs (or two environments).
+
+    Tests are matched by identity with a hash join: the identities of
+    `before` are hashed into an index once and every row of `after` probes
+    it, so a diff costs two linear passes rather than a multi-key merge.
+    Returns one row per change: newly_failing, fixed (failed before, passed
+    now), slower, added and removed.
+    """
+    if before.empty and after.empty:
+        return pd.DataFrame(columns=DIFF_COLUMNS)
+
+    before_rows, before_hashes = _latest_per_test(before)
+    after_rows, after_hashes = _latest_per_test(after)
+    positions = pd.Index(before_hashes).get_indexer(after_hashes)
+    matched = positions >= 0
+
+    # Matched pairs: positions into before / after frames
+    pair_before = before_rows[positions[matched]]
+    pair_after = after_rows[matched]
+    status_before = before['status'].to_numpy()[pair_before].astype(object)
+    status_after = after['status'].to_numpy()[pair_after].astype(object)
+    time_before = before['time'].to_numpy(dtype='float64')[pair_before]
+    time_after = after['time'].to_numpy(dtype='float64')[pair_after]
+    failed_before = np.isin(status_before, FAILED_STATUSES)
+    failed_after = np.isin(status_after, FAILED_STATUSES)
+
+    changes = []
+    for change, selected in (
+        ("newly_failing", failed_after & ~failed_before),
+        ("fixed", failed_before & (status_after == 'Passed')),
+        ("slower", (status_before == 'Passed') & (status_after == 'Passed')
+         & (time_after >= time_before * slower_ratio) & (time_after - time_before >= min_delta)),
+    ):
+        if selected.any():
+            changes.append(_rows(after, pair_after[selected], change, status_before[selected],
+                                 status_after[selected], time_before[selected], time_after[selected]))
+
+    added = after_rows[~matched]
+    if len(added):
+        changes.append(_rows(after, added, "added", status_after=after['status'].to_numpy()[added].astype(object),
+                             time_after=after['time'].to_numpy(dtype='float64')[added]))
+
+    seen = np.zeros(len(before_rows), dtype=bool)
+    seen[positions[matched]] = True
+    removed = before_rows[~seen]
+    if len(removed):
+        changes.append(_rows(before, removed, "removed", status_before=before['status'].to_numpy()[removed].astype(object),
+                             time_before=before['time'].to_numpy(dtype='float64')[removed]))
+
+    if not changes:
+        return pd.DataFrame(columns=DIFF_COLUMNS)
+    diff = pd.concat(changes, ignore_index=True)
+    order = diff['change'].map({c: i for i, c in enumerate(CHANGE_TYPES)})
+    return diff.iloc[np.lexsort((diff['name'].to_numpy(), order.to_numpy()))].reset_index(drop=True)[DIFF_COLUMNS]
+
+
+def diff_counts(diff):
+    """Number of tests per change type, including zeros"""
+    counts = diff['change'].value_counts() if not diff.empty else pd.Series(dtype='int64')
+    return {change: int(counts.get(change, 0)) for change in CHANGE_TYPES}
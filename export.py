@@ -0,0 +1,101 @@
+import io
+import pandas as pd
+import tempfile
+from parsers import RESULT_COLUMNS, RESULT_SCHEMA
+from store import iter_history
+
+
+# Download formats: label -> (file extension, MIME type)
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet")
+}
+EXPORT_CHUNK_ROWS = 50_000
+HISTORY_EXPORT_COLUMNS = RESULT_COLUMNS + ["tags", "run_id", "env"]
+
+
+def frame_chunks(df, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Consecutive row slices of df"""
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
+
+
+def _plain_strings(chunk):
+    """Categoricals as plain strings, so chunks with different categories share one Arrow schema"""
+    categorical = [c for c in chunk.columns if isinstance(chunk[c].dtype, pd.CategoricalDtype)]
+    return chunk.astype({c: object for c in categorical}) if categorical else chunk
+
+
+def _arrow_schema(chunk):
+    """Arrow schema for the export, from RESULT_SCHEMA where it applies.
+
+    Taking types from the schema rather than the first chunk keeps a column
+    that is empty in one run (read back as all-NaN) from fixing the type.
+    """
+    import pyarrow as pa
+    fields = []
+    for col in chunk.columns:
+        dtype = RESULT_SCHEMA.get(col, chunk[col].dtype)
+        if dtype == "category" or isinstance(dtype, pd.CategoricalDtype) or dtype == object:
+            fields.append(pa.field(col, pa.string()))
+        elif str(dtype).startswith("datetime64"):
+            fields.append(pa.field(col, pa.timestamp('ns', tz='UTC')))
+        else:
+            fields.append(pa.field(col, pa.from_numpy_dtype(pd.api.types.pandas_dtype(dtype))))
+    return pa.schema(fields)
+
+
+def write_csv(chunks, f):
+    """Write chunks as one CSV to a binary file, header from the first chunk"""
+    header = True
+    for chunk in chunks:
+        f.write(chunk.to_csv(index=False, header=header).encode('utf-8'))
+        header = False
+
+
+def write_parquet(chunks, f):
+    """Write chunks as row groups of one Parquet file"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    writer = None
+    try:
+        for chunk in chunks:
+            if writer is None:
+                writer = pq.ParquetWriter(f, _arrow_schema(chunk))
+            table = pa.Table.from_pandas(_plain_strings(chunk), schema=writer.schema, preserve_index=False)
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def export_chunks(chunks, fmt="CSV"):
+    """Encode chunks in an export format into an open temporary file.
+
+    Chunks are written one at a time, so the working memory is one chunk;
+    the file is returned at its start for the caller (st.download_button)
+    to read, and is deleted once closed.
+    """
+    write = write_parquet if fmt == "Parquet" else write_csv
+    # Unbuffered file handed back, since Streamlit takes raw files but not buffered read-write ones
+    raw = tempfile.TemporaryFile(buffering=0)
+    try:
+        f = io.BufferedWriter(raw)
+        write(chunks, f)
+        f.flush()
+        f.detach()
+    except BaseException:
+        raw.close()
+        raise
+    raw.seek(0)
+    return raw
+
+
+def export_frame(df, fmt="CSV"):
+    """df as an export file, encoded chunk by chunk"""
+    return export_chunks(frame_chunks(df), fmt)
+
+
+def export_history(store_dir, fmt="CSV", envs=None, since=None, until=None):
+    """Every stored run in one file, read run by run instead of as a single frame"""
+    return export_chunks(iter_history(store_dir, envs, since, until, columns=HISTORY_EXPORT_COLUMNS), fmt)
@@ -0,0 +1,336 @@
+import pandas as pd
+import numpy as np
+import os
+from parsers import cached_parse
+from store import flaky_state_paths, RUNS_FILE
+
+
+IDENTITY_COLUMNS = ["file", "line", "name"]
+HISTORY_COLUMNS = IDENTITY_COLUMNS + ["module", "status", "env", "timestamp"]
+FAILED_STATUSES = ["Failed", "Error"]
+
+# Per-environment aggregate kept by the store, one row per test: counts
+# over every run, the last RECENT_OUTCOMES results as bits (bit 0 = latest,
+# set = failed) for the recent windows, and the run it is up to date with.
+RECENT_OUTCOMES = 63
+FLAKY_STATE_COLUMNS = IDENTITY_COLUMNS + [
+    "module", "runs", "failures", "flips", "transitions", "recent", "recent_runs",
+    "last_failed", "last_status", "last_seen", "through"
+]
+
+FLAKY_COLUMNS = [
+    "name", "module", "file", "line", "envs", "runs", "failures", "flips",
+    "failure_rate", "flip_rate", "flakiness_score", "last_status", "last_seen"
+]
+
+
+def identity_codes(df):
+    """Integer code per test identity (file, line, name), without a multi-key groupby"""
+    key = np.zeros(len(df), dtype='int64')
+    for col in IDENTITY_COLUMNS:
+        values = df[col]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            codes, size = values.cat.codes.to_numpy(), len(values.cat.categories)
+        else:
+            codes, uniques = pd.factorize(values)
+            size = len(uniques)
+        key = key * (size + 1) + codes
+    return pd.factorize(key)[0]
+
+
+def compute_flakiness(history, windows=(10, 50)):
+    """Rank tests by flakiness over run history.
+
+    A test is identified by (file, line, name). Runs are ordered per test
+    and environment; a flip is a change between passing and failing in
+    consecutive runs of the same environment, so interleaving QA and DEV
+    runs does not count as flakiness. Skipped results are ignored.
+
+    Returns one row per test with failure rate overall and over the last
+    `windows` runs of each environment, flip rate, and a 0-100 flakiness
+    score that blends the overall and recent flip rates. A test that always
+    fails scores 0: it is broken, not flaky.
+    """
+    history = history[~history['status'].isin(['Skipped'])]
+    if history.empty:
+        return pd.DataFrame(columns=FLAKY_COLUMNS + [f"failure_rate_last_{w}" for w in windows])
+
+    identity = identity_codes(history)
+    env_codes, env_names = pd.factorize(history['env'])
+    timestamps = history['timestamp'].values.view('int64')
+    failed = history['status'].isin(FAILED_STATUSES).to_numpy()
+
+    # Store history comes back in run order already; stable integer sorts on
+    # top of a time order are much cheaper than a three-key lexsort
+    if np.all(timestamps[1:] >= timestamps[:-1]):
+        by_time = np.arange(len(timestamps))
+    else:
+        by_time = np.argsort(timestamps, kind='stable')
+    seq_key = (identity.astype('int64') * len(env_names) + env_codes)[by_time]
+    order = by_time[np.argsort(seq_key, kind='stable')]
+    # Latest row per test across environments, for labels and last status
+    last_order = by_time[np.argsort(identity[by_time], kind='stable')]
+
+    identity = identity[order]
+    env_codes = env_codes[order]
+    failed = failed[order]
+
+    n_tests = identity.max() + 1
+    n = len(identity)
+
+    # Consecutive rows of the same (test, environment) sequence
+    same_seq = np.zeros(n, dtype=bool)
+    same_seq[1:] = (identity[1:] == identity[:-1]) & (env_codes[1:] == env_codes[:-1])
+    flip = np.zeros(n, dtype=bool)
+    flip[1:] = same_seq[1:] & (failed[1:] != failed[:-1])
+
+    runs = np.bincount(identity, minlength=n_tests)
+    failures = np.bincount(identity, weights=failed, minlength=n_tests)
+    flips = np.bincount(identity, weights=flip, minlength=n_tests)
+    transitions = np.bincount(identity, weights=same_seq, minlength=n_tests)
+
+    # Position of each row counted from the end of its sequence (0 = latest run)
+    seq_id = np.cumsum(~same_seq) - 1
+    seq_end = np.cumsum(np.bincount(seq_id)) - 1
+    from_end = seq_end[seq_id] - np.arange(n)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        failure_rate = failures / runs
+        flip_rate = np.where(transitions > 0, flips / transitions, 0.0)
+
+        # Transitions inside the most recent window of each sequence
+        recent = from_end < windows[0] - 1
+        recent_flips = np.bincount(identity[recent], weights=flip[recent], minlength=n_tests)
+        recent_transitions = np.bincount(identity[recent], weights=same_seq[recent], minlength=n_tests)
+        recent_flip_rate = np.where(recent_transitions > 0, recent_flips / recent_transitions, 0.0)
+
+        window_rates = {}
+        for w in windows:
+            in_window = from_end < w
+            window_runs = np.bincount(identity[in_window], minlength=n_tests)
+            window_failures = np.bincount(identity[in_window], weights=failed[in_window], minlength=n_tests)
+            window_rates[f"failure_rate_last_{w}"] = np.round(window_failures / window_runs * 100, 2)
+
+    is_last = np.ones(n, dtype=bool)
+    is_last[:-1] = identity[1:] != identity[:-1]
+    last_rows = history.iloc[last_order[is_last]]
+
+    env_seen = np.zeros((n_tests, len(env_names)), dtype=bool)
+    env_seen[identity, env_codes] = True
+    env_labels = np.array(env_names, dtype=object)
+    envs = [", ".join(sorted(env_labels[seen])) for seen in env_seen]
+
+    result = pd.DataFrame({
+        "name": last_rows['name'].to_numpy(),
+        "module": last_rows['module'].to_numpy(),
+        "file": last_rows['file'].to_numpy(),
+        "line": last_rows['line'].to_numpy(),
+        "envs": envs,
+        "runs": runs,
+        "failures": failures.astype(int),
+        "flips": flips.astype(int),
+        "failure_rate": np.round(failure_rate * 100, 2),
+        "flip_rate": np.round(flip_rate * 100, 2),
+        "flakiness_score": np.round((0.5 * flip_rate + 0.5 * recent_flip_rate) * 100, 1),
+        "last_status": last_rows['status'].to_numpy(),
+        "last_seen": last_rows['timestamp'].array,
+        **window_rates
+    })
+    return result.sort_values(['flakiness_score', 'flips', 'name'], ascending=[False, False, True], ignore_index=True)
+
+
+def _popcount(values):
+    """Set bits of each uint64"""
+    values = np.ascontiguousarray(values, dtype='uint64')
+    return np.unpackbits(values.view(np.uint8)).reshape(len(values), 64).sum(axis=1)
+
+
+def _low_bits(count):
+    """uint64 masks of the lowest count bits (count <= 63)"""
+    return (np.uint64(1) << count.astype('uint64')) - np.uint64(1)
+
+
+def append_flaky_run(state, run_id, df):
+    """Flakiness state with a newer run of the same environment folded in.
+
+    Repeated results of a test within the run count in timestamp order.
+    Tests missing from the run keep their counts.
+    """
+    if state is None:
+        state = pd.DataFrame(columns=FLAKY_STATE_COLUMNS)
+    rows = df.loc[df['status'] != 'Skipped', HISTORY_COLUMNS[:-2] + ['timestamp']]
+    if rows.empty:
+        return state.assign(through=run_id)[FLAKY_STATE_COLUMNS]
+
+    rows = rows.iloc[np.argsort(rows['timestamp'].values.view('int64'), kind='stable')]
+    keys = identity_codes(rows)
+    order = np.argsort(keys, kind='stable')
+    rows, keys = rows.iloc[order], keys[order]
+    failed = rows['status'].isin(FAILED_STATUSES).to_numpy()
+
+    # Results of one test are consecutive; `first` and `last` index each test's
+    n = len(keys)
+    first = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    last = np.r_[first[1:], n] - 1
+    counts = last - first + 1
+    flip = np.zeros(n, dtype=bool)
+    flip[1:] = (keys[1:] == keys[:-1]) & (failed[1:] != failed[:-1])
+    from_end = np.repeat(last, counts) - np.arange(n)
+    bits = np.where(from_end < RECENT_OUTCOMES,
+                    failed.astype('uint64') << np.minimum(from_end, RECENT_OUTCOMES).astype('uint64'), np.uint64(0))
+    latest = rows.iloc[last]
+
+    # One code per test of the state or the run
+    labels = pd.concat([
+        state[IDENTITY_COLUMNS].astype({"file": object, "name": object}),
+        pd.DataFrame({
+            "file": latest['file'].astype(str).to_numpy(dtype=object),
+            "line": latest['line'].to_numpy(dtype='int64'),
+            "name": latest['name'].astype(str).to_numpy(dtype=object)
+        })
+    ], ignore_index=True)
+    codes = identity_codes(labels)
+    old, new = codes[:len(state)], codes[len(state):]
+    m = codes.max() + 1
+
+    def spread(old_values, new_values, fill, dtype):
+        out = np.full(m, fill, dtype=dtype)
+        out[old] = old_values
+        out[new] = new_values
+        return out
+
+    def prior(column, fill, dtype):
+        out = np.full(m, fill, dtype=dtype)
+        out[old] = state[column].to_numpy(dtype=dtype)
+        return out
+
+    seen = np.zeros(m, dtype=bool)
+    seen[new] = True
+    before = np.zeros(m, dtype=bool)
+    before[old] = True
+    runs = np.zeros(m, dtype='int64')
+    runs[new] = counts
+    run_bits = np.zeros(m, dtype='uint64')
+    run_bits[new] = np.bitwise_or.reduceat(bits, first)
+    run_failures = np.zeros(m, dtype='int64')
+    run_failures[new] = np.add.reduceat(failed.astype('int64'), first)
+    run_flips = np.zeros(m, dtype='int64')
+    run_flips[new] = np.add.reduceat(flip.astype('int64'), first)
+    first_failed = np.zeros(m, dtype=bool)
+    first_failed[new] = failed[first]
+    last_failed = prior('last_failed', False, bool)
+
+    recent = prior('recent', 0, 'int64').astype('uint64') << np.minimum(runs, RECENT_OUTCOMES).astype('uint64')
+    recent = (recent | run_bits) & _low_bits(np.full(m, RECENT_OUTCOMES))
+    last_seen = pd.Series(pd.NaT, index=np.arange(m), dtype=latest['timestamp'].dtype)
+    last_seen.iloc[old] = pd.to_datetime(state['last_seen'], utc=True).to_numpy()
+    last_seen.iloc[new] = latest['timestamp'].to_numpy()
+
+    state = pd.DataFrame({
+        "file": spread(labels['file'].to_numpy()[:len(old)], labels['file'].to_numpy()[len(old):], None, object),
+        "line": spread(labels['line'].to_numpy()[:len(old)], labels['line'].to_numpy()[len(old):], 0, 'int64'),
+        "name": spread(labels['name'].to_numpy()[:len(old)], labels['name'].to_numpy()[len(old):], None, object),
+        "module": spread(state['module'].to_numpy(dtype=object), latest['module'].astype(str).to_numpy(dtype=object),
+                         None, object),
+        "runs": prior('runs', 0, 'int64') + runs,
+        "failures": prior('failures', 0, 'int64') + run_failures,
+        "flips": prior('flips', 0, 'int64') + run_flips + (seen & before & (last_failed != first_failed)),
+        "transitions": prior('transitions', 0, 'int64') + np.where(seen, runs - 1 + before, 0),
+        "recent": recent.astype('int64'),
+        "recent_runs": np.minimum(prior('recent_runs', 0, 'int64') + runs, RECENT_OUTCOMES),
+        "last_failed": spread(state['last_failed'].to_numpy(dtype=bool), failed[last], False, bool),
+        "last_status": spread(state['last_status'].to_numpy(dtype=object),
+                              latest['status'].astype(str).to_numpy(dtype=object), None, object),
+        "last_seen": last_seen.array,
+        "through": run_id
+    })
+    return state[FLAKY_STATE_COLUMNS]
+
+
+def build_flaky_state(runs):
+    """Flakiness state from (run_id, df) pairs of one environment in start time order"""
+    state = None
+    for run_id, df in runs:
+        state = append_flaky_run(state, run_id, df)
+    return state if state is not None else pd.DataFrame(columns=FLAKY_STATE_COLUMNS)
+
+
+def rank_flakiness(states, windows=(10, 50)):
+    """Flakiness ranking (as compute_flakiness) from the states of each environment.
+
+    `states` maps an environment to its state; its cost depends on the
+    number of tests, not on the number of runs behind the counts.
+    """
+    if max(windows) > RECENT_OUTCOMES:
+        raise ValueError(f"Windows longer than {RECENT_OUTCOMES} runs are not kept in the state")
+    frames = [state.assign(env=env) for env, state in states.items() if len(state)]
+    if not frames:
+        return compute_flakiness(pd.DataFrame(columns=HISTORY_COLUMNS), windows)
+    state = pd.concat(frames, ignore_index=True)
+
+    identity = identity_codes(state)
+    n_tests = identity.max() + 1
+    recent = state['recent'].to_numpy(dtype='int64').astype('uint64')
+    recent_runs = state['recent_runs'].to_numpy(dtype='int64')
+
+    runs = np.bincount(identity, weights=state['runs'], minlength=n_tests)
+    failures = np.bincount(identity, weights=state['failures'], minlength=n_tests)
+    flips = np.bincount(identity, weights=state['flips'], minlength=n_tests)
+    transitions = np.bincount(identity, weights=state['transitions'], minlength=n_tests)
+
+    # Transitions between the last windows[0] results of each environment
+    recent_steps = np.clip(np.minimum(recent_runs, windows[0]) - 1, 0, None)
+    recent_flips = np.bincount(identity, minlength=n_tests,
+                               weights=_popcount((recent ^ (recent >> np.uint64(1))) & _low_bits(recent_steps)))
+    recent_transitions = np.bincount(identity, weights=recent_steps, minlength=n_tests)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        failure_rate = failures / runs
+        flip_rate = np.where(transitions > 0, flips / transitions, 0.0)
+        recent_flip_rate = np.where(recent_transitions > 0, recent_flips / recent_transitions, 0.0)
+
+        window_rates = {}
+        for w in windows:
+            window_runs = np.minimum(recent_runs, w)
+            window_failures = _popcount(recent & _low_bits(window_runs))
+            window_rates[f"failure_rate_last_{w}"] = np.round(
+                np.bincount(identity, weights=window_failures, minlength=n_tests)
+                / np.bincount(identity, weights=window_runs, minlength=n_tests) * 100, 2
+            )
+
+    # Latest result per test across environments, for labels and last status
+    by_seen = np.lexsort((state['last_seen'].values.view('int64'), identity))
+    is_last = np.ones(len(by_seen), dtype=bool)
+    is_last[:-1] = identity[by_seen][1:] != identity[by_seen][:-1]
+    last_rows = state.iloc[by_seen[is_last]]
+    envs = state.groupby(identity)['env'].agg(lambda e: ", ".join(sorted(set(e))))
+
+    result = pd.DataFrame({
+        "name": last_rows['name'].to_numpy(),
+        "module": last_rows['module'].to_numpy(),
+        "file": last_rows['file'].to_numpy(),
+        "line": last_rows['line'].to_numpy(),
+        "envs": envs.to_numpy(),
+        "runs": runs.astype(int),
+        "failures": failures.astype(int),
+        "flips": flips.astype(int),
+        "failure_rate": np.round(failure_rate * 100, 2),
+        "flip_rate": np.round(flip_rate * 100, 2),
+        "flakiness_score": np.round((0.5 * flip_rate + 0.5 * recent_flip_rate) * 100, 1),
+        "last_status": last_rows['last_status'].to_numpy(),
+        "last_seen": last_rows['last_seen'].array,
+        **window_rates
+    })
+    return result.sort_values(['flakiness_score', 'flips', 'name'], ascending=[False, False, True], ignore_index=True)
+
+
+def flakiness_from_store(store_dir, windows=(10, 50)):
+    """Flakiness ranking from the per-environment states the store updates at ingestion"""
+    runs_path = os.path.join(store_dir, RUNS_FILE)
+    if not os.path.exists(runs_path):
+        return rank_flakiness({}, windows)
+
+    def compute(path):
+        return rank_flakiness({env: pd.read_parquet(p) for env, p in flaky_state_paths(store_dir).items()}, windows)
+
+    return cached_parse(runs_path, compute, key=f"flaky.rank_flakiness{windows}")
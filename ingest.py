@@ -0,0 +1,269 @@
+"""Ingestion entry point for Playwright reports (CLI and local HTTP endpoint).
+
+Replaces copying reports into data/ and pushing to git. An uploaded JSON or
+JUnit report is validated, converted once into the run store and, when it
+is the newest run of its environment, published under the name the
+dashboard reads (test-results-{env}.json, test-results.json or
+junit-report.xml). Running sessions pick it up on their next rerun, with
+no redeploy. Writers take the store lock, so parallel CI jobs can upload
+at the same time.
+
+    python ingest.py file test-results.json --env QA
+    python ingest.py serve --port 8502
+    curl --data-binary @test-results.json "http://localhost:8502/ingest?env=QA"
+"""
+import argparse
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import xml.etree.ElementTree as ET
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+from parsers import load_test_results_summary, _JsonReader
+from store import (
+    get_store_dir, ingest_report, record_source, store_lock, load_runs, run_stamp, DEFAULT_ENV
+)
+from snapshot import write_snapshot
+
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+INCOMING_DIR = "incoming"
+ENV_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,32}$")
+MAX_UPLOAD_BYTES = int(os.environ.get("QA_INGEST_MAX_BYTES", 512 * 1024 * 1024))
+# Shared secret for uploads; when unset the endpoint accepts any local client
+TOKEN_ENV = "QA_INGEST_TOKEN"
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class ReportError(ValueError):
+    """An upload that is not a usable Playwright report"""
+
+
+def detect_format(path):
+    """'json' or 'junit' from the first non-blank byte of a report"""
+    with open(path, 'rb') as f:
+        head = f.read(4096).lstrip(b'\xef\xbb\xbf \t\r\n')
+    if head.startswith(b'{'):
+        return 'json'
+    if head.startswith(b'<'):
+        return 'junit'
+    raise ReportError("Not a JSON or XML document")
+
+
+# Fields of a JSON test entry the parsers read, and the types they accept
+TEST_FIELD_TYPES = {"title": str, "file": str, "status": str, "duration": (int, float)}
+
+
+def _validate_tests(path):
+    """Check each JSON test entry, streaming the tests array one entry at a time"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for key, value in _JsonReader(f).items():
+            if key != 'tests':
+                value.value()
+                continue
+            if value.peek() != '[':
+                raise ReportError("JSON report tests is not an array")
+            for index, test in enumerate(value.elements()):
+                if not isinstance(test, dict):
+                    raise ReportError(f"Test {index} is not an object")
+                for field, types in TEST_FIELD_TYPES.items():
+                    if field in test and (not isinstance(test[field], types) or isinstance(test[field], bool)):
+                        raise ReportError(f"Test {index} has an invalid {field}: {test[field]!r}")
+
+
+def validate_report(path):
+    """Format of a report after a structural check.
+
+    JSON reports need the summary block with a start time (the run key) and
+    test entries that are objects with string title, file and status; the
+    tests are streamed, never held whole. JUnit reports need a <testsuites>
+    or <testsuite> root, and only the head is read.
+    """
+    fmt = detect_format(path)
+    try:
+        if fmt == 'json':
+            summary = load_test_results_summary(path)
+            if not isinstance(summary, dict) or not summary.get('startTime'):
+                raise ReportError("JSON report has no summary.startTime")
+            _validate_tests(path)
+        else:
+            _, root = next(ET.iterparse(path, events=('start',)))
+            if root.tag not in ('testsuites', 'testsuite'):
+                raise ReportError(f"Unexpected JUnit root element <{root.tag}>")
+    except (ValueError, ET.ParseError, StopIteration) as e:
+        if isinstance(e, ReportError):
+            raise
+        raise ReportError(f"Malformed {fmt} report: {e}") from e
+    return fmt
+
+
+def published_names(fmt, env):
+    """Files in data/ that a report becomes when it is the newest run"""
+    if fmt == 'junit':
+        return ["junit-report.xml"]
+    if env == DEFAULT_ENV:
+        return ["test-results.json"]
+    return [f"test-results-{env.lower()}.json", "test-results.json"]
+
+
+def _copy_atomic(src, dest):
+    tmp_path = f"{dest}.{os.getpid()}.tmp"
+    shutil.copyfile(src, tmp_path)
+    os.replace(tmp_path, dest)
+
+
+def ingest_file(path, env=DEFAULT_ENV, data_dir=DATA_DIR, store_dir=None):
+    """Validate and ingest one report; returns the run id and the files published.
+
+    The report is converted into the store once. Each published copy is
+    recorded against the stored run, so the dashboard never parses it again.
+    Older runs (a CI job finishing late) only go to the history.
+    """
+    if not ENV_PATTERN.match(env):
+        raise ReportError(f"Invalid environment name {env!r}")
+    env = env.upper()
+    store_dir = store_dir or get_store_dir(data_dir)
+    fmt = validate_report(path)
+    if (fmt == 'junit') != path.endswith('.xml'):
+        # The parsers pick JSON or JUnit by extension
+        raise ReportError(f"{fmt} report with a .{path.rsplit('.', 1)[-1]} name")
+
+    with store_lock(store_dir):
+        try:
+            run_id = ingest_report(path, store_dir, env=env, remember=False)
+        except (ValueError, KeyError, TypeError, ET.ParseError) as e:
+            raise ReportError(f"Could not convert {fmt} report: {e}") from e
+
+        published = []
+        for name in published_names(fmt, env):
+            dest = os.path.join(data_dir, name)
+            dest_env = env if name.startswith("test-results-") else DEFAULT_ENV
+            if os.path.exists(dest) and run_stamp(ingest_report(dest, store_dir, env=dest_env)) > run_stamp(run_id):
+                continue
+            _copy_atomic(path, dest)
+            record_source(store_dir, dest, run_id, dest_env)
+            published.append(name)
+        if published:
+            # Running dashboards and the next cold start serve the new reports from it
+            write_snapshot(data_dir, store_dir)
+    return {"run_id": run_id, "env": env, "format": fmt, "published": published}
+
+
+class IngestHandler(BaseHTTPRequestHandler):
+    """POST /ingest?env=QA with the report as the body; GET /health"""
+
+    data_dir = DATA_DIR
+    store_dir = None
+    token = None
+
+    def _reply(self, status, body):
+        payload = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        if urlparse(self.path).path != "/health":
+            return self._reply(404, {"error": "Not found"})
+        store_dir = self.store_dir or get_store_dir(self.data_dir)
+        self._reply(200, {"status": "ok", "runs": len(load_runs(store_dir))})
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if url.path != "/ingest":
+            return self._reply(404, {"error": "Not found"})
+        if self.token and self.headers.get("Authorization") != f"Bearer {self.token}":
+            return self._reply(401, {"error": "Missing or invalid token"})
+        length = self.headers.get("Content-Length")
+        if length is None or not length.isdigit():
+            return self._reply(411, {"error": "Content-Length required"})
+        if int(length) > MAX_UPLOAD_BYTES:
+            return self._reply(413, {"error": f"Report larger than {MAX_UPLOAD_BYTES} bytes"})
+        env = parse_qs(url.query).get("env", [DEFAULT_ENV])[0]
+        if not ENV_PATTERN.match(env):
+            return self._reply(400, {"error": f"Invalid environment name {env!r}"})
+
+        store_dir = self.store_dir or get_store_dir(self.data_dir)
+        incoming = os.path.join(store_dir, INCOMING_DIR)
+        os.makedirs(incoming, exist_ok=True)
+        # The body goes to disk in chunks, never whole into memory
+        fd, path = tempfile.mkstemp(prefix=f"upload-{env}-", dir=incoming)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                remaining = int(length)
+                while remaining:
+                    chunk = self.rfile.read(min(UPLOAD_CHUNK_SIZE, remaining))
+                    if not chunk:
+                        return self._reply(400, {"error": "Upload ended early"})
+                    f.write(chunk)
+                    remaining -= len(chunk)
+            # The parsers pick JSON or JUnit by extension
+            named = f"{path}.{'xml' if detect_format(path) == 'junit' else 'json'}"
+            os.replace(path, named)
+            path = named
+            result = ingest_file(path, env, self.data_dir, store_dir)
+        except ReportError as e:
+            return self._reply(400, {"error": str(e)})
+        except Exception as e:
+            # Never leave the client without a response
+            self.log_error("Ingest of %s failed: %r", path, e)
+            return self._reply(500, {"error": f"Internal error: {type(e).__name__}"})
+        finally:
+            os.remove(path)
+        self._reply(201, result)
+
+
+def serve(host="127.0.0.1", port=8502, data_dir=DATA_DIR, store_dir=None):
+    """Run the upload endpoint until interrupted"""
+    handler = type("Handler", (IngestHandler,), {
+        "data_dir": data_dir, "store_dir": store_dir, "token": os.environ.get(TOKEN_ENV)
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    print(f"Listening on http://{host}:{port}/ingest")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data-dir", default=DATA_DIR, help="Dashboard data directory")
+    parser.add_argument("--store-dir", default=None, help="Run store (default: QA_STORE_DIR or data/store)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    file_parser = commands.add_parser("file", help="Ingest report files")
+    file_parser.add_argument("paths", nargs="+", help="Playwright JSON or JUnit XML reports")
+    file_parser.add_argument("--env", default=DEFAULT_ENV, help="Environment of the reports (QA, DEV...)")
+
+    serve_parser = commands.add_parser("serve", help="Accept uploads over HTTP")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8502)
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        serve(args.host, args.port, args.data_dir, args.store_dir)
+        return
+
+    failed = False
+    for path in args.paths:
+        try:
+            result = ingest_file(path, args.env, args.data_dir, args.store_dir)
+        except (ReportError, OSError) as e:
+            print(f"{path}: {e}", file=sys.stderr)
+            failed = True
+            continue
+        published = ", ".join(result['published']) or "history only"
+        print(f"{path}: run {result['run_id']} ({result['env']}, {result['format']}) -> {published}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,10 +2,11 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-import json
 import os
 from datetime import datetime
 from pathlib import Path
+from parsers import cached_parse, load_json
+from perf import Profiler, perf_enabled, render_panel
 
 # Configure page
 st.set_page_config(
@@ -32,6 +33,8 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+profiler = Profiler("test_analysis", perf_enabled(st.query_params))
+
 st.title(":bar_chart: Analisis Completo de la Suite de Tests")
 st.markdown("### Estado actual y recomendaciones de mejora")
 st.markdown("---")
@@ -39,15 +42,14 @@ st.markdown("---")
 # Load analysis data
 DATA_DIR = Path(__file__).parent.parent / "data"
 
-@st.cache_data(ttl=300)
 def load_analysis_data():
     json_path = DATA_DIR / "test-analysis-complete.json"
     if json_path.exists():
-        with open(json_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return cached_parse(str(json_path), load_json)
     return None
 
-analysis = load_analysis_data()
+with profiler.stage("load"):
+    analysis = load_analysis_data()
 
 if analysis is None:
     st.error("No se encontraron datos de analisis")
@@ -121,29 +123,35 @@ col1, col2 = st.columns(2)
 
 with col1:
     if 'byType' in analysis.get('distribution', {}):
-        test_types = {k: v for k, v in analysis['distribution']['byType'].items() if v > 0}
-        if test_types:
-            df_types = pd.DataFrame(list(test_types.items()), columns=['Module', 'Tests'])
-            fig_pie = px.pie(
-                df_types, values='Tests', names='Module',
-                title="Tests por Modulo",
-                color_discrete_sequence=px.colors.qualitative.Set3
-            )
-            fig_pie.update_traces(textposition='inside', textinfo='percent+label+value')
-            st.plotly_chart(fig_pie, use_container_width=True)
+        with profiler.stage("chart_types") as s:
+            test_types = {k: v for k, v in analysis['distribution']['byType'].items() if v > 0}
+            if test_types:
+                df_types = pd.DataFrame(list(test_types.items()), columns=['Module', 'Tests'])
+                fig_pie = px.pie(
+                    df_types, values='Tests', names='Module',
+                    title="Tests por Modulo",
+                    color_discrete_sequence=px.colors.qualitative.Set3
+                )
+                fig_pie.update_traces(textposition='inside', textinfo='percent+label+value')
+                s.rows = len(df_types)
+                s.payload(fig_pie)
+                st.plotly_chart(fig_pie, use_container_width=True)
 
 with col2:
     if 'byType' in analysis.get('distribution', {}):
-        all_types = analysis['distribution']['byType']
-        df_all = pd.DataFrame(list(all_types.items()), columns=['Type', 'Count'])
-        df_all = df_all.sort_values('Count', ascending=True)
-
-        fig_bar = px.bar(
-            df_all, x='Count', y='Type', orientation='h',
-            title="Inventario Completo de Tests",
-            text='Count'
-        )
-        st.plotly_chart(fig_bar, use_container_width=True)
+        with profiler.stage("chart_inventory") as s:
+            all_types = analysis['distribution']['byType']
+            df_all = pd.DataFrame(list(all_types.items()), columns=['Type', 'Count'])
+            df_all = df_all.sort_values('Count', ascending=True)
+
+            fig_bar = px.bar(
+                df_all, x='Count', y='Type', orientation='h',
+                title="Inventario Completo de Tests",
+                text='Count'
+            )
+            s.rows = len(df_all)
+            s.payload(fig_bar)
+            st.plotly_chart(fig_bar, use_container_width=True)
 
 # Quality scores
 if 'scores' in analysis and len(analysis['scores']) > 1:
@@ -152,20 +160,23 @@ if 'scores' in analysis and len(analysis['scores']) > 1:
 
     scores_data = {k: v for k, v in analysis['scores'].items() if k != 'overall'}
     if scores_data:
-        df_scores = pd.DataFrame(list(scores_data.items()), columns=['Category', 'Score'])
-        colors = ['#2ecc71' if s >= 8 else '#f39c12' if s >= 6 else '#e74c3c' for s in df_scores['Score']]
-
-        fig_scores = go.Figure(data=[
-            go.Bar(x=df_scores['Category'], y=df_scores['Score'],
-                   marker=dict(color=colors), text=df_scores['Score'], textposition='auto')
-        ])
-        fig_scores.update_layout(
-            title="Puntuacion por Categoria",
-            yaxis_title="Score (0-10)",
-            yaxis=dict(range=[0, 10]),
-            showlegend=False
-        )
-        st.plotly_chart(fig_scores, use_container_width=True)
+        with profiler.stage("chart_scores") as s:
+            df_scores = pd.DataFrame(list(scores_data.items()), columns=['Category', 'Score'])
+            colors = ['#2ecc71' if value >= 8 else '#f39c12' if value >= 6 else '#e74c3c' for value in df_scores['Score']]
+
+            fig_scores = go.Figure(data=[
+                go.Bar(x=df_scores['Category'], y=df_scores['Score'],
+                       marker=dict(color=colors), text=df_scores['Score'], textposition='auto')
+            ])
+            fig_scores.update_layout(
+                title="Puntuacion por Categoria",
+                yaxis_title="Score (0-10)",
+                yaxis=dict(range=[0, 10]),
+                showlegend=False
+            )
+            s.rows = len(df_scores)
+            s.payload(fig_scores)
+            st.plotly_chart(fig_scores, use_container_width=True)
 
 # Issues
 if 'issues' in analysis and analysis['issues']:
@@ -235,3 +246,5 @@ if 'lastRun' in analysis and analysis['lastRun'].get('total', 0) > 0:
         st.metric("Failed", last_run['failed'])
     with col4:
         st.metric("Tiempo", f"{last_run['executionTime']:.1f}s")
+
+render_panel(profiler)
@@ -0,0 +1,88 @@
+import streamlit as st
+import plotly.express as px
+from pathlib import Path
+from refresh import get_refresher
+from store import get_store_dir
+from flaky import flakiness_from_store
+
+# Configure page
+st.set_page_config(
+    page_title="Flaky Tests - QA Dashboard",
+    page_icon=":game_die:",
+    layout="wide"
+)
+
+st.title(":game_die: Tests Inestables (Flaky)")
+st.markdown("### Tests que alternan entre passed y failed a lo largo del historial")
+st.markdown("---")
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+STORE_DIR = Path(get_store_dir(str(DATA_DIR)))
+
+# New reports are ingested by the background refresher; the page only reads
+# the store, waiting just for its first build
+get_refresher(str(DATA_DIR), str(STORE_DIR)).snapshot()
+flaky = flakiness_from_store(str(STORE_DIR))
+
+if flaky.empty:
+    st.info("Todavia no hay historial de ejecuciones en `data/store/`.")
+    st.stop()
+
+# Sidebar filters
+st.sidebar.subheader(":bar_chart: Filtros")
+
+all_envs = sorted({env for envs in flaky['envs'] for env in envs.split(", ")})
+selected_envs = st.sidebar.multiselect("Ambientes", all_envs, default=all_envs)
+min_runs = st.sidebar.slider("Ejecuciones minimas", 2, max(int(flaky['runs'].max()), 2), 2)
+min_score = st.sidebar.slider("Score minimo", 0.0, 100.0, 1.0)
+top_n = st.sidebar.slider("Top N", 5, 100, 20)
+
+env_mask = flaky['envs'].apply(lambda envs: any(env in selected_envs for env in envs.split(", ")))
+ranked = flaky[env_mask & (flaky['runs'] >= min_runs) & (flaky['flakiness_score'] >= min_score)]
+
+# Key metrics
+col1, col2, col3, col4 = st.columns(4)
+with col1:
+    st.metric("Tests analizados", len(flaky))
+with col2:
+    st.metric("Tests flaky", len(ranked))
+with col3:
+    broken = flaky[(flaky['failure_rate'] == 100) & (flaky['runs'] >= min_runs)]
+    st.metric("Siempre fallan", len(broken))
+with col4:
+    st.metric("Ejecuciones max.", int(flaky['runs'].max()))
+
+st.markdown("---")
+
+if ranked.empty:
+    st.success("No hay tests flaky con los filtros actuales.")
+    st.stop()
+
+top = ranked.head(top_n)
+
+fig_score = px.bar(
+    top.iloc[::-1],
+    x='flakiness_score',
+    y='name',
+    orientation='h',
+    color='failure_rate',
+    color_continuous_scale='OrRd',
+    title=f"Top {len(top)} Tests por Score de Inestabilidad",
+    labels={'flakiness_score': 'Score (0-100)', 'name': 'Test', 'failure_rate': '% Fallos'},
+    hover_data=['module', 'runs', 'flips']
+)
+fig_score.update_layout(height=max(400, 25 * len(top)))
+st.plotly_chart(fig_score, use_container_width=True)
+
+st.subheader(":clipboard: Ranking")
+window_columns = [c for c in ranked.columns if c.startswith('failure_rate_last_')]
+st.dataframe(
+    top[['name', 'module', 'envs', 'runs', 'failures', 'flips', 'flip_rate',
+         'failure_rate'] + window_columns + ['flakiness_score', 'last_status', 'last_seen']],
+    use_container_width=True,
+    hide_index=True
+)
+st.caption(
+    "Score = media del % de cambios passed/failed entre ejecuciones consecutivas del mismo "
+    "ambiente, en todo el historial y en las ultimas 10 ejecuciones."
+)
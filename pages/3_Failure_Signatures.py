@@ -0,0 +1,92 @@
+import streamlit as st
+import plotly.express as px
+from pathlib import Path
+from refresh import get_refresher
+from store import get_store_dir
+from signatures import signatures_from_store, summarize_signatures, signature_tests
+
+# Configure page
+st.set_page_config(
+    page_title="Failure Signatures - QA Dashboard",
+    page_icon=":mag:",
+    layout="wide"
+)
+
+st.title(":mag: Firmas de Fallos")
+st.markdown("### Fallos agrupados por causa a lo largo del historial")
+st.markdown("---")
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+STORE_DIR = Path(get_store_dir(str(DATA_DIR)))
+
+# New reports are ingested by the background refresher; the page only reads
+# the store, waiting just for its first build
+get_refresher(str(DATA_DIR), str(STORE_DIR)).snapshot()
+failures = signatures_from_store(str(STORE_DIR))
+
+if failures.empty:
+    st.info("No hay fallos con mensaje de error en el historial de `data/store/`.")
+    st.stop()
+
+# Sidebar filters
+st.sidebar.subheader(":bar_chart: Filtros")
+
+all_envs = sorted(failures['env'].dropna().astype(str).unique())
+selected_envs = st.sidebar.multiselect("Ambientes", all_envs, default=all_envs)
+top_n = st.sidebar.slider("Top N", 5, 100, 20)
+
+failures = failures[failures['env'].astype(str).isin(selected_envs)]
+signatures = summarize_signatures(failures)
+
+# Key metrics
+col1, col2, col3, col4 = st.columns(4)
+with col1:
+    st.metric("Fallos", len(failures))
+with col2:
+    st.metric("Mensajes distintos", failures['fingerprint'].nunique())
+with col3:
+    st.metric("Firmas", len(signatures))
+with col4:
+    st.metric("Tests afectados", len(failures[['file', 'line', 'name']].drop_duplicates()))
+
+st.markdown("---")
+
+if signatures.empty:
+    st.success("No hay fallos en los ambientes seleccionados.")
+    st.stop()
+
+top = signatures.head(top_n)
+labels = top['signature_id'] + "  " + top['signature'].str.split('\n').str[0].str.slice(0, 60)
+
+fig_top = px.bar(
+    top.assign(label=labels).iloc[::-1],
+    x='occurrences',
+    y='label',
+    orientation='h',
+    color='tests',
+    color_continuous_scale='Reds',
+    title=f"Top {len(top)} Firmas por Ocurrencias",
+    labels={'occurrences': 'Ocurrencias', 'label': 'Firma', 'tests': 'Tests'},
+    hover_data=['envs', 'fingerprints']
+)
+fig_top.update_layout(height=max(400, 25 * len(top)))
+st.plotly_chart(fig_top, use_container_width=True)
+
+st.subheader(":clipboard: Firmas")
+st.dataframe(
+    top[['signature_id', 'signature', 'occurrences', 'tests', 'fingerprints', 'envs', 'first_seen', 'last_seen']],
+    use_container_width=True,
+    hide_index=True
+)
+st.caption(
+    "Los mensajes se normalizan (sin colores ANSI, URLs, ids, fechas, rutas ni numeros) y los "
+    "casi iguales se agrupan con MinHash/LSH. 'fingerprints' = mensajes normalizados distintos en la firma."
+)
+
+# Drill-down into one signature
+st.subheader(":test_tube: Tests afectados")
+by_id = top.set_index('signature_id')
+selected = st.selectbox("Firma", list(by_id.index),
+                        format_func=lambda sid: f"{sid} ({by_id.at[sid, 'occurrences']} fallos)")
+st.code(by_id.at[selected, 'example'], language=None)
+st.dataframe(signature_tests(failures, selected), use_container_width=True, hide_index=True)
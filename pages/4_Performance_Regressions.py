@@ -0,0 +1,121 @@
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+from pathlib import Path
+from refresh import get_refresher
+from store import get_store_dir, load_duration_state
+from regressions import (
+    regressions_from_store, module_durations, duration_columns, RECENT_RUNS, DURATION_WINDOW, CHANGE_THRESHOLD
+)
+
+# Configure page
+st.set_page_config(
+    page_title="Performance Regressions - QA Dashboard",
+    page_icon=":snail:",
+    layout="wide"
+)
+
+st.title(":snail: Regresiones de Rendimiento")
+st.markdown("### Tests y modulos cuya duracion cambio en las ultimas ejecuciones")
+st.markdown("---")
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+STORE_DIR = Path(get_store_dir(str(DATA_DIR)))
+LEVELS = {"Tests": "test", "Modulos": "module"}
+
+# New reports are ingested by the background refresher; the page only reads
+# the store, waiting just for its first build
+get_refresher(str(DATA_DIR), str(STORE_DIR)).snapshot()
+regressions = regressions_from_store(str(STORE_DIR))
+
+if regressions.empty:
+    st.info(
+        f"Hacen falta mas de {RECENT_RUNS} ejecuciones de un ambiente en `data/store/` "
+        "para comparar duraciones."
+    )
+    st.stop()
+
+# Sidebar filters
+st.sidebar.subheader(":bar_chart: Filtros")
+
+all_envs = sorted(regressions['env'].unique())
+selected_envs = st.sidebar.multiselect("Ambientes", all_envs, default=all_envs)
+level = LEVELS[st.sidebar.radio("Nivel", list(LEVELS))]
+only_regressions = st.sidebar.toggle("Solo regresiones", value=True)
+top_n = st.sidebar.slider("Top N", 5, 100, 20)
+
+scope = regressions[regressions['env'].isin(selected_envs)]
+view = scope[scope['level'] == level]
+if only_regressions:
+    view = view[view['regression']]
+
+# Key metrics
+tests = scope[scope['level'] == 'test']
+col1, col2, col3, col4 = st.columns(4)
+with col1:
+    st.metric("Tests analizados", len(tests))
+with col2:
+    st.metric("Tests con regresion", int(tests['regression'].sum()))
+with col3:
+    st.metric("Modulos con regresion", int(scope[scope['level'] == 'module']['regression'].sum()))
+with col4:
+    st.metric("Segundos agregados", f"{tests.loc[tests['regression'], 'shift_seconds'].sum():.0f}s")
+
+st.markdown("---")
+
+if view.empty:
+    st.success("No hay regresiones de duracion con los filtros actuales.")
+    st.stop()
+
+top = view.head(top_n)
+labels = top['env'] + " - " + top['name']
+
+fig_top = px.bar(
+    top.assign(label=labels).iloc[::-1],
+    x='shift_seconds',
+    y='label',
+    orientation='h',
+    color='shift_ratio',
+    color_continuous_scale='YlOrRd',
+    title=f"Top {len(top)} por Segundos Agregados a la Mediana",
+    labels={'shift_seconds': 'Segundos agregados', 'label': 'Test' if level == 'test' else 'Modulo',
+            'shift_ratio': 'x Base'},
+    hover_data=['baseline_median', 'recent_median', 'robust_z']
+)
+fig_top.update_layout(height=max(400, 25 * len(top)))
+st.plotly_chart(fig_top, use_container_width=True)
+
+st.subheader(":clipboard: Ranking")
+st.dataframe(
+    top[['env', 'name', 'module', 'runs', 'baseline_median', 'baseline_mad', 'recent_median',
+         'shift_seconds', 'shift_ratio', 'robust_z', 'change_run', 'change_score', 'regression']],
+    use_container_width=True,
+    hide_index=True
+)
+st.caption(
+    f"Base = mediana y MAD de las ejecuciones previas a las ultimas {RECENT_RUNS} (ventana de "
+    f"{DURATION_WINDOW} ejecuciones por ambiente, solo tests passed). 'change_run' es la ejecucion donde "
+    f"empieza el cambio mas probable. Regresion = cambio con score >= {CHANGE_THRESHOLD:g} y mediana posterior "
+    "al menos 1.25x y 1 s mayor que la anterior, ya sea un salto o una subida gradual."
+)
+
+# Drill-down into one series
+st.subheader(":chart_with_upwards_trend: Duracion por ejecucion")
+options = list(top.index)
+selected = st.selectbox("Serie", options, format_func=lambda i: f"{top.at[i, 'env']} - {top.at[i, 'name']}")
+row = top.loc[selected]
+
+state = load_duration_state(str(STORE_DIR), row['env'])
+series_frame = state if level == 'test' else module_durations(state)
+match = series_frame[series_frame['key' if level == 'test' else 'name'] == row['key' if level == 'test' else 'name']]
+if not match.empty:
+    runs = duration_columns(series_frame)
+    series = pd.DataFrame({"run": runs, "time": match.iloc[0][runs].astype(float).to_numpy()})
+    fig_series = go.Figure(go.Scatter(x=series['run'], y=series['time'], mode='lines+markers', name='Duracion'))
+    fig_series.add_hline(y=row['baseline_median'], line_dash='dash', line_color='gray',
+                         annotation_text="Mediana base")
+    if row['change_run'] is not None:
+        fig_series.add_vline(x=row['change_run'], line_dash='dot', line_color='red')
+    fig_series.update_layout(xaxis_title="Ejecucion", yaxis_title="Duracion (s)", height=400)
+    st.plotly_chart(fig_series, use_container_width=True)
@@ -0,0 +1,139 @@
+import streamlit as st
+import plotly.graph_objects as go
+from pathlib import Path
+from refresh import get_refresher
+from store import get_store_dir, select_runs, load_run
+from charts import STATUS_COLORS
+from timeline import (
+    build_schedule, analyze_schedule, idle_gaps, lane_segments, lane_labels, MIN_IDLE_GAP
+)
+
+# Configure page
+st.set_page_config(
+    page_title="Timeline - QA Dashboard",
+    page_icon=":stopwatch:",
+    layout="wide"
+)
+
+st.title(":stopwatch: Timeline de Ejecucion")
+st.markdown("### Cuando y en que worker corrio cada test, y donde se pierde tiempo")
+st.markdown("---")
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+STORE_DIR = Path(get_store_dir(str(DATA_DIR)))
+
+# New reports are ingested by the background refresher; the page only reads
+# the store, waiting just for its first build
+get_refresher(str(DATA_DIR), str(STORE_DIR)).snapshot()
+runs = select_runs(str(STORE_DIR))
+
+if runs.empty:
+    st.info("No hay ejecuciones en `data/store/` todavia.")
+    st.stop()
+
+# Sidebar filters
+st.sidebar.subheader(":bar_chart: Filtros")
+
+all_envs = sorted(runs['env'].unique())
+selected_env = st.sidebar.selectbox("Ambiente", all_envs)
+env_runs = runs[runs['env'] == selected_env].sort_values('start_time', ascending=False)
+run_id = st.sidebar.selectbox("Ejecucion", list(env_runs['run_id']))
+run = env_runs[env_runs['run_id'] == run_id].iloc[0]
+
+wall = float(run['duration']) or None
+schedule, measured = build_schedule(load_run(str(STORE_DIR), run_id), wall)
+
+if schedule.empty:
+    st.info("La ejecucion no tiene tests ejecutados.")
+    st.stop()
+
+stats = analyze_schedule(schedule, wall)
+labels = lane_labels(schedule)
+
+if not measured:
+    st.caption(
+        "El reporte no trae `startTime` ni `parallelIndex` por test: el timeline se reconstruye con "
+        "las duraciones, los setups primero y cada spec entero (o cada test, si asi no alcanza) en el "
+        "primer worker libre, con los workers minimos que terminan en la duracion real de la ejecucion."
+    )
+
+# Key metrics
+col1, col2, col3, col4, col5 = st.columns(5)
+with col1:
+    st.metric("Duracion", f"{stats['wall']:.0f}s")
+with col2:
+    st.metric("Workers", stats['lanes'] if measured else f"~{stats['lanes']}")
+with col3:
+    st.metric("Utilizacion", f"{stats['utilization'] * 100:.0f}%", help="Tiempo ocupado / (workers x duracion)")
+with col4:
+    st.metric("Setup serial", f"{stats['setup_seconds']:.0f}s")
+with col5:
+    st.metric("Camino critico", f"{stats['critical_path']:.0f}s",
+              help="Setups mas el spec mas largo: la duracion minima con workers ilimitados")
+
+# Worker lanes. Busy lanes have neighbouring tests merged, so the figure
+# stays at a bounded number of bars however large the run.
+segments = lane_segments(schedule)
+segments['lane_label'] = segments['lane'].map(labels)
+segments['seconds'] = segments['end'] - segments['start']
+
+fig = go.Figure()
+for status, rows in segments.groupby('status', sort=False):
+    fig.add_trace(go.Bar(
+        y=rows['lane_label'],
+        x=rows['seconds'],
+        base=rows['start'],
+        orientation='h',
+        name=status,
+        marker_color=STATUS_COLORS.get(status, '#7f7f7f'),
+        marker_line_color=rows['critical'].map({True: 'black', False: 'white'}),
+        marker_line_width=rows['critical'].map({True: 2, False: 0.5}),
+        customdata=rows[['label', 'seconds', 'start']],
+        hovertemplate="%{customdata[0]}<br>%{customdata[1]:.1f}s desde %{customdata[2]:.0f}s<extra></extra>"
+    ))
+if stats['setup_seconds']:
+    fig.add_vline(x=stats['setup_seconds'], line_dash='dash', line_color='gray', annotation_text="Fin setup")
+fig.update_layout(
+    title="Tests por Worker (borde negro: camino critico)",
+    barmode='overlay',
+    xaxis_title="Segundos desde el inicio",
+    yaxis={'categoryorder': 'array', 'categoryarray': list(labels.values())[::-1]},
+    height=max(300, 60 * len(labels))
+)
+st.plotly_chart(fig, use_container_width=True)
+if segments['tests'].max() > 1:
+    st.caption(f"{len(schedule)} tests agrupados en {len(segments)} barras; pasar el mouse muestra cuantos tests une cada una.")
+
+# Where the wall-clock time goes
+st.subheader(":money_with_wings: Tiempo recuperable")
+col1, col2, col3 = st.columns(3)
+with col1:
+    st.metric("Tiempo ocioso", f"{stats['idle']:.0f}s", help="Suma de los huecos de todos los workers")
+with col2:
+    st.metric("Duracion balanceada", f"{stats['balanced_wall']:.0f}s",
+              delta=f"{stats['balanced_wall'] - stats['wall']:.0f}s", delta_color='inverse',
+              help="Con los mismos workers y el trabajo repartido sin huecos despues del setup")
+with col3:
+    st.metric("Workers utiles", stats['workers_for_critical_path'],
+              help="Con mas workers la duracion ya no baja: la limita el camino critico")
+if stats['critical_file']:
+    spec_name = stats['critical_file'].replace('\\', '/').split('/')[-1]
+    st.markdown(f"El camino critico termina en `{spec_name}`: "
+                "dividir ese spec acorta la duracion minima.")
+
+specs = schedule.assign(seconds=schedule['end'] - schedule['start'])[~schedule['setup']]
+by_file = specs.groupby('file').agg(tests=('name', 'size'), seconds=('seconds', 'sum'), workers=('lane', 'nunique'))
+by_file = by_file.sort_values('seconds', ascending=False).head(10).round(1).reset_index()
+by_file['file'] = by_file['file'].str.replace('\\', '/').str.split('/').str[-1]
+
+gaps = idle_gaps(schedule, wall)
+gaps['worker'] = gaps['lane'].map(labels)
+
+col1, col2 = st.columns(2)
+with col1:
+    st.markdown("**Specs mas largos**")
+    st.dataframe(by_file, use_container_width=True, hide_index=True)
+with col2:
+    st.markdown(f"**Huecos de {MIN_IDLE_GAP:.0f}s o mas**")
+    st.dataframe(gaps[['worker', 'start', 'end', 'seconds']].head(20).round(1),
+                 use_container_width=True, hide_index=True)
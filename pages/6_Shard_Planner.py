@@ -0,0 +1,91 @@
+import streamlit as st
+import json
+import plotly.graph_objects as go
+from pathlib import Path
+from refresh import get_refresher
+from store import get_store_dir, load_runs
+from shards import plan_from_store, shard_manifest, SHARD_PERCENTILE
+
+# Configure page
+st.set_page_config(
+    page_title="Shard Planner - QA Dashboard",
+    page_icon=":scales:",
+    layout="wide"
+)
+
+st.title(":scales: Planificador de Shards")
+st.markdown("### Reparto de specs entre shards de CI segun su duracion historica")
+st.markdown("---")
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+STORE_DIR = Path(get_store_dir(str(DATA_DIR)))
+
+# New reports are ingested by the background refresher; the page only reads
+# the store, waiting just for its first build
+get_refresher(str(DATA_DIR), str(STORE_DIR)).snapshot()
+runs = load_runs(str(STORE_DIR))
+
+if runs.empty:
+    st.info("No hay ejecuciones en `data/store/` todavia.")
+    st.stop()
+
+# Sidebar filters
+st.sidebar.subheader(":bar_chart: Parametros")
+
+selected_env = st.sidebar.selectbox("Ambiente", sorted(runs['env'].unique()))
+n_shards = st.sidebar.slider("Shards", 1, 16, 4)
+workers = st.sidebar.number_input("Workers por shard", 1, 32, 1)
+percentile = st.sidebar.slider("Percentil de duracion", 50, 99, SHARD_PERCENTILE)
+
+plan, summary = plan_from_store(str(STORE_DIR), selected_env, n_shards, workers, percentile)
+
+if plan.empty:
+    st.info("La ultima ejecucion del ambiente no tiene specs ejecutados.")
+    st.stop()
+
+# Key metrics
+saved = summary['current_makespan'] - summary['makespan']
+col1, col2, col3, col4 = st.columns(4)
+with col1:
+    st.metric("Specs", len(plan))
+with col2:
+    st.metric("Duracion actual", f"{summary['current_makespan']:.0f}s", help="Specs repartidos por cantidad, en orden")
+with col3:
+    st.metric("Duracion balanceada", f"{summary['makespan']:.0f}s", delta=f"{-saved:.0f}s", delta_color='inverse')
+with col4:
+    st.metric("Setup por shard", f"{summary['setup_seconds']:.0f}s")
+
+# Predicted duration of each shard, both splits
+shard_labels = [f"Shard {i}" for i in range(1, n_shards + 1)]
+fig = go.Figure([
+    go.Bar(x=shard_labels, y=summary['current_loads'], name="Por cantidad de specs", marker_color='#bbbbbb'),
+    go.Bar(x=shard_labels, y=summary['loads'], name="Balanceado", marker_color='#1f77b4')
+])
+fig.add_hline(y=summary['makespan'], line_dash='dash', line_color='#1f77b4')
+fig.update_layout(title="Duracion Prevista por Shard", barmode='group', yaxis_title="Segundos", height=400)
+st.plotly_chart(fig, use_container_width=True)
+
+history_share = plan['history'].sum() / max(plan['tests'].sum(), 1)
+st.caption(
+    f"Cada test pesa el p{percentile} de sus duraciones passed en las ultimas ejecuciones de {selected_env} "
+    f"({history_share * 100:.0f}% de los tests tienen historial; el resto usa su duracion en la ejecucion "
+    f"{summary['run_id']}). Los specs se asignan de mayor a menor al shard menos cargado."
+)
+
+# Manifest
+st.subheader(":clipboard: Plan")
+st.download_button(
+    ":inbox_tray: Descargar manifiesto (JSON)",
+    data=json.dumps(shard_manifest(plan, summary), indent=2, ensure_ascii=False),
+    file_name=f"shard-manifest-{selected_env.lower()}.json",
+    mime="application/json"
+)
+moved = plan['shard'] != plan['current_shard']
+st.dataframe(
+    plan[['shard', 'spec', 'tests', 'seconds', 'current_shard']].assign(
+        seconds=plan['seconds'].round(1), cambia=moved
+    ),
+    use_container_width=True,
+    hide_index=True
+)
+st.caption(f"{int(moved.sum())} de {len(plan)} specs cambian de shard respecto del reparto por cantidad.")
@@ -0,0 +1,107 @@
+import streamlit as st
+import pandas as pd
+import plotly.graph_objects as go
+from pathlib import Path
+from refresh import get_refresher
+from store import get_store_dir, load_runs
+from trends import (
+    trends_from_store, module_trends_from_store, module_series, top_modules, downsample,
+    point_budget, RUN_METRICS, CHART_WIDTH
+)
+
+# Configure page
+st.set_page_config(
+    page_title="Trends - QA Dashboard",
+    page_icon=":chart_with_upwards_trend:",
+    layout="wide"
+)
+
+st.title(":chart_with_upwards_trend: Tendencias")
+st.markdown("### Evolucion de la suite por ambiente a lo largo de semanas y meses")
+st.markdown("---")
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+STORE_DIR = Path(get_store_dir(str(DATA_DIR)))
+CHART_WIDTHS = [600, 900, 1200, 1600, 2400]
+
+# New reports are ingested by the background refresher; the page only reads
+# the store, waiting just for its first build
+get_refresher(str(DATA_DIR), str(STORE_DIR)).snapshot()
+runs = load_runs(str(STORE_DIR))
+
+if runs.empty:
+    st.info("No hay ejecuciones en `data/store/` todavia.")
+    st.stop()
+
+# Sidebar filters
+st.sidebar.subheader(":bar_chart: Filtros")
+
+all_envs = sorted(runs['env'].unique())
+selected_envs = st.sidebar.multiselect("Ambientes", all_envs, default=all_envs)
+width = st.sidebar.select_slider(
+    "Ancho de los graficos (px)", CHART_WIDTHS, value=CHART_WIDTH,
+    help="Define cuantos puntos por serie se envian al navegador"
+)
+budget = point_budget(width)
+
+series = trends_from_store(str(STORE_DIR), selected_envs)
+if series.empty:
+    st.info("Selecciona al menos un ambiente.")
+    st.stop()
+
+# Range: narrowing it spends the whole point budget on the window, so
+# zooming in shows every run once the window holds fewer than the budget.
+first, last = series['start_time'].min().to_pydatetime(), series['start_time'].max().to_pydatetime()
+start, end = first, last
+if first < last:
+    start, end = st.slider("Rango", min_value=first, max_value=last, value=(first, last), format="YYYY-MM-DD")
+start, end = pd.Timestamp(start), pd.Timestamp(end)
+
+in_range = series[(series['start_time'] >= start) & (series['start_time'] <= end)]
+col1, col2, col3 = st.columns(3)
+with col1:
+    st.metric("Ejecuciones en el rango", len(in_range))
+with col2:
+    st.metric("Tasa de exito media", f"{in_range['pass_rate'].mean():.1f}%" if len(in_range) else "-")
+with col3:
+    st.metric("Puntos por serie", budget, help="Las series mas largas se reducen con LTTB")
+
+
+def trend_chart(frames, value, title, yaxis_title):
+    """Line chart of one downsampled trace per (name, series) pair; returns it and the points drawn"""
+    fig = go.Figure()
+    drawn = total = 0
+    for name, frame in frames:
+        total += int((frame[value].notna() & frame['start_time'].between(start, end)).sum())
+        points = downsample(frame, value, budget, start, end)
+        drawn += len(points)
+        fig.add_trace(go.Scattergl(x=points['start_time'], y=points[value], mode='lines+markers',
+                                   name=name, marker={'size': 4}))
+    fig.update_layout(title=title, yaxis_title=yaxis_title, height=350, hovermode='x unified')
+    return fig, drawn, total
+
+
+by_env = [(env, rows) for env, rows in series.groupby('env', sort=True)]
+sent = full = 0
+for metric, label in RUN_METRICS.items():
+    fig, drawn, total = trend_chart(by_env, metric, label, label)
+    sent, full = sent + drawn, full + total
+    st.plotly_chart(fig, use_container_width=True)
+
+# Per-module average time, for one environment
+st.subheader(":card_index_dividers: Tiempo promedio por modulo")
+module_env = st.selectbox("Ambiente", selected_envs)
+trends = module_trends_from_store(str(STORE_DIR), module_env)
+all_modules = sorted(trends['module'].unique())
+modules = st.multiselect("Modulos", all_modules, default=top_modules(trends))
+
+if modules:
+    per_module = module_series(trends, modules)
+    fig, drawn, total = trend_chart(
+        [(module, rows) for module, rows in per_module.groupby('module', sort=True)],
+        'avg_time', f"Tiempo Promedio por Test - {module_env}", "Segundos"
+    )
+    sent, full = sent + drawn, full + total
+    st.plotly_chart(fig, use_container_width=True)
+
+st.caption(f"{sent} de {full} puntos enviados al navegador en el rango seleccionado.")
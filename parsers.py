@@ -1,14 +1,167 @@
 import pandas as pd
+import numpy as np
 import xml.etree.ElementTree as ET
 import json
+import re
 from datetime import datetime
 import os
+import hashlib
+import threading
+from array import array
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from sketches import PERCENTILES, duration_summary
 
 
-def parse_playwright_junit(path):
-    """Parse Playwright JUnit XML results into DataFrame"""
+RESULT_COLUMNS = ["suite", "name", "module", "status", "time", "timestamp", "browser", "file", "line", "error_message"]
+
+# Compact in-memory schema of parsed results. Low-cardinality columns and
+# test identities (name, file) are categoricals so repeated strings are
+# stored once; run-level columns added by the store follow the same rules.
+RESULT_SCHEMA = {
+    "suite": "category",
+    "name": "category",
+    "module": "category",
+    "status": "category",
+    "time": "float32",
+    "timestamp": "datetime64[ns, UTC]",
+    "browser": "category",
+    "file": "category",
+    "line": "int32",
+    "error_message": "category",
+    "run_id": "category",
+    "env": "category",
+    "tags": "category",
+    "start_offset": "float32",
+    "worker": "int16",
+    "shard": "int16"
+}
+
+# Scheduling of each test, where the report carries it: seconds from the
+# run start to the test start, the worker slot (Playwright parallelIndex)
+# and the shard. Reports without them (JUnit, older JSON) get these defaults.
+TIMELINE_COLUMNS = ["start_offset", "worker", "shard"]
+TIMELINE_DEFAULTS = {"start_offset": np.nan, "worker": -1, "shard": -1}
+
+# Playwright tags in test titles, e.g. "@stable @smoke deberia iniciar sesion"
+TAG_PATTERN = re.compile(r"(?<!\S)@[\w-]+")
+
+# JUnit reports above this size are parsed with iterparse instead of ET.parse
+JUNIT_STREAM_THRESHOLD = 16 * 1024 * 1024
+
+# test-results.json reports above this size are parsed test by test
+JSON_STREAM_THRESHOLD = 16 * 1024 * 1024
+JSON_CHUNK_SIZE = 64 * 1024
+
+# Failure messages are kept for signature clustering, truncated to this length
+ERROR_MESSAGE_MAX_CHARS = 4000
+
+# Memory budget of the process-wide parse cache
+PARSE_CACHE_MAX_BYTES = int(os.environ.get("QA_PARSE_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+
+
+def extract_tags(names):
+    """Tags of each title as a categorical of space-joined, sorted tags ('' when untagged).
+
+    Tags are extracted once per distinct title, so the cost does not grow
+    with the number of rows.
+    """
+    names = names.astype("category")
+    labels = [" ".join(sorted(set(TAG_PATTERN.findall(str(c))))) for c in names.cat.categories]
+    label_codes, uniques = pd.factorize(np.array(labels, dtype=object))
+    codes = names.cat.codes.to_numpy()
+    tag_codes = np.where(codes >= 0, label_codes[codes] if len(label_codes) else 0, -1)
+    return pd.Categorical.from_codes(tag_codes, categories=pd.Index(uniques, dtype=object))
+
+
+def apply_result_schema(df):
+    """Convert a results frame to RESULT_SCHEMA (columns not in the schema are kept as is).
+
+    Also derives the tags column from test titles when it is missing, and
+    fills missing timeline columns with their defaults.
+    """
+    if "name" in df.columns and "tags" not in df.columns:
+        df = df.assign(tags=extract_tags(df["name"]))
+    if "name" in df.columns:
+        missing = {col: value for col, value in TIMELINE_DEFAULTS.items() if col not in df.columns}
+        if missing:
+            df = df.assign(**missing)
+    converted = {}
+    for col, dtype in RESULT_SCHEMA.items():
+        if col not in df.columns or str(df[col].dtype) == dtype:
+            continue
+        if col == "timestamp":
+            converted[col] = pd.to_datetime(df[col], utc=True, format='ISO8601').astype(dtype)
+        else:
+            converted[col] = df[col].astype(dtype)
+    return df.assign(**converted) if converted else df
+
+
+def empty_results():
+    """Empty frame with the result columns and schema"""
+    return apply_result_schema(pd.DataFrame(columns=RESULT_COLUMNS))
+
+
+def concat_results(frames):
+    """Concatenate result frames, keeping categorical columns categorical"""
+    frames = [f for f in frames if not f.empty]
+    if not frames:
+        return empty_results()
+    if len(frames) == 1:
+        return frames[0]
+
+    for col, dtype in RESULT_SCHEMA.items():
+        if dtype != "category" or not all(col in f.columns for f in frames):
+            continue
+        categories = pd.api.types.union_categoricals(
+            [f[col].astype("category").array for f in frames]
+        ).categories
+        frames = [f.assign(**{col: f[col].astype(pd.CategoricalDtype(categories))}) for f in frames]
+    return apply_result_schema(pd.concat(frames, ignore_index=True))
+
+
+def _error_message(error):
+    """Failure message of a test-results.json error object, or None"""
+    if not error:
+        return None
+    message = error.get('message') if isinstance(error, dict) else str(error)
+    return message[:ERROR_MESSAGE_MAX_CHARS] if message else None
+
+
+def _junit_error_message(testcase):
+    """Message of a JUnit failure/error element, or None"""
+    for tag in ('failure', 'error'):
+        elem = testcase.find(tag)
+        if elem is not None:
+            message = elem.text or elem.get('message')
+            return message[:ERROR_MESSAGE_MAX_CHARS] if message else None
+    return None
+
+
+def _junit_status(testcase):
+    """Map the child elements of a JUnit testcase to a result status"""
+    if testcase.find('failure') is not None:
+        return "Failed"
+    elif testcase.find('skipped') is not None:
+        return "Skipped"
+    elif testcase.find('error') is not None:
+        return "Error"
+    return "Passed"
+
+
+def parse_playwright_junit(path, stream=None):
+    """Parse Playwright JUnit XML results into DataFrame
+
+    Reports larger than JUNIT_STREAM_THRESHOLD bytes are parsed in streaming
+    mode unless `stream` is given explicitly.
+    """
     if not os.path.exists(path):
-        return pd.DataFrame(columns=["suite", "name", "module", "status", "time", "timestamp", "browser"])
+        return empty_results()
+
+    if stream is None:
+        stream = os.path.getsize(path) > JUNIT_STREAM_THRESHOLD
+    if stream:
+        return _parse_playwright_junit_stream(path)
 
     tree = ET.parse(path)
     root = tree.getroot()
@@ -22,14 +175,7 @@ def parse_playwright_junit(path):
             name = testcase.get('name', 'Unknown Test')
             classname = testcase.get('classname', '')
             time = float(testcase.get('time', 0))
-            status = "Passed"
-
-            if testcase.find('failure') is not None:
-                status = "Failed"
-            elif testcase.find('skipped') is not None:
-                status = "Skipped"
-            elif testcase.find('error') is not None:
-                status = "Error"
+            status = _junit_status(testcase)
 
             rows.append({
                 "suite": "Playwright",
@@ -38,31 +184,134 @@ def parse_playwright_junit(path):
                 "status": status,
                 "time": time,
                 "timestamp": suite_timestamp,
-                "browser": testsuite.get('hostname', 'unknown')
+                "browser": testsuite.get('hostname', 'unknown'),
+                "file": testcase.get('file', classname),
+                "line": int(testcase.get('line', 0)),
+                "error_message": _junit_error_message(testcase) if status in ("Failed", "Error") else None
             })
 
-    return pd.DataFrame(rows)
+    return apply_result_schema(pd.DataFrame(rows, columns=RESULT_COLUMNS))
+
+
+def _parse_playwright_junit_stream(path):
+    """Parse JUnit XML with iterparse, keeping memory bounded by one testcase.
+
+    Each testcase is appended to typed column buffers and then dropped from
+    the tree, so the element tree never holds more than the current suite
+    header and testcase.
+    """
+    columns = {col: [] for col in RESULT_COLUMNS if col not in ("time", "line")}
+    times = array('d')
+    lines = array('l')
+
+    depth = 0
+    root = testsuite = None
+    suite_name = suite_timestamp = browser = None
+
+    for event, elem in ET.iterparse(path, events=('start', 'end')):
+        if event == 'start':
+            if depth == 0:
+                root = elem
+            elif depth == 1 and elem.tag == 'testsuite':
+                testsuite = elem
+                suite_name = elem.get('name', 'unknown')
+                suite_timestamp = elem.get('timestamp', datetime.now().isoformat())
+                browser = elem.get('hostname', 'unknown')
+            depth += 1
+            continue
+
+        depth -= 1
+        if depth == 2 and elem.tag == 'testcase' and testsuite is not None:
+            classname = elem.get('classname', '')
+            columns["suite"].append("Playwright")
+            columns["name"].append(elem.get('name', 'Unknown Test'))
+            columns["module"].append(classname or suite_name)
+            status = _junit_status(elem)
+            columns["status"].append(status)
+            columns["timestamp"].append(suite_timestamp)
+            columns["browser"].append(browser)
+            columns["file"].append(elem.get('file', classname))
+            columns["error_message"].append(_junit_error_message(elem) if status in ("Failed", "Error") else None)
+            times.append(float(elem.get('time', 0)))
+            lines.append(int(elem.get('line', 0)))
+
+            elem.clear()
+            if len(testsuite) and testsuite[-1] is elem:
+                del testsuite[-1]
+        elif depth == 1:
+            if elem is testsuite:
+                testsuite = None
+            elem.clear()
+            if len(root) and root[-1] is elem:
+                del root[-1]
+
+    columns["time"] = times
+    columns["line"] = lines
+    if not times:
+        return empty_results()
+    return apply_result_schema(pd.DataFrame(columns)[RESULT_COLUMNS])
+
 
+def _module_from_file(file_path):
+    """Spec file name from a (Windows or POSIX) test file path"""
+    if '\\' in file_path:
+        return file_path.split('\\')[-1]
+    elif '/' in file_path:
+        return file_path.split('/')[-1]
+    return file_path
 
-def parse_test_results_json(path):
-    """Parse Playwright test-results.json into DataFrame"""
+
+def _test_worker(t):
+    """Worker slot of a test-results.json test, -1 when not reported"""
+    for key in ('parallelIndex', 'workerIndex'):
+        if t.get(key) is not None:
+            return int(t[key])
+    return -1
+
+
+def _run_shard(summary):
+    """Shard of a run (Playwright's 1-based shard.current), -1 when not sharded"""
+    shard = summary.get('shard')
+    if isinstance(shard, dict):
+        shard = shard.get('current')
+    return int(shard) if shard is not None else -1
+
+
+def _start_offsets(starts, run_start=None):
+    """Seconds from the run start to each test's ISO startTime (NaN when missing)"""
+    if not any(starts):
+        return np.full(len(starts), np.nan)
+    times = pd.to_datetime(pd.Series(starts, dtype=object), utc=True, format='ISO8601', errors='coerce')
+    origin = pd.to_datetime(run_start, utc=True, format='ISO8601') if run_start else times.min()
+    return (times - origin).dt.total_seconds().to_numpy(dtype='float64')
+
+
+def parse_test_results_json(path, stream=None):
+    """Parse Playwright test-results.json into DataFrame
+
+    Reports larger than JSON_STREAM_THRESHOLD bytes are parsed in streaming
+    mode unless `stream` is given explicitly.
+    """
     if not os.path.exists(path):
-        return pd.DataFrame(columns=["suite", "name", "module", "status", "time", "timestamp", "browser"])
+        return empty_results()
+
+    if stream is None:
+        stream = os.path.getsize(path) > JSON_STREAM_THRESHOLD
+    if stream:
+        return _parse_test_results_json_stream(path)
 
     with open(path, 'r', encoding='utf-8') as f:
         data = json.load(f)
 
     rows = []
-    start_time = data.get('summary', {}).get('startTime', datetime.now().isoformat())
+    starts, workers, shards = [], [], []
+    summary = data.get('summary', {})
+    start_time = summary.get('startTime', datetime.now().isoformat())
+    shard = _run_shard(summary)
 
     for t in data.get('tests', []):
         file_path = t.get('file', '')
-        if '\\' in file_path:
-            module = file_path.split('\\')[-1]
-        elif '/' in file_path:
-            module = file_path.split('/')[-1]
-        else:
-            module = file_path
+        module = _module_from_file(file_path)
 
         rows.append({
             "suite": "Playwright",
@@ -71,10 +320,328 @@ def parse_test_results_json(path):
             "status": t.get('status', 'unknown').capitalize(),
             "time": t.get('duration', 0) / 1000,
             "timestamp": start_time,
-            "browser": "chromium"
+            "browser": "chromium",
+            "file": file_path,
+            "line": t.get('line', 0),
+            "error_message": _error_message(t.get('error'))
         })
+        starts.append(t.get('startTime'))
+        workers.append(_test_worker(t))
+        shards.append(t.get('shardIndex', shard))
+
+    return apply_result_schema(pd.DataFrame(rows, columns=RESULT_COLUMNS).assign(
+        start_offset=_start_offsets(starts, summary.get('startTime')),
+        worker=np.array(workers, dtype='int16'),
+        shard=np.array(shards, dtype='int16')
+    ))
+
+
+class _JsonReader:
+    """Incremental reader that decodes a JSON document one value at a time.
 
-    return pd.DataFrame(rows)
+    Only the current chunk and the value being decoded are held in memory,
+    which lets callers walk a large top-level object or array as a stream.
+    """
+
+    def __init__(self, f, chunk_size=JSON_CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self, size):
+        if self.pos:
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        chunk = self.f.read(size)
+        if not chunk:
+            self.eof = True
+        self.buf += chunk
+
+    def peek(self):
+        """Return the next non-whitespace character without consuming it"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buf) or self.eof:
+                return self.buf[self.pos:self.pos + 1]
+            self._fill(self.chunk_size)
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} in JSON stream at offset {self.pos}")
+        self.pos += 1
+
+    def value(self):
+        """Decode the next complete JSON value"""
+        size = self.chunk_size
+        while True:
+            self.peek()
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+                # A value touching the end of the buffer may be truncated (e.g. numbers)
+                if end < len(self.buf) or self.eof:
+                    self.pos = end
+                    return value
+            except ValueError:
+                if self.eof:
+                    raise
+            self._fill(size)
+            size *= 2
+
+    def items(self):
+        """Iterate (key, reader) pairs of an object; the caller must consume each value"""
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(':')
+            yield key, self
+            char = self.peek()
+            self.pos += 1
+            if char == '}':
+                return
+            if char != ',':
+                raise ValueError(f"Malformed JSON object at offset {self.pos}")
+
+    def elements(self):
+        """Iterate the decoded elements of an array one at a time"""
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            char = self.peek()
+            self.pos += 1
+            if char == ']':
+                return
+            if char != ',':
+                raise ValueError(f"Malformed JSON array at offset {self.pos}")
+
+
+def _parse_test_results_json_stream(path):
+    """Parse test-results.json test by test into typed column buffers.
+
+    Each test object is decoded on its own and only the used fields are
+    copied out, so peak memory is about the output frame plus one test.
+    """
+    names, modules, statuses, files, errors, starts, shards = [], [], [], [], [], [], []
+    times = array('d')
+    lines = array('l')
+    workers = array('h')
+    summary = {}
+    file_modules = {}
+
+    with open(path, 'r', encoding='utf-8') as f:
+        reader = _JsonReader(f)
+        for key, value in reader.items():
+            if key != 'tests':
+                item = value.value()
+                if key == 'summary':
+                    summary = item
+                continue
+
+            for t in value.elements():
+                file_path = t.get('file', '')
+                if file_path not in file_modules:
+                    file_modules[file_path] = (file_path, _module_from_file(file_path))
+                file_path, module = file_modules[file_path]
+
+                names.append(t.get('title', 'Unknown'))
+                modules.append(module)
+                statuses.append(t.get('status', 'unknown').capitalize())
+                files.append(file_path)
+                times.append(t.get('duration', 0) / 1000)
+                lines.append(t.get('line', 0))
+                errors.append(_error_message(t.get('error')))
+                starts.append(t.get('startTime'))
+                workers.append(_test_worker(t))
+                shards.append(t.get('shardIndex'))
+
+    if not names:
+        return empty_results()
+
+    start_time = summary.get('startTime', datetime.now().isoformat())
+    return apply_result_schema(pd.DataFrame({
+        "suite": "Playwright",
+        "name": names,
+        "module": modules,
+        "status": statuses,
+        "time": times,
+        "timestamp": start_time,
+        "browser": "chromium",
+        "file": files,
+        "line": lines,
+        "error_message": errors,
+        "start_offset": _start_offsets(starts, summary.get('startTime')),
+        "worker": workers,
+        # The summary usually comes first, but only its end is guaranteed
+        "shard": np.array([_run_shard(summary) if s is None else s for s in shards], dtype='int16')
+    }))
+
+
+def load_test_results_summary(path):
+    """Read the summary block of a Playwright test-results.json
+
+    Stops reading as soon as the summary has been decoded, so the tests
+    array is never parsed when the summary comes first (as Playwright
+    writes it).
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        for key, value in _JsonReader(f).items():
+            item = value.value()
+            if key == 'summary':
+                return item
+    return {}
+
+
+def _file_digest(path):
+    """Content hash of a file, read in chunks"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _estimate_bytes(value, file_size):
+    """Approximate in-memory size of a cached value"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    return file_size
+
+
+class ParseCache:
+    """LRU cache of parsed files, invalidated by file changes instead of a TTL.
+
+    Entries are keyed by (parser, path, content hash). The hash is only
+    recomputed when a file's (mtime, size) changes, so unchanged files cost
+    one stat per lookup and a touched-but-identical file is still a hit.
+    Least recently used entries are evicted once `max_bytes` is exceeded.
+    Concurrent misses on the same entry parse once; the other callers wait
+    for that result. Cached values are shared between callers (and between
+    sessions) and must not be mutated.
+    """
+
+    def __init__(self, max_bytes=PARSE_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._file_stats = {}
+        self._pending = {}
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.shared = 0
+        self.evictions = 0
+
+    def _digest(self, path, stat):
+        with self._lock:
+            known = self._file_stats.get(path)
+        if known and known[0] == stat.st_mtime_ns and known[1] == stat.st_size:
+            return known[2]
+        # Hashed outside the lock: a large changed file must not block lookups of other files
+        digest = _file_digest(path)
+        with self._lock:
+            self._file_stats[path] = (stat.st_mtime_ns, stat.st_size, digest)
+        return digest
+
+    def get(self, path, parse, key=None):
+        """Return parse(path), reusing the cached result while the file is unchanged"""
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        parser_key = key or f"{parse.__module__}.{parse.__qualname__}"
+        entry_key = (parser_key, path, self._digest(path, stat))
+
+        with self._lock:
+            if entry_key in self._entries:
+                self._entries.move_to_end(entry_key)
+                self.hits += 1
+                return self._entries[entry_key][0]
+            pending = self._pending.get(entry_key)
+            owner = pending is None
+            if owner:
+                pending = self._pending[entry_key] = Future()
+                self.misses += 1
+            else:
+                self.shared += 1
+
+        if not owner:
+            # Another session is parsing the same file: wait for its result
+            # instead of parsing (and holding) a second copy
+            return pending.result()
+
+        try:
+            value = parse(path)
+        except BaseException as e:
+            with self._lock:
+                self._pending.pop(entry_key, None)
+            pending.set_exception(e)
+            raise
+        nbytes = _estimate_bytes(value, stat.st_size)
+
+        with self._lock:
+            self._pending.pop(entry_key, None)
+            if entry_key not in self._entries:
+                # Older versions of the same file can never be hit again
+                for stale_key in [k for k in self._entries if k[:2] == entry_key[:2]]:
+                    self._evict(stale_key)
+                self._entries[entry_key] = (value, nbytes)
+                self.bytes += nbytes
+            while self.bytes > self.max_bytes and len(self._entries) > 1:
+                self._evict(next(iter(self._entries)))
+                self.evictions += 1
+        pending.set_result(value)
+        return value
+
+    def _evict(self, entry_key):
+        _, nbytes = self._entries.pop(entry_key)
+        self.bytes -= nbytes
+
+    def stats(self):
+        """Hit/miss counters and current size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "shared": self.shared,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / lookups * 100, 2) if lookups else 0
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._file_stats.clear()
+            self.bytes = 0
+
+
+_parse_cache = ParseCache()
+
+
+def cached_parse(path, parse, key=None):
+    """Parse a file through the process-wide ParseCache"""
+    return _parse_cache.get(path, parse, key=key)
+
+
+def parse_cache_stats():
+    """Hit/miss statistics of the process-wide ParseCache"""
+    return _parse_cache.stats()
+
+
+def load_json(path):
+    """Load a JSON file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
 
 
 def get_all_test_results(data_dir="data"):
@@ -84,7 +651,7 @@ def get_all_test_results(data_dir="data"):
     # Playwright test-results.json (primary)
     json_path = os.path.join(data_dir, "test-results.json")
     if os.path.exists(json_path):
-        json_df = parse_test_results_json(json_path)
+        json_df = cached_parse(json_path, parse_test_results_json)
         if not json_df.empty:
             all_results.append(json_df)
 
@@ -92,14 +659,11 @@ def get_all_test_results(data_dir="data"):
     if not all_results:
         junit_path = os.path.join(data_dir, "junit-report.xml")
         if os.path.exists(junit_path):
-            junit_df = parse_playwright_junit(junit_path)
+            junit_df = cached_parse(junit_path, parse_playwright_junit)
             if not junit_df.empty:
                 all_results.append(junit_df)
 
-    if all_results:
-        return pd.concat(all_results, ignore_index=True)
-
-    return pd.DataFrame(columns=["suite", "name", "module", "status", "time", "timestamp", "browser"])
+    return concat_results(all_results)
 
 
 def get_available_environments(data_dir="data"):
@@ -118,13 +682,26 @@ def load_environment_results(data_dir="data"):
     results = {}
     for env_name, path in envs.items():
         if os.path.exists(path):
-            with open(path, 'r', encoding='utf-8') as f:
-                results[env_name] = json.load(f)
+            results[env_name] = cached_parse(path, load_json)
     return results
 
 
+def load_environment_summaries(data_dir="data", max_workers=8):
+    """Load only the summary block of every environment file, in parallel"""
+    envs = get_available_environments(data_dir)
+    if not envs:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(envs))) as pool:
+        summaries = pool.map(lambda path: cached_parse(path, load_test_results_summary), envs.values())
+        return dict(zip(envs.keys(), summaries))
+
+
 def calculate_metrics(df):
-    """Calculate key QA metrics from test results"""
+    """Calculate key QA metrics from test results
+
+    Status counts come from one pass over the status column and duration
+    percentiles from one sort of the durations.
+    """
     if df.empty:
         return {
             "total_tests": 0,
@@ -133,17 +710,22 @@ def calculate_metrics(df):
             "skipped": 0,
             "pass_rate": 0,
             "avg_execution_time": 0,
-            "total_execution_time": 0
+            "total_execution_time": 0,
+            **{f"p{p}_execution_time": 0 for p in PERCENTILES},
+            "max_execution_time": 0
         }
 
     total_tests = len(df)
-    passed = len(df[df['status'] == 'Passed'])
-    failed = len(df[df['status'] == 'Failed'])
-    skipped = len(df[df['status'] == 'Skipped'])
+    status_counts = df['status'].value_counts()
+    passed = int(status_counts.get('Passed', 0))
+    failed = int(status_counts.get('Failed', 0))
+    skipped = int(status_counts.get('Skipped', 0))
 
+    times = df['time'].to_numpy(dtype='float64')
+    total_execution_time = float(times.sum())
     pass_rate = (passed / total_tests * 100) if total_tests > 0 else 0
-    avg_execution_time = df['time'].mean() if total_tests > 0 else 0
-    total_execution_time = df['time'].sum()
+    avg_execution_time = total_execution_time / total_tests if total_tests > 0 else 0
+    durations = duration_summary(times)
 
     return {
         "total_tests": total_tests,
@@ -152,5 +734,7 @@ def calculate_metrics(df):
         "skipped": skipped,
         "pass_rate": round(pass_rate, 2),
         "avg_execution_time": round(avg_execution_time, 2),
-        "total_execution_time": round(total_execution_time, 2)
+        "total_execution_time": round(total_execution_time, 2),
+        **{f"p{p}_execution_time": round(durations[f"p{p}"], 2) for p in PERCENTILES},
+        "max_execution_time": round(durations["max"], 2)
     }
@@ -0,0 +1,165 @@
+import pandas as pd
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+
+# Profiling is off unless QA_PERF=1, QA_PERF_LOG is set, or the page is
+# opened with ?debug=perf. QA_PERF_LOG is a JSONL file that gets one line
+# per rerun, for scraping.
+PERF_ENV = "QA_PERF"
+PERF_LOG_ENV = "QA_PERF_LOG"
+DEBUG_PARAM = "debug"
+DEBUG_VALUE = "perf"
+HISTORY_SIZE = 50
+
+STAGE_COLUMNS = ["stage", "seconds", "rows", "bytes"]
+
+_history = deque(maxlen=HISTORY_SIZE)
+# Sessions run on their own threads: appends and reads of _history take this lock
+_history_lock = threading.Lock()
+_log_lock = threading.Lock()
+
+
+def perf_enabled(query_params=None):
+    """Whether this rerun should be profiled"""
+    if os.environ.get(PERF_ENV, "") not in ("", "0") or os.environ.get(PERF_LOG_ENV):
+        return True
+    return query_params is not None and query_params.get(DEBUG_PARAM) == DEBUG_VALUE
+
+
+def payload_bytes(obj):
+    """Approximate bytes sent to the browser for a figure, frame or string"""
+    if obj is None:
+        return 0
+    if isinstance(obj, (bytes, bytearray)):
+        return len(obj)
+    if isinstance(obj, str):
+        return len(obj.encode('utf-8'))
+    if isinstance(obj, pd.DataFrame):
+        # st.dataframe ships frames as Arrow tables
+        import pyarrow as pa
+        return pa.Table.from_pandas(obj, preserve_index=False).nbytes
+    if hasattr(obj, 'to_plotly_json'):
+        return len(obj.to_json())
+    return 0
+
+
+class _NullStage:
+    """Stage used when profiling is off: no clock reads and no payload sizing"""
+    rows = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def payload(self, obj):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    def __init__(self, profiler, name, rows):
+        self.profiler = profiler
+        self.name = name
+        self.rows = rows
+        self.bytes = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler.stages.append({
+            "stage": self.name,
+            "seconds": time.perf_counter() - self.start,
+            "rows": self.rows,
+            "bytes": self.bytes
+        })
+        return False
+
+    def payload(self, obj):
+        """Add the serialized size of something rendered in this stage"""
+        self.bytes = (self.bytes or 0) + payload_bytes(obj)
+
+
+class Profiler:
+    """Per-rerun timings of the stages of a page.
+
+        profiler = Profiler("main", perf_enabled(st.query_params))
+        with profiler.stage("filter") as s:
+            filtered = df[mask]
+            s.rows = len(filtered)
+
+    When disabled, stage() returns a shared no-op context manager.
+    """
+
+    def __init__(self, page, enabled=False):
+        self.page = page
+        self.enabled = enabled
+        self.stages = []
+        self.start = time.perf_counter()
+
+    def stage(self, name, rows=None):
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name, rows)
+
+    def finish(self):
+        """Close the rerun: keep it for the debug panel and append it to QA_PERF_LOG"""
+        record = {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+            "page": self.page,
+            "seconds": time.perf_counter() - self.start,
+            "stages": self.stages
+        }
+        with _history_lock:
+            _history.append(record)
+
+        log_path = os.environ.get(PERF_LOG_ENV)
+        if log_path:
+            line = json.dumps(record) + "\n"
+            with _log_lock, open(log_path, 'a', encoding='utf-8') as f:
+                f.write(line)
+        return record
+
+
+def stages_frame(record):
+    """Stages of one rerun as a table"""
+    return pd.DataFrame(record['stages'], columns=STAGE_COLUMNS)
+
+
+def history_frame(page):
+    """Median and max seconds per stage over the recent reruns of a page"""
+    with _history_lock:
+        records = list(_history)
+    rows = [stage for record in records if record['page'] == page for stage in record['stages']]
+    if not rows:
+        return pd.DataFrame(columns=["stage", "reruns", "p50_seconds", "max_seconds"])
+    frame = pd.DataFrame(rows)
+    return (
+        frame.groupby('stage', sort=False)['seconds']
+        .agg(reruns='size', p50_seconds='median', max_seconds='max')
+        .reset_index()
+    )
+
+
+def render_panel(profiler):
+    """Sidebar debug panel with this rerun's stages and recent history"""
+    if not profiler.enabled:
+        return
+    import streamlit as st
+
+    record = profiler.finish()
+    with st.sidebar.expander(":stopwatch: Rendimiento", expanded=True):
+        st.caption(f"Rerun: {record['seconds']:.3f}s")
+        st.dataframe(stages_frame(record), use_container_width=True, hide_index=True)
+        st.caption(f"Ultimos {HISTORY_SIZE} reruns")
+        st.dataframe(history_frame(profiler.page), use_container_width=True, hide_index=True)
@@ -0,0 +1,101 @@
+"""Background refresh of the dashboard data (stale-while-revalidate).
+
+One thread per process polls the reports in data/. When they change it
+ingests them and builds a new snapshot off the request path, then swaps it
+in with a single assignment. Sessions keep reading the version they were
+given until the swap and never wait on parsing; only the first build of a
+store without any snapshot is waited for.
+"""
+import os
+import threading
+from snapshot import source_stats, load_snapshot, write_snapshot
+
+
+# Seconds between checks of data/: a stat of each report, so polling stays
+# cheap and works on every platform and filesystem, unlike inotify.
+POLL_INTERVAL = 2.0
+FIRST_BUILD_TIMEOUT = 300
+
+_refreshers = {}
+_refreshers_lock = threading.Lock()
+
+
+class DataRefresher(threading.Thread):
+    """Keeps `current` at the snapshot of the reports in a data directory.
+
+    Starts from the stored snapshot even when the reports changed since it
+    was written, so a restarted server answers at once with the previous
+    data while the new version is built. A failed refresh keeps the current
+    version and records the error.
+    """
+
+    def __init__(self, data_dir, store_dir, interval=POLL_INTERVAL):
+        super().__init__(daemon=True, name=f"data-refresh {data_dir}")
+        self.data_dir = data_dir
+        self.store_dir = store_dir
+        self.interval = interval
+        self.current = load_snapshot(data_dir, store_dir, stale=True)
+        self.refreshing = False
+        self.refreshes = 0
+        self.error = None
+        # Reports a build failed on: not retried until they change (or poke())
+        self.failed_sources = None
+        self.ready = threading.Event()
+        self._wake = threading.Event()
+        if self.current is not None:
+            self.ready.set()
+
+    def run(self):
+        while True:
+            try:
+                self.check()
+            except Exception as e:
+                self.error = f"{type(e).__name__}: {e}"
+            finally:
+                # Also when the first build failed: waiting sessions fall back to loading directly
+                self.ready.set()
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def check(self):
+        """Build and swap in a new version if the reports changed; whether one was"""
+        sources = source_stats(self.data_dir)
+        if self.current is not None and self.current['sources'] == sources:
+            return False
+        if sources == self.failed_sources:
+            return False
+        self.refreshing = True
+        try:
+            # Another process (ingest.py) may already have written the new snapshot
+            snapshot = load_snapshot(self.data_dir, self.store_dir) or write_snapshot(self.data_dir, self.store_dir)
+        except BaseException:
+            self.failed_sources = sources
+            raise
+        finally:
+            self.refreshing = False
+        self.current = snapshot
+        self.refreshes += 1
+        self.error = None
+        self.failed_sources = None
+        return True
+
+    def poke(self):
+        """Check for new reports now instead of at the next poll, retrying a failed build"""
+        self.failed_sources = None
+        self._wake.set()
+
+    def snapshot(self, timeout=FIRST_BUILD_TIMEOUT):
+        """The current version; waits only while no version exists yet"""
+        self.ready.wait(timeout)
+        return self.current
+
+
+def get_refresher(data_dir, store_dir, interval=POLL_INTERVAL):
+    """The process's refresher for a data directory, started on first use"""
+    key = (os.path.abspath(data_dir), os.path.abspath(store_dir))
+    with _refreshers_lock:
+        refresher = _refreshers.get(key)
+        if refresher is None:
+            refresher = _refreshers[key] = DataRefresher(data_dir, store_dir, interval)
+            refresher.start()
+    return refresher
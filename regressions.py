@@ -0,0 +1,226 @@
+import pandas as pd
+import numpy as np
+import warnings
+from parsers import cached_parse
+from store import duration_state_paths
+from diff import identity_hashes
+
+
+# Durations kept per environment: one column per run, named by run id,
+# for the last DURATION_WINDOW runs. Only passed results are kept, since a
+# failing test's time says more about the failure than about the test.
+DURATION_WINDOW = 30
+STATE_KEY_COLUMNS = ["key", "name", "module", "file", "line"]
+
+# The last RECENT_RUNS runs are compared against the baseline formed by the
+# runs before them (medians, MAD and robust z-score, shown for context).
+# A regression is decided on the most likely change point instead, so a
+# gradual slowdown, which inflates the baseline MAD, is caught as well as a
+# step: its score must reach CHANGE_THRESHOLD and the median after it must
+# be MIN_SHIFT_RATIO times and MIN_SHIFT_SECONDS seconds above the median
+# before it, so stable sub-second tests are not flagged for noise.
+RECENT_RUNS = 5
+CHANGE_THRESHOLD = 5.0
+MIN_SHIFT_RATIO = 1.25
+MIN_SHIFT_SECONDS = 1.0
+# Shortest segment on either side of a change point
+MIN_SEGMENT = 3
+# Share of a module's tests that must have run for its total to count
+MODULE_MIN_COVERAGE = 0.5
+
+REGRESSION_COLUMNS = [
+    "env", "level", "key", "name", "module", "runs", "baseline_median", "baseline_mad",
+    "recent_median", "shift_seconds", "shift_ratio", "robust_z", "change_run", "change_score", "regression"
+]
+
+
+def duration_columns(state):
+    """Run ids of a duration state, oldest first"""
+    return [c for c in state.columns if c not in STATE_KEY_COLUMNS]
+
+
+def run_durations(df):
+    """Duration of each passed test of a run, one row per test identity"""
+    passed = df[df['status'] == 'Passed']
+    keys = identity_hashes(passed)
+    keep = ~pd.Index(keys).duplicated(keep='last')
+    rows = passed[keep]
+    return pd.DataFrame({
+        "key": keys[keep],
+        "name": rows['name'].astype(str).to_numpy(),
+        "module": rows['module'].astype(str).to_numpy(),
+        "file": rows['file'].astype(str).to_numpy(),
+        "line": rows['line'].to_numpy(dtype='int64'),
+        "time": rows['time'].to_numpy(dtype='float32')
+    })
+
+
+def append_run(state, run_id, df, window=DURATION_WINDOW):
+    """Duration state with a newer run added and runs beyond the window dropped.
+
+    Tests new in this run get a row; tests that no longer appear in any
+    run of the window are removed. Labels follow the latest run.
+    """
+    durations = run_durations(df).set_index('key')
+    labels = ["name", "module", "file", "line"]
+    if state is None or state.empty:
+        state = durations[labels]
+    else:
+        state = state.set_index('key')
+        new_keys = durations.index.difference(state.index)
+        state = pd.concat([state, durations.loc[new_keys, labels]])
+        state.loc[durations.index, labels] = durations[labels]
+    state = state.assign(**{run_id: durations['time'].reindex(state.index).astype('float32')})
+
+    runs = [c for c in state.columns if c not in labels][-window:]
+    state = state[state[runs].notna().any(axis=1)]
+    return state.reset_index()[STATE_KEY_COLUMNS + runs]
+
+
+def build_state(runs, window=DURATION_WINDOW):
+    """Duration state from (run_id, df) pairs in start time order"""
+    state = None
+    for run_id, df in runs:
+        state = append_run(state, run_id, df, window)
+    return state if state is not None else pd.DataFrame(columns=STATE_KEY_COLUMNS)
+
+
+def module_durations(state):
+    """Per-module total duration per run, shaped like a duration state.
+
+    A run's total is left empty when fewer than MODULE_MIN_COVERAGE of the
+    module's tests passed in it, so a partial run does not look faster.
+    """
+    runs = duration_columns(state)
+    if state.empty:
+        return pd.DataFrame(columns=STATE_KEY_COLUMNS + runs)
+    grouped = state.groupby('module', sort=True)[runs]
+    totals = grouped.sum(min_count=1)
+    coverage = grouped.count().div(grouped.size(), axis=0)
+    totals = totals.where(coverage >= MODULE_MIN_COVERAGE)
+    modules = totals.index.to_numpy()
+    return pd.DataFrame({
+        "key": np.arange(len(modules), dtype='uint64'),
+        "name": modules,
+        "module": modules,
+        "file": "",
+        "line": 0,
+        **{run: totals[run].to_numpy(dtype='float64') for run in runs}
+    })
+
+
+def change_points(values, min_segment=MIN_SEGMENT):
+    """Most likely upward shift in each row of a (series x runs) matrix.
+
+    For every split of every row, a two-sample t statistic compares the
+    mean log duration after the split with the mean before it. Prefix sums
+    give all splits of all rows in a few array operations. Missing runs
+    (NaN) are skipped. Returns the split column (first run after the
+    shift) and its score; -1 and NaN when a row is too short.
+    """
+    n_rows, n_runs = values.shape
+    if n_runs < 2 * min_segment:
+        return np.full(n_rows, -1), np.full(n_rows, np.nan)
+
+    x = np.log1p(values)
+    valid = ~np.isnan(x)
+    x = np.where(valid, x, 0.0)
+    count = np.cumsum(valid, axis=1)
+    total = np.cumsum(x, axis=1)
+    squares = np.cumsum(x * x, axis=1)
+    n, s, q = count[:, -1:], total[:, -1:], squares[:, -1:]
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Split after column k: left = runs 0..k, right = the rest
+        n1, n2 = count, n - count
+        mean1, mean2 = total / n1, (s - total) / n2
+        ss = (squares - total ** 2 / n1) + ((q - squares) - (s - total) ** 2 / n2)
+        variance = np.maximum(ss / (n - 2), 1e-12)
+        score = (mean2 - mean1) / np.sqrt(variance * (1 / n1 + 1 / n2))
+    # Only splits right after an observed run, with enough runs on both sides
+    score[(n1 < min_segment) | (n2 < min_segment) | ~valid] = -np.inf
+
+    best = score.argmax(axis=1)
+    best_score = score[np.arange(n_rows), best]
+    found = np.isfinite(best_score)
+    return np.where(found, best + 1, -1), np.where(found, best_score, np.nan)
+
+
+def _score_series(series, env, level):
+    runs = duration_columns(series)
+    values = series[runs].to_numpy(dtype='float64')
+    baseline = values[:, :-RECENT_RUNS]
+    recent = values[:, -RECENT_RUNS:]
+
+    with warnings.catch_warnings():
+        # Series that have not run in one of the windows are all-NaN there
+        warnings.simplefilter('ignore', RuntimeWarning)
+        baseline_median = np.nanmedian(baseline, axis=1)
+        baseline_mad = np.nanmedian(np.abs(baseline - baseline_median[:, None]), axis=1)
+        recent_median = np.nanmedian(recent, axis=1)
+        shift = recent_median - baseline_median
+        # 1.4826 * MAD estimates the standard deviation of normal data
+        robust_z = shift / np.maximum(1.4826 * baseline_mad, 0.05 * baseline_median)
+        ratio = recent_median / baseline_median
+
+    split, score = change_points(values)
+    run_labels = np.array(runs + [None], dtype=object)
+    after_split = np.arange(len(runs))[None, :] >= split[:, None]
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        before_median = np.nanmedian(np.where(after_split, np.nan, values), axis=1)
+        after_median = np.nanmedian(np.where(after_split, values, np.nan), axis=1)
+    with np.errstate(invalid='ignore'):
+        regression = (
+            (split >= 0)
+            & (score >= CHANGE_THRESHOLD)
+            & (after_median >= MIN_SHIFT_RATIO * before_median)
+            & (after_median - before_median >= MIN_SHIFT_SECONDS)
+        )
+    return pd.DataFrame({
+        "env": env,
+        "level": level,
+        "key": series['key'].to_numpy(),
+        "name": series['name'].to_numpy(),
+        "module": series['module'].to_numpy(),
+        "runs": np.sum(~np.isnan(values), axis=1),
+        "baseline_median": np.round(baseline_median, 2),
+        "baseline_mad": np.round(baseline_mad, 2),
+        "recent_median": np.round(recent_median, 2),
+        "shift_seconds": np.round(shift, 2),
+        "shift_ratio": np.round(ratio, 2),
+        "robust_z": np.round(robust_z, 1),
+        "change_run": run_labels[split],
+        "change_score": np.round(score, 1),
+        "regression": regression
+    })
+
+
+def detect_regressions(state, env):
+    """Duration regressions of tests and modules in one environment's state.
+
+    Rows are ranked with regressions first, by seconds added to the recent
+    median. The state holds a fixed window of runs, so the cost depends on
+    the number of tests, not on the length of the history.
+    """
+    if state.empty or len(duration_columns(state)) <= RECENT_RUNS:
+        return pd.DataFrame(columns=REGRESSION_COLUMNS)
+    result = pd.concat([
+        _score_series(state, env, "test"),
+        _score_series(module_durations(state), env, "module")
+    ], ignore_index=True)
+    return result.sort_values(['regression', 'shift_seconds'], ascending=False, ignore_index=True)
+
+
+def regressions_from_store(store_dir, envs=None):
+    """Regressions of every environment, recomputed only when its state changes"""
+    frames = []
+    for env, path in duration_state_paths(store_dir, envs).items():
+        def compute(path, env=env):
+            return detect_regressions(pd.read_parquet(path), env)
+        frames.append(cached_parse(path, compute, key=f"regressions.detect_regressions[{env}]"))
+    if not frames:
+        return pd.DataFrame(columns=REGRESSION_COLUMNS)
+    return pd.concat(frames, ignore_index=True).sort_values(
+        ['regression', 'shift_seconds'], ascending=False, ignore_index=True
+    )
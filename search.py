@@ -0,0 +1,113 @@
+import pandas as pd
+import numpy as np
+import re
+import weakref
+
+
+SEARCH_COLUMNS = ["name", "module"]
+TOKEN_PATTERN = re.compile(r"@?\w+")
+
+_indexes = {}
+
+
+def _column_codes(values):
+    """Integer codes and their labels for a column, categorical or not"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy(), [str(c) for c in values.cat.categories]
+    codes, uniques = pd.factorize(values)
+    return codes, [str(u) for u in uniques]
+
+
+class ResultIndex:
+    """Inverted index over test titles and modules, plus cached sort orders.
+
+    Tokens (words and @tags, lowercased) map to the codes of the distinct
+    titles and modules that contain them. A query term matches any token
+    that contains it, so substring search only scans the vocabulary; rows
+    are then selected with one lookup of their codes, never by comparing
+    strings. Built once per DataFrame by get_index.
+    """
+
+    def __init__(self, df):
+        # Weak, so the index does not keep its frame (and itself) alive
+        self._df = weakref.ref(df)
+        self.size = len(df)
+        self._codes = {}
+        self._vocabulary = {}
+        self._orders = {}
+        for column in SEARCH_COLUMNS:
+            if column not in df.columns:
+                continue
+            codes, labels = _column_codes(df[column])
+            self._codes[column] = (codes, len(labels))
+            for code, label in enumerate(labels):
+                for token in set(TOKEN_PATTERN.findall(label.lower())):
+                    self._vocabulary.setdefault(token, {}).setdefault(column, []).append(code)
+
+    def _term_rows(self, term):
+        matches = {}
+        for token, columns in self._vocabulary.items():
+            if term in token:
+                for column, codes in columns.items():
+                    matches.setdefault(column, set()).update(codes)
+        mask = np.zeros(self.size, dtype=bool)
+        for column, codes in matches.items():
+            row_codes, n_values = self._codes[column]
+            # One extra slot so missing values (code -1) never match
+            hit = np.zeros(n_values + 1, dtype=bool)
+            hit[list(codes)] = True
+            mask |= hit[row_codes]
+        return mask
+
+    def search(self, query):
+        """Boolean row mask of rows matching every term of query; None for an empty query"""
+        terms = TOKEN_PATTERN.findall((query or "").lower())
+        if not terms:
+            return None
+        mask = np.ones(self.size, dtype=bool)
+        for term in terms:
+            mask &= self._term_rows(term)
+        return mask
+
+    def sort_order(self, column):
+        """Row positions in ascending order of column, computed once"""
+        order = self._orders.get(column)
+        if order is None:
+            values = self._df()[column]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                # Rank categories alphabetically, then sort rows by rank
+                labels = np.asarray(values.cat.categories.astype(str))
+                ranks = np.empty(len(labels) + 1, dtype='int64')
+                ranks[:-1] = np.argsort(np.argsort(labels, kind='stable'), kind='stable')
+                ranks[-1] = len(labels)  # missing values (code -1) last
+                order = np.argsort(ranks[values.cat.codes.to_numpy()], kind='stable')
+            else:
+                order = np.argsort(values.to_numpy(), kind='stable')
+            self._orders[column] = order
+        return order
+
+    def ordered_rows(self, mask, column=None, descending=False):
+        """Positions of the rows selected by mask, sorted by column if given"""
+        if column is None:
+            return np.flatnonzero(mask)
+        order = self.sort_order(column)
+        if descending:
+            order = order[::-1]
+        return order[mask[order]]
+
+
+def get_index(df):
+    """ResultIndex for df, built once per DataFrame object (see cube.get_cube)"""
+    key = id(df)
+    index = _indexes.get(key)
+    if index is None:
+        index = ResultIndex(df)
+        _indexes[key] = index
+        weakref.finalize(df, _indexes.pop, key, None)
+    return index
+
+
+def page_rows(rows, page, page_size):
+    """Slice of row positions for a 1-based page number"""
+    start = (page - 1) * page_size
+    return rows[start:start + page_size]
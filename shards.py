@@ -0,0 +1,201 @@
+"""Shard planner: balanced assignment of spec files to CI shards.
+
+Each spec file of an environment's latest run is weighted by the p90 of
+its tests' durations over the runs kept in the duration state, and files
+are assigned to shards longest first, each to the least loaded shard
+(LPT). The predicted makespan is compared with the split by file count.
+
+    python shards.py --env QA --shards 4
+    python shards.py --env QA --shards 4 --workers 2 --out shard-manifest.json
+"""
+import argparse
+import heapq
+import json
+import os
+import sys
+import warnings
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+from store import get_store_dir, sync_data_dir, select_runs, load_run, load_duration_state
+from regressions import duration_columns
+from diff import identity_hashes
+from timeline import setup_files
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+# Percentile of each test's duration used as its weight: a shard planned
+# on medians overruns whenever a few of its tests are slow at once.
+SHARD_PERCENTILE = 90
+
+PLAN_COLUMNS = ["file", "spec", "tests", "seconds", "history", "shard", "current_shard"]
+
+
+def spec_names(files):
+    """Spec paths relative to the directory shared by every file, with '/' separators"""
+    parts = [str(f).replace('\\', '/').split('/') for f in files]
+    if not parts:
+        return []
+    common = 0
+    shortest = min(len(p) for p in parts)
+    while common < shortest - 1 and all(p[common] == parts[0][common] for p in parts):
+        common += 1
+    return ['/'.join(p[common:]) for p in parts]
+
+
+def spec_durations(latest, state, percentile=SHARD_PERCENTILE):
+    """Expected seconds of every spec file in a run, from the duration history.
+
+    Tests are weighted by the given percentile of their passed durations in
+    the state; tests without history (new, or never passed in the window)
+    by their duration in the run. Skipped tests weigh nothing.
+    """
+    tests = latest[latest['status'] != 'Skipped']
+    seconds = tests['time'].to_numpy(dtype='float64')
+    known = np.zeros(len(tests), dtype=bool)
+    if state is not None and not state.empty and len(tests):
+        runs = duration_columns(state)
+        with warnings.catch_warnings():
+            # Tests that never passed in the window are all-NaN
+            warnings.simplefilter('ignore', RuntimeWarning)
+            quantiles = pd.Series(
+                np.nanpercentile(state[runs].to_numpy(dtype='float64'), percentile, axis=1),
+                index=state['key'].to_numpy()
+            )
+        weights = quantiles.reindex(identity_hashes(tests)).to_numpy()
+        known = ~np.isnan(weights)
+        seconds = np.where(known, weights, seconds)
+
+    files = pd.DataFrame({
+        "file": tests['file'].astype(str).to_numpy(), "seconds": seconds, "history": known
+    }).groupby('file', sort=True).agg(tests=('seconds', 'size'), seconds=('seconds', 'sum'), history=('history', 'sum'))
+    files = files.reset_index()
+    files['setup'] = setup_files(files['file'])
+    return files
+
+
+def assign_lpt(seconds, n_shards):
+    """Shard of each file: longest first, each to the least loaded shard"""
+    shards = np.zeros(len(seconds), dtype='int64')
+    loads = [(0.0, shard) for shard in range(n_shards)]
+    for i in np.argsort(-np.asarray(seconds), kind='stable'):
+        load, shard = heapq.heappop(loads)
+        shards[i] = shard
+        heapq.heappush(loads, (load + seconds[i], shard))
+    return shards
+
+
+def assign_by_count(n_files, n_shards):
+    """Shard of each file when files, in path order, are split into equal-count chunks"""
+    return np.repeat(np.arange(n_shards), [len(c) for c in np.array_split(np.arange(n_files), n_shards)])
+
+
+def shard_seconds(files, shards, n_shards, workers=1, setup_seconds=0.0):
+    """Predicted duration of each shard.
+
+    Every shard runs the setup projects first; its workers then share the
+    spec files, and no shard finishes before its longest file.
+    """
+    seconds = files['seconds'].to_numpy()
+    total = np.bincount(shards, weights=seconds, minlength=n_shards)
+    longest = np.zeros(n_shards)
+    np.maximum.at(longest, shards, seconds)
+    return setup_seconds + np.maximum(total / workers, longest)
+
+
+def plan_shards(latest, state, n_shards, workers=1, percentile=SHARD_PERCENTILE):
+    """Balanced shard plan of a run's spec files and its prediction.
+
+    Returns the plan (PLAN_COLUMNS, one row per spec file, shards numbered
+    from 1 like Playwright's --shard) and a summary with the predicted
+    per-shard durations and makespans of the plan and of the split by file
+    count.
+    """
+    durations = spec_durations(latest, state, percentile)
+    setup_seconds = float(durations.loc[durations['setup'], 'seconds'].sum())
+    files = durations[~durations['setup']]
+    files = files.assign(spec=spec_names(files['file'])).sort_values('spec', ignore_index=True)
+
+    balanced = assign_lpt(files['seconds'].to_numpy(), n_shards)
+    current = assign_by_count(len(files), n_shards)
+    loads = shard_seconds(files, balanced, n_shards, workers, setup_seconds)
+    current_loads = shard_seconds(files, current, n_shards, workers, setup_seconds)
+    plan = files.assign(shard=balanced + 1, current_shard=current + 1)[PLAN_COLUMNS]
+    return plan.sort_values(['shard', 'seconds'], ascending=[True, False], ignore_index=True), {
+        "shards": n_shards,
+        "workers": workers,
+        "percentile": percentile,
+        "setup_seconds": setup_seconds,
+        "loads": loads,
+        "current_loads": current_loads,
+        "makespan": float(loads.max()) if n_shards else 0.0,
+        "current_makespan": float(current_loads.max()) if n_shards else 0.0
+    }
+
+
+def plan_from_store(store_dir, env, n_shards, workers=1, percentile=SHARD_PERCENTILE):
+    """Shard plan for the latest run of an environment; None when it has no runs"""
+    runs = select_runs(store_dir, [env])
+    if runs.empty:
+        return None
+    run_id = runs.sort_values('start_time')['run_id'].iloc[-1]
+    plan, summary = plan_shards(load_run(store_dir, run_id), load_duration_state(store_dir, env),
+                                n_shards, workers, percentile)
+    return plan, {**summary, "env": env, "run_id": run_id}
+
+
+def shard_manifest(plan, summary):
+    """JSON-ready manifest: the spec files of each shard and its predicted seconds"""
+    return {
+        "generated": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        "env": summary.get("env"),
+        "run_id": summary.get("run_id"),
+        "percentile": summary["percentile"],
+        "workers": summary["workers"],
+        "predicted_makespan": round(summary["makespan"], 1),
+        "current_makespan": round(summary["current_makespan"], 1),
+        "shards": [
+            {
+                "shard": shard,
+                "predicted_seconds": round(float(summary["loads"][shard - 1]), 1),
+                "files": list(plan.loc[plan['shard'] == shard, 'spec'])
+            }
+            for shard in range(1, summary["shards"] + 1)
+        ]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data-dir", default=DATA_DIR, help="Dashboard data directory")
+    parser.add_argument("--store-dir", default=None, help="Run store (default: QA_STORE_DIR or data/store)")
+    parser.add_argument("--env", required=True, help="Environment whose history weights the files")
+    parser.add_argument("--shards", type=int, default=4, help="Number of CI shards")
+    parser.add_argument("--workers", type=int, default=1, help="Playwright workers per shard")
+    parser.add_argument("--percentile", type=float, default=SHARD_PERCENTILE, help="Duration percentile per test")
+    parser.add_argument("--out", default=None, help="Write the manifest here instead of stdout")
+    args = parser.parse_args()
+    if args.shards < 1 or args.workers < 1:
+        parser.error("--shards and --workers must be at least 1")
+
+    store_dir = args.store_dir or get_store_dir(args.data_dir)
+    if os.path.isdir(args.data_dir):
+        sync_data_dir(args.data_dir, store_dir)
+    result = plan_from_store(store_dir, args.env, args.shards, args.workers, args.percentile)
+    if result is None:
+        print(f"No runs of environment {args.env} in {store_dir}", file=sys.stderr)
+        sys.exit(1)
+
+    plan, summary = result
+    manifest = json.dumps(shard_manifest(plan, summary), indent=2, ensure_ascii=False)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            f.write(manifest + "\n")
+    else:
+        print(manifest)
+    print(f"Predicted makespan {summary['makespan']:.0f}s with {args.shards} shards "
+          f"(split by file count: {summary['current_makespan']:.0f}s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
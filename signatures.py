@@ -0,0 +1,244 @@
+import pandas as pd
+import numpy as np
+import hashlib
+import os
+import re
+from parsers import cached_parse
+from store import load_failures, RUNS_FILE
+from flaky import FAILED_STATUSES, identity_codes
+
+
+SIGNATURE_HISTORY_COLUMNS = ["name", "module", "file", "line", "status", "env", "timestamp", "error_message"]
+SIGNATURE_COLUMNS = [
+    "signature_id", "signature", "occurrences", "tests", "fingerprints",
+    "envs", "first_seen", "last_seen", "example"
+]
+
+# MinHash/LSH parameters: 64 hashes in 16 bands of 4. Messages whose
+# shingle sets have Jaccard similarity 0.7 share a band with probability
+# about 0.99; candidates are kept only when their estimated similarity
+# reaches SIMILARITY_THRESHOLD. Shingles are word pairs: with single words
+# the boilerplate every Playwright failure shares (expect, locator,
+# expected, received, timeout) decided the score.
+MINHASH_PERMUTATIONS = 64
+LSH_BANDS = 16
+SHINGLE_SIZE = 2
+SIMILARITY_THRESHOLD = 0.7
+SIGNATURE_MAX_CHARS = 1000
+
+# Multiply-shift hash family over 64-bit shingle hashes (arithmetic wraps mod 2**64)
+_rng = np.random.default_rng(20260212)
+_HASH_A = _rng.integers(0, np.iinfo(np.uint64).max, MINHASH_PERMUTATIONS, dtype=np.uint64) | np.uint64(1)
+_HASH_B = _rng.integers(0, np.iinfo(np.uint64).max, MINHASH_PERMUTATIONS, dtype=np.uint64)
+
+TOKEN_PATTERN = re.compile(r"<\w+>|\w+")
+ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;]*[A-Za-z]")
+_NORMALIZERS = [
+    (re.compile(r"https?://[^\s\"'`)]+"), "<url>"),
+    (re.compile(r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?"), "<ts>"),
+    (re.compile(r"\b[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}\b", re.I), "<id>"),
+    (re.compile(r"\b(?=[0-9a-f]*\d)[0-9a-f]{8,}\b", re.I), "<id>"),
+    (re.compile(r"(?:[A-Za-z]:)?[\w.\\/-]*[\\/][\w.-]+\.(?:[cm]?[jt]sx?)(?::\d+)*"), "<file>"),
+    (re.compile(r"\d+(?:[.,]\d+)?"), "<n>"),
+    (re.compile(r"[ \t]+"), " "),
+]
+# Exact part of a signature: the assertion or action that failed and the
+# locator it failed on. Messages that differ in either never merge.
+MATCHER_PATTERN = re.compile(r"expect\(\w+\)\.((?:not\.)?\w+)|\b(?:locator|page|frame)\.(\w+):")
+LOCATOR_PATTERN = re.compile(r"^locator: ?(.+)$|strict mode violation: (.+?) resolved to", re.M)
+CALL_LOG_LOCATOR = re.compile(r"waiting for (.+)")
+
+
+def normalize_message(message):
+    """Failure message with volatile parts replaced by placeholders.
+
+    ANSI colours are removed; URLs, timestamps, ids, file paths with line
+    numbers and other numbers become <url>, <ts>, <id>, <file> and <n>.
+    The Playwright call log is dropped, except for the locator waited for
+    when the head names none, and repeated lines are kept once.
+    """
+    text = ANSI_ESCAPE.sub("", str(message)).lower()
+    # Playwright's call log repeats the locator with retry noise; the head is the failure
+    text, _, call_log = text.partition("call log:")
+    waited = CALL_LOG_LOCATOR.search(call_log)
+    if waited and not LOCATOR_PATTERN.search(text):
+        text += f"\nlocator: {waited.group(1).strip()}"
+    for pattern, replacement in _NORMALIZERS:
+        text = pattern.sub(replacement, text)
+    lines = []
+    for line in text.splitlines():
+        line = line.strip()
+        if line and line not in lines:
+            lines.append(line)
+    return "\n".join(lines)[:SIGNATURE_MAX_CHARS]
+
+
+def exact_key(normalized):
+    """Matcher (or action) and locator of a normalized message, '' when absent"""
+    matcher = MATCHER_PATTERN.search(normalized)
+    locator = LOCATOR_PATTERN.search(normalized)
+    return "|".join([
+        next((g for g in matcher.groups() if g), "") if matcher else "",
+        next((g for g in locator.groups() if g), "").strip() if locator else ""
+    ])
+
+
+def fingerprint(normalized):
+    """Short stable hash of a normalized message"""
+    return hashlib.blake2b(normalized.encode("utf-8"), digest_size=6).hexdigest()
+
+
+def minhash(normalized):
+    """MinHash signature of the word shingles of a normalized message"""
+    tokens = TOKEN_PATTERN.findall(normalized)
+    if len(tokens) <= SHINGLE_SIZE:
+        shingles = {" ".join(tokens)}
+    else:
+        shingles = {" ".join(tokens[i:i + SHINGLE_SIZE]) for i in range(len(tokens) - SHINGLE_SIZE + 1)}
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little") for s in shingles),
+        dtype=np.uint64, count=len(shingles)
+    )
+    return ((_HASH_A[:, None] * hashes[None, :] + _HASH_B[:, None]) >> np.uint64(32)).min(axis=1)
+
+
+def _find(parent, i):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def cluster_messages(normalized):
+    """Cluster id per normalized message, grouping near-duplicates with LSH.
+
+    Messages only get compared when they share an LSH bucket, so the work
+    grows with the number of distinct messages, not with their pairs.
+    Buckets are split by exact_key, so only messages with the same matcher
+    and locator can join.
+    """
+    n = len(normalized)
+    if n == 0:
+        return np.empty(0, dtype='int64')
+    signatures = np.vstack([minhash(m) for m in normalized])
+    keys = pd.factorize(np.array([exact_key(m) for m in normalized], dtype=object))[0].astype(np.uint64)
+    rows = MINHASH_PERMUTATIONS // LSH_BANDS
+    parent = list(range(n))
+
+    for band in range(LSH_BANDS):
+        block = np.ascontiguousarray(np.column_stack([signatures[:, band * rows:(band + 1) * rows], keys]))
+        _, buckets = np.unique(block.view(np.dtype((np.void, block.dtype.itemsize * (rows + 1)))).ravel(),
+                               return_inverse=True)
+        order = np.argsort(buckets, kind='stable')
+        bounds = np.flatnonzero(np.diff(buckets[order])) + 1
+        for members in np.split(order, bounds):
+            if len(members) < 2:
+                continue
+            first = members[0]
+            similarity = (signatures[members[1:]] == signatures[first]).mean(axis=1)
+            for member in members[1:][similarity >= SIMILARITY_THRESHOLD]:
+                root_a, root_b = _find(parent, first), _find(parent, member)
+                if root_a != root_b:
+                    parent[max(root_a, root_b)] = min(root_a, root_b)
+
+    roots = np.array([_find(parent, i) for i in range(n)])
+    return pd.factorize(roots)[0]
+
+
+def failure_rows(df):
+    """Failed rows of df with their normalized message and fingerprint.
+
+    Normalization runs once per distinct message; rows pick their result
+    up through the message codes.
+    """
+    failures = df[df['status'].isin(FAILED_STATUSES) & df['error_message'].notna()]
+    failures = failures.reindex(columns=SIGNATURE_HISTORY_COLUMNS)
+    if failures.empty:
+        return failures.assign(normalized=pd.Series(dtype=object), fingerprint=pd.Series(dtype=object))
+
+    messages = failures['error_message'].astype('category')
+    normalized = np.array([normalize_message(m) for m in messages.cat.categories], dtype=object)
+    fingerprints = np.array([fingerprint(m) for m in normalized], dtype=object)
+    message_codes = messages.cat.codes.to_numpy()
+    return failures.assign(normalized=normalized[message_codes], fingerprint=fingerprints[message_codes])
+
+
+def name_signatures(failures):
+    """Rows from failure_rows with a signature_id column.
+
+    MinHash and clustering run once per distinct normalized message, so
+    runs can be normalized separately (at ingestion) and clustered together.
+    """
+    if failures.empty:
+        return failures.assign(signature_id=pd.Series(dtype=object))
+
+    normalized_codes, normalized = pd.factorize(failures['normalized'].to_numpy(dtype=object))
+    fingerprints = np.array([fingerprint(m) for m in normalized], dtype=object)
+    clusters = cluster_messages(list(normalized))
+
+    # A cluster is named after its most frequent exact fingerprint
+    counts = np.bincount(normalized_codes, minlength=len(normalized))
+    cluster_names = {}
+    for i in np.argsort(-counts, kind='stable'):
+        cluster_names.setdefault(clusters[i], fingerprints[i])
+    names = np.array([cluster_names[c] for c in clusters], dtype=object)
+    return failures.assign(signature_id=names[normalized_codes])
+
+
+def assign_signatures(history):
+    """Failed rows of history with normalized, fingerprint and signature_id columns"""
+    return name_signatures(failure_rows(history))
+
+
+def summarize_signatures(failures):
+    """One row per signature: occurrences, affected tests and environments, first/last seen"""
+    if failures.empty:
+        return pd.DataFrame(columns=SIGNATURE_COLUMNS)
+
+    failures = failures.assign(test_key=identity_codes(failures))
+    grouped = failures.groupby('signature_id', sort=False)
+    summary = grouped.agg(
+        occurrences=('signature_id', 'size'),
+        tests=('test_key', 'nunique'),
+        fingerprints=('fingerprint', 'nunique'),
+        first_seen=('timestamp', 'min'),
+        last_seen=('timestamp', 'max')
+    )
+    summary['envs'] = grouped['env'].agg(lambda envs: ", ".join(sorted(set(map(str, envs)))))
+    # Representative text: the normalized message of the cluster's own fingerprint
+    representative = failures[failures['fingerprint'] == failures['signature_id']]
+    representative = representative.drop_duplicates('signature_id').set_index('signature_id')
+    summary['signature'] = representative['normalized']
+    summary['example'] = representative['error_message'].astype(str).map(lambda m: ANSI_ESCAPE.sub("", m))
+    return (
+        summary.reset_index()[SIGNATURE_COLUMNS]
+        .sort_values(['occurrences', 'tests'], ascending=False, ignore_index=True)
+    )
+
+
+def signature_tests(failures, signature_id):
+    """Tests affected by one signature, with failure counts and last failure"""
+    rows = failures[failures['signature_id'] == signature_id]
+    return (
+        rows.groupby(['name', 'module'], observed=True, sort=False)
+        .agg(failures=('signature_id', 'size'), envs=('env', lambda e: ", ".join(sorted(set(map(str, e))))),
+             last_seen=('timestamp', 'max'))
+        .reset_index()
+        .sort_values('failures', ascending=False, ignore_index=True)
+    )
+
+
+def signatures_from_store(store_dir):
+    """Failures of the whole store with their signatures, reclustered only when a run is added.
+
+    Reads the per-run failure files written at ingestion, so test rows
+    are never loaded and messages are never normalized twice.
+    """
+    runs_path = os.path.join(store_dir, RUNS_FILE)
+    if not os.path.exists(runs_path):
+        return assign_signatures(pd.DataFrame(columns=SIGNATURE_HISTORY_COLUMNS))
+
+    def compute(path):
+        return name_signatures(load_failures(store_dir))
+
+    return cached_parse(runs_path, compute, key="signatures.assign_signatures")
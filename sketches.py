@@ -0,0 +1,163 @@
+import pandas as pd
+import numpy as np
+
+
+PERCENTILES = [50, 90, 95, 99]
+DEFAULT_COMPRESSION = 200
+
+SKETCH_COLUMNS = ["level", "key", "means", "weights", "min", "max"]
+
+
+class TDigest:
+    """Mergeable t-digest for duration quantiles.
+
+    Values are summarised by weighted centroids whose size is bounded by
+    the k1 scale function, so the tails (p95/p99) stay accurate with about
+    compression / 2 centroids. Digests of different runs merge into a digest
+    of the union, which lets percentiles over any set of runs be answered
+    without the raw rows. Instances are immutable; merge returns a new digest.
+    """
+
+    def __init__(self, means=(), weights=(), min_value=np.inf, max_value=-np.inf,
+                 compression=DEFAULT_COMPRESSION):
+        self.means = np.asarray(means, dtype='float64')
+        self.weights = np.asarray(weights, dtype='float64')
+        self.min = float(min_value)
+        self.max = float(max_value)
+        self.compression = compression
+
+    @classmethod
+    def from_values(cls, values, compression=DEFAULT_COMPRESSION):
+        values = np.asarray(values, dtype='float64')
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return cls(compression=compression)
+        digest = cls(values, np.ones(len(values)), values.min(), values.max(), compression)
+        return digest._compressed()
+
+    @property
+    def count(self):
+        return float(self.weights.sum())
+
+    def merge(self, *others):
+        """Digest of the union of this digest's values and the others'"""
+        digests = [self, *others]
+        merged = TDigest(
+            np.concatenate([d.means for d in digests]),
+            np.concatenate([d.weights for d in digests]),
+            min(d.min for d in digests),
+            max(d.max for d in digests),
+            self.compression
+        )
+        return merged._compressed()
+
+    def _compressed(self):
+        """Group sorted centroids so each spans at most one unit of k1 scale"""
+        if len(self.means) <= 1:
+            return self
+        order = np.argsort(self.means, kind='stable')
+        means, weights = self.means[order], self.weights[order]
+        total = weights.sum()
+
+        # Quantile at the centre of each centroid, mapped through k1(q) = d/(2pi) * asin(2q - 1)
+        q = (np.cumsum(weights) - weights / 2) / total
+        k = self.compression / (2 * np.pi) * np.arcsin(np.clip(2 * q - 1, -1, 1))
+        groups = np.floor(k - k.min()).astype('int64')
+        _, groups = np.unique(groups, return_inverse=True)
+
+        group_weights = np.bincount(groups, weights=weights)
+        group_means = np.bincount(groups, weights=means * weights) / group_weights
+        return TDigest(group_means, group_weights, self.min, self.max, self.compression)
+
+    def quantile(self, q):
+        """Estimated value at quantile q (0-1); NaN for an empty digest"""
+        if len(self.means) == 0:
+            return float('nan')
+        if len(self.means) == 1:
+            return float(self.means[0])
+        centres = (np.cumsum(self.weights) - self.weights / 2) / self.count
+        xs = np.concatenate([[0.0], centres, [1.0]])
+        ys = np.concatenate([[self.min], self.means, [self.max]])
+        return float(np.interp(q, xs, ys))
+
+    def percentiles(self, percentiles=PERCENTILES):
+        return {f"p{p}": self.quantile(p / 100) for p in percentiles}
+
+    def to_record(self):
+        return {
+            "means": self.means.tolist(),
+            "weights": self.weights.tolist(),
+            "min": self.min,
+            "max": self.max
+        }
+
+    @classmethod
+    def from_record(cls, record, compression=DEFAULT_COMPRESSION):
+        return cls(record['means'], record['weights'], record['min'], record['max'], compression)
+
+
+def duration_summary(times, percentiles=PERCENTILES):
+    """Exact percentiles and max of a duration array in a single sort"""
+    times = np.asarray(times, dtype='float64')
+    if len(times) == 0:
+        return {**{f"p{p}": 0 for p in percentiles}, "max": 0}
+    values = np.percentile(times, percentiles)
+    return {**{f"p{p}": float(v) for p, v in zip(percentiles, values)}, "max": float(times.max())}
+
+
+def group_digests(keys, times):
+    """TDigest per distinct key, from one sort of the keys"""
+    codes, uniques = pd.factorize(np.asarray(keys, dtype=object))
+    times = np.asarray(times, dtype='float64')
+    order = np.argsort(codes, kind='stable')
+    bounds = np.flatnonzero(np.diff(codes[order])) + 1
+    return {
+        uniques[codes[idx[0]]]: TDigest.from_values(times[idx])
+        for idx in np.split(order, bounds) if len(idx)
+    }
+
+
+def run_sketches(df):
+    """Sketch table for one run: overall, per module and per test digests.
+
+    Stored next to each run by the store, so percentiles over any time
+    range come from merging these tables instead of loading raw rows.
+    """
+    if df.empty:
+        return pd.DataFrame(columns=SKETCH_COLUMNS)
+
+    times = df['time'].to_numpy(dtype='float64')
+    tests = (df['module'].astype(str) + ':' + df['line'].astype(str) + ' ' + df['name'].astype(str)).to_numpy()
+    levels = [
+        ("run", {"all": TDigest.from_values(times)}),
+        ("module", group_digests(df['module'].astype(str).to_numpy(), times)),
+        ("test", group_digests(tests, times))
+    ]
+    records = [
+        {"level": level, "key": key, **digest.to_record()}
+        for level, digests in levels
+        for key, digest in digests.items()
+    ]
+    return pd.DataFrame(records, columns=SKETCH_COLUMNS)
+
+
+def merge_digests(digests):
+    """Single digest of a list of digests"""
+    digests = list(digests)
+    if not digests:
+        return TDigest()
+    return digests[0].merge(*digests[1:])
+
+
+def merge_sketches(sketches, level, by="key", percentiles=PERCENTILES):
+    """Merge sketch tables of several runs into percentiles per `by` value"""
+    sketches = sketches[sketches['level'] == level]
+    columns = [by, "count"] + [f"p{p}" for p in percentiles] + ["max"]
+    if sketches.empty:
+        return pd.DataFrame(columns=columns)
+
+    rows = []
+    for key, group in sketches.groupby(by, sort=False, observed=True):
+        digest = merge_digests(TDigest.from_record(r) for r in group.to_dict('records'))
+        rows.append({by: key, "count": int(digest.count), **digest.percentiles(percentiles), "max": digest.max})
+    return pd.DataFrame(rows, columns=columns).sort_values(f"p{percentiles[-1]}", ascending=False, ignore_index=True)
@@ -0,0 +1,104 @@
+import hashlib
+import json
+import os
+import pickle
+import threading
+import time
+import numpy as np
+import pandas as pd
+import plotly
+from parsers import cached_parse, load_test_results_summary, get_available_environments, empty_results
+from store import load_run, sync_data_dir
+from cube import build_cube
+
+
+# What the main page needs on first load, in one file of the store: the
+# summaries of every report, the cube of the latest run (the charts are
+# built from it at render time) and the run id each report was stored as;
+# the rows themselves are read from the store. Reports that could not be
+# converted are left out and listed under "errors". It is valid while the
+# reports in data/ are the ones it was built from.
+SNAPSHOT_VERSION = 4
+# Pickles depend on the libraries that wrote them: a snapshot written by
+# other versions has another name and is rebuilt instead of loaded.
+SNAPSHOT_KEY = hashlib.sha1(
+    f"{SNAPSHOT_VERSION} {pd.__version__} {np.__version__} {plotly.__version__}".encode()
+).hexdigest()[:8]
+SNAPSHOT_FILE = f"snapshot-{SNAPSHOT_KEY}.pkl"
+
+def source_stats(data_dir):
+    """(mtime, size) of every report the main page reads"""
+    paths = list(get_available_environments(data_dir).values())
+    paths += [os.path.join(data_dir, f) for f in ("test-results.json", "junit-report.xml")]
+    return {
+        os.path.basename(p): (os.stat(p).st_mtime_ns, os.stat(p).st_size)
+        for p in sorted(paths) if os.path.exists(p)
+    }
+
+
+def data_version(sources):
+    """Short id of a set of reports, the same in every process that sees them"""
+    return hashlib.sha1(json.dumps(sorted(sources.items())).encode()).hexdigest()[:8]
+
+
+def build_snapshot(data_dir, store_dir):
+    sources = source_stats(data_dir)
+    latest_path = os.path.join(data_dir, "test-results.json")
+    # Every report is stored first, so environments load from the store by run id;
+    # a malformed one is skipped instead of holding back the others
+    errors = {}
+    stored = sync_data_dir(data_dir, store_dir, errors)
+    envs = {env_name: path for env_name, path in get_available_environments(data_dir).items() if path in stored}
+    latest_run_id = next(
+        (stored[p] for p in (latest_path, os.path.join(data_dir, "junit-report.xml")) if p in stored), None
+    )
+    return {
+        "version": SNAPSHOT_VERSION,
+        "sources": sources,
+        "data_version": data_version(sources),
+        "data_time": max((mtime for mtime, _ in sources.values()), default=0) / 1e9,
+        "built_at": time.time(),
+        "run_ids": {env_name: stored[path] for env_name, path in envs.items()},
+        "latest_summary": cached_parse(latest_path, load_test_results_summary) if latest_path in stored else None,
+        "env_summaries": {env_name: cached_parse(path, load_test_results_summary) for env_name, path in envs.items()},
+        "latest_run_id": latest_run_id,
+        "cube": build_cube(load_run(store_dir, latest_run_id) if latest_run_id else empty_results()),
+        "errors": {os.path.basename(path): error for path, error in errors.items()}
+    }
+
+
+def write_snapshot(data_dir, store_dir):
+    """Build the snapshot and replace the stored one atomically"""
+    snapshot = build_snapshot(data_dir, store_dir)
+    os.makedirs(store_dir, exist_ok=True)
+    path = os.path.join(store_dir, SNAPSHOT_FILE)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+    return snapshot
+
+
+def _read_snapshot(path):
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def load_snapshot(data_dir, store_dir, stale=False):
+    """The stored snapshot, or None when it is missing or the reports changed since.
+
+    With stale=True a snapshot of older reports is returned too.
+    """
+    path = os.path.join(store_dir, SNAPSHOT_FILE)
+    if not os.path.exists(path):
+        return None
+    try:
+        snapshot = cached_parse(path, _read_snapshot)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        # Written by an incompatible version; it gets rebuilt
+        return None
+    if snapshot.get("version") != SNAPSHOT_VERSION:
+        return None
+    if not stale and snapshot.get("sources") != source_stats(data_dir):
+        return None
+    return snapshot
@@ -0,0 +1,712 @@
+import pandas as pd
+import glob
+import json
+import os
+import threading
+import xml.etree.ElementTree as ET
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from sketches import run_sketches, merge_sketches, SKETCH_COLUMNS
+from parsers import (
+    parse_test_results_json, parse_playwright_junit, load_test_results_summary,
+    get_available_environments, get_all_test_results, cached_parse, load_json,
+    apply_result_schema, concat_results, empty_results
+)
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers are only serialized within the process
+    fcntl = None
+
+
+# Layout of the run-history store:
+#   manifest.json                          source files already ingested
+#   .lock                                  held by writers (see store_lock)
+#   runs.parquet                           one row per run (run index)
+#   runs/env=QA/date=2026-02-12/<run>.parquet
+#   sketches/env=QA/date=2026-02-12/<run>.parquet   duration digests per run
+#   failures/env=QA/date=2026-02-12/<run>.parquet   failed tests per run with normalized messages
+#   diffs/env=QA/date=2026-02-12/<run>.vs.<previous run>.parquet   changes vs the env's previous run
+#   durations/env=QA.parquet               passed-test durations of the env's latest runs
+#   trends/env=QA.parquet                  tests, failures and seconds per module of every env run
+#   flaky/env=QA.parquet                   per-test result counts and recent outcomes over every env run
+MANIFEST_FILE = "manifest.json"
+LOCK_FILE = ".lock"
+RUNS_FILE = "runs.parquet"
+RUNS_DIR = "runs"
+SKETCHES_DIR = "sketches"
+FAILURES_DIR = "failures"
+DIFFS_DIR = "diffs"
+DURATIONS_DIR = "durations"
+TRENDS_DIR = "trends"
+FLAKY_DIR = "flaky"
+DEFAULT_ENV = "DEFAULT"
+# Raised while converting a malformed or truncated report
+REPORT_ERRORS = (ValueError, KeyError, TypeError, ET.ParseError)
+
+RUN_COLUMNS = [
+    "run_id", "env", "start_time", "end_time", "duration",
+    "total", "passed", "failed", "skipped", "source", "path"
+]
+
+
+def get_store_dir(data_dir="data"):
+    """Store location: QA_STORE_DIR, or data_dir/store by default"""
+    return os.environ.get("QA_STORE_DIR", os.path.join(data_dir, "store"))
+
+
+def _utc_timestamp(value):
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is None:
+        return ts.tz_localize('UTC')
+    return ts.tz_convert('UTC')
+
+
+def run_id_from_start_time(start_time, env=DEFAULT_ENV):
+    """Build a sortable, filesystem-safe run id from an ISO start time.
+
+    The environment is part of the id, so one report ingested under two
+    environments is stored as two runs.
+    """
+    ts = _utc_timestamp(start_time)
+    return ts.strftime('%Y%m%dT%H%M%S') + f"{ts.microsecond // 1000:03d}Z-{env}"
+
+
+def run_stamp(run_id):
+    """Start time part of a run id; stamps sort by start time"""
+    return str(run_id).split("-", 1)[0]
+
+
+_process_lock = threading.Lock()
+_lock_state = threading.local()
+
+
+@contextmanager
+def store_lock(store_dir):
+    """Exclusive write lock on the store, across threads and processes.
+
+    Ingestion reads the run index and manifest, then rewrites them; holding
+    this lock around that keeps concurrent uploads from losing each other's
+    runs. Re-entrant within a thread.
+    """
+    if getattr(_lock_state, 'depth', 0):
+        _lock_state.depth += 1
+        try:
+            yield
+        finally:
+            _lock_state.depth -= 1
+        return
+
+    os.makedirs(store_dir, exist_ok=True)
+    with _process_lock, open(os.path.join(store_dir, LOCK_FILE), 'a') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        _lock_state.depth = 1
+        try:
+            yield
+        finally:
+            _lock_state.depth = 0
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _write_atomic(path, write):
+    """Write a file through a temporary sibling and rename it into place"""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    write(tmp_path)
+    os.replace(tmp_path, path)
+
+
+def _read_manifest(store_dir):
+    path = os.path.join(store_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+    return dict(cached_parse(path, load_json))
+
+
+def _write_manifest(store_dir, manifest):
+    def write(tmp_path):
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+    _write_atomic(os.path.join(store_dir, MANIFEST_FILE), write)
+
+
+def load_runs(store_dir):
+    """Load the run index (one row per ingested run)"""
+    path = os.path.join(store_dir, RUNS_FILE)
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=RUN_COLUMNS)
+    return cached_parse(path, pd.read_parquet)
+
+
+def _read_report(path):
+    """Parse a JSON or JUnit report into (rows, summary)"""
+    if path.endswith('.xml'):
+        df = parse_playwright_junit(path)
+        start_time = df['timestamp'].min() if not df.empty else None
+        summary = {
+            "total": len(df),
+            "passed": int((df['status'] == 'Passed').sum()),
+            "failed": int(df['status'].isin(['Failed', 'Error']).sum()),
+            "skipped": int((df['status'] == 'Skipped').sum()),
+            "duration": float(df['time'].sum() * 1000),
+            "startTime": start_time
+        }
+        return df, summary
+
+    return parse_test_results_json(path), load_test_results_summary(path)
+
+
+def _known_run_id(store_dir, source, env):
+    """Run id recorded for a source file and environment, if the file has not changed since"""
+    entry = _read_manifest(store_dir).get(source)
+    stat = os.stat(source)
+    if (entry and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size
+            and entry.get('env', env) == env):
+        return entry['run_id']
+    return None
+
+
+def ingest_report(path, store_dir, env=DEFAULT_ENV, remember=True):
+    """Ingest a report into the store exactly once, keyed by run start time.
+
+    Returns the run id. Files already ingested (same path, mtime, size and
+    environment) are not opened again. A report under DEFAULT_ENV whose run
+    start time is already stored maps to the existing run, and a DEFAULT_ENV
+    run moves to `env` (and its id with it) when an environment file turns
+    out to be the source of test-results.json.
+    With remember=False the file is not recorded in the manifest (for
+    uploads that are deleted once ingested).
+    """
+    source = os.path.abspath(path)
+    if os.path.exists(os.path.join(store_dir, MANIFEST_FILE)):
+        run_id = _known_run_id(store_dir, source, env)
+        if run_id is not None:
+            return run_id
+
+    with store_lock(store_dir):
+        # Another writer may have ingested the file while we waited
+        run_id = _known_run_id(store_dir, source, env)
+        if run_id is None:
+            run_id = _ingest_locked(source, store_dir, env, remember)
+    return run_id
+
+
+def _ingest_locked(source, store_dir, env, remember):
+    stat = os.stat(source)
+    df, summary = _read_report(source)
+    start_time = summary.get('startTime') or datetime.fromtimestamp(stat.st_mtime, timezone.utc).isoformat()
+    run_id = run_id_from_start_time(start_time, env)
+
+    runs = load_runs(store_dir)
+    start = _utc_timestamp(start_time)
+    rel_path = os.path.join(RUNS_DIR, f"env={env}", f"date={start:%Y-%m-%d}", f"{run_id}.parquet")
+    existing = runs.index[runs['run_id'] == run_id]
+    same_start = runs.index[runs['run_id'].map(run_stamp) == run_stamp(run_id)]
+    copied = same_start[runs.loc[same_start, 'env'] == DEFAULT_ENV]
+
+    if not len(existing) and env == DEFAULT_ENV and len(same_start):
+        # test-results.json copied from an environment file already stored
+        run_id = runs.at[same_start[0], 'run_id']
+    elif not len(existing) and len(copied):
+        # test-results.json was ingested before the environment file it was copied from
+        runs = _relabel_run(store_dir, runs, copied[0], env, run_id, rel_path)
+        _write_diffs(store_dir, runs, run_id)
+        _write_durations(store_dir, runs, env)
+        _write_durations(store_dir, runs, DEFAULT_ENV)
+        _write_trends(store_dir, runs, env)
+        _write_trends(store_dir, runs, DEFAULT_ENV)
+        _write_flaky(store_dir, runs, env)
+        _write_flaky(store_dir, runs, DEFAULT_ENV)
+    elif not len(existing):
+        run_path = os.path.join(store_dir, rel_path)
+        os.makedirs(os.path.dirname(run_path), exist_ok=True)
+
+        df = apply_result_schema(df.assign(run_id=run_id, env=env))
+        _write_atomic(run_path, lambda tmp_path: df.to_parquet(tmp_path, index=False))
+        _write_sketches(store_dir, rel_path, df)
+        _write_failures(store_dir, rel_path, df)
+
+        end_time = summary.get('endTime')
+        run = pd.DataFrame([{
+            "run_id": run_id,
+            "env": env,
+            "start_time": start,
+            "end_time": _utc_timestamp(end_time) if end_time else pd.NaT,
+            "duration": summary.get('duration', 0) / 1000,
+            "total": summary.get('total', len(df)),
+            "passed": summary.get('passed', 0),
+            "failed": summary.get('failed', 0),
+            "skipped": summary.get('skipped', 0),
+            "source": os.path.basename(source),
+            "path": rel_path
+        }], columns=RUN_COLUMNS)
+        runs = pd.concat([runs, run], ignore_index=True) if not runs.empty else run
+        runs = runs.sort_values('start_time', ignore_index=True)
+        _write_runs(store_dir, runs)
+        _write_diffs(store_dir, runs, run_id, df)
+        _write_durations(store_dir, runs, env, run_id, df)
+        _write_trends(store_dir, runs, env, run_id, df)
+        _write_flaky(store_dir, runs, env, run_id, df)
+
+    if remember:
+        record_source(store_dir, source, run_id, env)
+    return run_id
+
+
+def record_source(store_dir, path, run_id, env=DEFAULT_ENV):
+    """Record a file as holding an already stored run, so it is never parsed"""
+    source = os.path.abspath(path)
+    stat = os.stat(source)
+    with store_lock(store_dir):
+        manifest = _read_manifest(store_dir)
+        manifest[source] = {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "run_id": run_id, "env": env}
+        _write_manifest(store_dir, manifest)
+
+
+def _sketch_rel_path(run_rel_path):
+    return os.path.join(SKETCHES_DIR, os.path.relpath(run_rel_path, RUNS_DIR))
+
+
+def _write_sketches(store_dir, run_rel_path, df):
+    path = os.path.join(store_dir, _sketch_rel_path(run_rel_path))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    sketches = run_sketches(df)
+    _write_atomic(path, lambda tmp_path: sketches.to_parquet(tmp_path, index=False))
+    return path
+
+
+def _failures_rel_path(run_rel_path):
+    return os.path.join(FAILURES_DIR, os.path.relpath(run_rel_path, RUNS_DIR))
+
+
+def _write_failures(store_dir, run_rel_path, df):
+    from signatures import failure_rows
+    path = os.path.join(store_dir, _failures_rel_path(run_rel_path))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    failures = failure_rows(df)
+    _write_atomic(path, lambda tmp_path: failures.to_parquet(tmp_path, index=False))
+    return path
+
+
+def _write_runs(store_dir, runs):
+    _write_atomic(os.path.join(store_dir, RUNS_FILE), lambda tmp_path: runs.to_parquet(tmp_path, index=False))
+
+
+def _relabel_run(store_dir, runs, index, env, run_id, rel_path):
+    """Move a run stored under DEFAULT_ENV to its real environment and run id"""
+    old_run_id = runs.at[index, 'run_id']
+    df = pd.read_parquet(os.path.join(store_dir, runs.at[index, 'path']))
+    df = apply_result_schema(df.assign(run_id=run_id, env=env))
+    run_path = os.path.join(store_dir, rel_path)
+    os.makedirs(os.path.dirname(run_path), exist_ok=True)
+    _write_atomic(run_path, lambda tmp_path: df.to_parquet(tmp_path, index=False))
+    os.remove(os.path.join(store_dir, runs.at[index, 'path']))
+    old_sketch_path = os.path.join(store_dir, _sketch_rel_path(runs.at[index, 'path']))
+    if os.path.exists(old_sketch_path):
+        os.remove(old_sketch_path)
+    old_failures_path = os.path.join(store_dir, _failures_rel_path(runs.at[index, 'path']))
+    if os.path.exists(old_failures_path):
+        os.remove(old_failures_path)
+    for old_diff_path in _diff_paths(store_dir, runs.at[index, 'path']):
+        os.remove(old_diff_path)
+    _write_sketches(store_dir, rel_path, df)
+    _write_failures(store_dir, rel_path, df)
+
+    runs = runs.copy()
+    runs.at[index, 'run_id'] = run_id
+    runs.at[index, 'env'] = env
+    runs.at[index, 'path'] = rel_path
+    _write_runs(store_dir, runs)
+    # Files recorded against the old id (test-results.json) now hold the moved run
+    # New entries: the ones read are shared with the parse cache
+    manifest = {
+        source: {**entry, "run_id": run_id} if entry['run_id'] == old_run_id else entry
+        for source, entry in _read_manifest(store_dir).items()
+    }
+    _write_manifest(store_dir, manifest)
+    return runs
+
+
+def previous_run(runs, run_id):
+    """Run index row of the run before run_id in the same environment, or None"""
+    match = runs[runs['run_id'] == run_id]
+    if match.empty:
+        return None
+    run = match.iloc[0]
+    earlier = runs[(runs['env'] == run['env']) & (runs['start_time'] < run['start_time'])]
+    # The run index is kept sorted by start time
+    return earlier.iloc[-1] if len(earlier) else None
+
+
+def _diff_rel_path(run_rel_path, base_run_id):
+    partition, name = os.path.split(os.path.relpath(run_rel_path, RUNS_DIR))
+    return os.path.join(DIFFS_DIR, partition, f"{os.path.splitext(name)[0]}.vs.{base_run_id}.parquet")
+
+
+def _diff_paths(store_dir, run_rel_path):
+    """Diff files stored for a run, against whichever run preceded it"""
+    return glob.glob(os.path.join(store_dir, _diff_rel_path(run_rel_path, "*")))
+
+
+def _write_run_diff(store_dir, run, base, df=None, base_df=None):
+    from diff import diff_runs  # diff imports flaky, which imports this module
+    for stale_path in _diff_paths(store_dir, run['path']):
+        os.remove(stale_path)
+    if df is None:
+        df = _read_results_parquet(os.path.join(store_dir, run['path']))
+    if base_df is None:
+        base_df = _read_results_parquet(os.path.join(store_dir, base['path']))
+    path = os.path.join(store_dir, _diff_rel_path(run['path'], base['run_id']))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    diff = diff_runs(base_df, df)
+    _write_atomic(path, lambda tmp_path: diff.to_parquet(tmp_path, index=False))
+    return path
+
+
+def _write_diffs(store_dir, runs, run_id, df=None):
+    """Diff a new run against its predecessor, and its successor against it.
+
+    The successor only exists when a run arrives late, e.g. from a slow CI
+    job; its stored diff was taken against an older run.
+    """
+    run = runs[runs['run_id'] == run_id].iloc[0]
+    base = previous_run(runs, run_id)
+    if base is not None:
+        _write_run_diff(store_dir, run, base, df)
+    later = runs[(runs['env'] == run['env']) & (runs['start_time'] > run['start_time'])]
+    if len(later):
+        _write_run_diff(store_dir, later.iloc[0], run, base_df=df)
+
+
+def _durations_path(store_dir, env):
+    return os.path.join(store_dir, DURATIONS_DIR, f"env={env}.parquet")
+
+
+def _write_durations(store_dir, runs, env, run_id=None, df=None):
+    """Add a new run to an environment's duration state, or rebuild the state.
+
+    A run newer than every other run of the environment (the usual case)
+    appends one column to the stored state. Late or relabelled runs, and
+    stores that predate the state, rebuild it from the runs in its window.
+    """
+    from regressions import append_run, build_state, duration_columns, DURATION_WINDOW
+    path = _durations_path(store_dir, env)
+    env_runs = runs[runs['env'] == env].iloc[-DURATION_WINDOW:]
+    if env_runs.empty:
+        if os.path.exists(path):
+            os.remove(path)
+        return
+
+    window = list(env_runs['run_id'])
+    state = pd.read_parquet(path) if os.path.exists(path) else None
+    if (run_id is not None and df is not None and state is not None and window[-1] == run_id
+            and (duration_columns(state) + [run_id])[-len(window):] == window):
+        state = append_run(state, run_id, df)
+    else:
+        state = build_state(
+            (rid, df if rid == run_id and df is not None else _read_results_parquet(os.path.join(store_dir, p)))
+            for rid, p in zip(env_runs['run_id'], env_runs['path'])
+        )
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    _write_atomic(path, lambda tmp_path: state.to_parquet(tmp_path, index=False))
+
+
+def duration_state_paths(store_dir, envs=None):
+    """Duration state file per environment, building any that is missing"""
+    runs = load_runs(store_dir)
+    paths = {}
+    for env in sorted(runs['env'].unique()):
+        if envs is not None and env not in envs:
+            continue
+        path = _durations_path(store_dir, env)
+        if not os.path.exists(path):
+            with store_lock(store_dir):
+                if not os.path.exists(path):
+                    _write_durations(store_dir, runs, env)
+        paths[env] = path
+    return paths
+
+
+def load_duration_state(store_dir, env):
+    """Passed-test durations of an environment's latest runs, one column per run"""
+    path = duration_state_paths(store_dir, [env]).get(env)
+    return cached_parse(path, pd.read_parquet) if path else None
+
+
+def _trends_path(store_dir, env):
+    return os.path.join(store_dir, TRENDS_DIR, f"env={env}.parquet")
+
+
+def _write_trends(store_dir, runs, env, run_id=None, df=None):
+    """Bring an environment's module summary in line with its runs.
+
+    Rows of runs no longer in the environment are dropped and runs missing
+    from the summary are added: the new run from its rows, any other (a
+    relabelled run, or every run of a store that predates the summary)
+    from its file.
+    """
+    from trends import module_summary, TREND_COLUMNS
+    path = _trends_path(store_dir, env)
+    env_runs = runs[runs['env'] == env]
+    if env_runs.empty:
+        if os.path.exists(path):
+            os.remove(path)
+        return
+
+    trends = pd.read_parquet(path) if os.path.exists(path) else pd.DataFrame(columns=TREND_COLUMNS)
+    trends = trends[trends['run_id'].isin(env_runs['run_id']) & (trends['run_id'] != run_id)]
+    known = set(trends['run_id'])
+    frames = [trends] if len(trends) else []
+    for run in env_runs.itertuples():
+        if run.run_id in known:
+            continue
+        if run.run_id == run_id and df is not None:
+            rows = df
+        else:
+            rows = pd.read_parquet(os.path.join(store_dir, run.path), columns=['module', 'status', 'time'])
+        frames.append(module_summary(run.run_id, run.start_time, rows))
+    frames = [f for f in frames if len(f)]
+    trends = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=TREND_COLUMNS)
+    trends = trends.sort_values(['start_time', 'module'], ignore_index=True)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    _write_atomic(path, lambda tmp_path: trends.to_parquet(tmp_path, index=False))
+
+
+def _flaky_path(store_dir, env):
+    return os.path.join(store_dir, FLAKY_DIR, f"env={env}.parquet")
+
+
+def _write_flaky(store_dir, runs, env, run_id=None, df=None):
+    """Fold a new run into an environment's flakiness state, or rebuild the state.
+
+    A run newer than every other run of the environment, arriving right
+    after the run the state is up to date with, is folded in from its rows.
+    Late or relabelled runs, and stores that predate the state, rebuild it
+    from every run of the environment, read one at a time.
+    """
+    from flaky import append_flaky_run, build_flaky_state, HISTORY_COLUMNS
+    path = _flaky_path(store_dir, env)
+    env_runs = runs[runs['env'] == env]
+    if env_runs.empty:
+        if os.path.exists(path):
+            os.remove(path)
+        return
+
+    state = pd.read_parquet(path) if os.path.exists(path) else None
+    base = previous_run(runs, run_id) if run_id is not None else None
+    if (df is not None and state is not None and len(state) and env_runs['run_id'].iloc[-1] == run_id
+            and base is not None and state['through'].iloc[0] == base['run_id']):
+        state = append_flaky_run(state, run_id, df)
+    else:
+        columns = HISTORY_COLUMNS[:-2] + ['timestamp']
+        state = build_flaky_state(zip(env_runs['run_id'], iter_history(store_dir, [env], columns=columns)))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    _write_atomic(path, lambda tmp_path: state.to_parquet(tmp_path, index=False))
+
+
+def flaky_state_paths(store_dir, envs=None):
+    """Flakiness state file per environment, building any that is missing"""
+    runs = load_runs(store_dir)
+    paths = {}
+    for env in sorted(runs['env'].unique()):
+        if envs is not None and env not in envs:
+            continue
+        path = _flaky_path(store_dir, env)
+        if not os.path.exists(path):
+            with store_lock(store_dir):
+                if not os.path.exists(path):
+                    _write_flaky(store_dir, load_runs(store_dir), env)
+        paths[env] = path
+    return paths
+
+
+def load_module_trends(store_dir, env):
+    """Per-run module summary of an environment, built on first use; None without runs"""
+    runs = load_runs(store_dir)
+    if env not in set(runs['env']):
+        return None
+    path = _trends_path(store_dir, env)
+    if not os.path.exists(path):
+        with store_lock(store_dir):
+            if not os.path.exists(path):
+                _write_trends(store_dir, load_runs(store_dir), env)
+    return cached_parse(path, pd.read_parquet)
+
+
+def load_run_diff(store_dir, run_id):
+    """Changes of a run against the previous run of its environment.
+
+    Returns (diff, previous run id); (empty diff, None) for the first run of
+    an environment. Diffs are computed at ingestion, so this is one small
+    file read; a missing or outdated diff is rebuilt here.
+    """
+    from diff import DIFF_COLUMNS
+    runs = load_runs(store_dir)
+    base = previous_run(runs, run_id)
+    if base is None:
+        return pd.DataFrame(columns=DIFF_COLUMNS), None
+    run = runs[runs['run_id'] == run_id].iloc[0]
+    path = os.path.join(store_dir, _diff_rel_path(run['path'], base['run_id']))
+    if not os.path.exists(path):
+        with store_lock(store_dir):
+            if not os.path.exists(path):
+                _write_run_diff(store_dir, run, base)
+    return cached_parse(path, pd.read_parquet), base['run_id']
+
+
+def sync_data_dir(data_dir, store_dir, errors=None):
+    """Ingest every report in data_dir that the store has not seen yet.
+
+    Environment files (test-results-{env}.json) go first so that a
+    test-results.json copied from one of them resolves to the same run.
+    With an errors dict, a report that cannot be converted is skipped and
+    its error recorded under its path, so the other reports still sync.
+    """
+    reports = [(path, env_name) for env_name, path in sorted(get_available_environments(data_dir).items())]
+    for filename in ("test-results.json", "junit-report.xml"):
+        path = os.path.join(data_dir, filename)
+        if os.path.exists(path):
+            reports.append((path, DEFAULT_ENV))
+
+    run_ids = {}
+    for path, env in reports:
+        try:
+            run_ids[path] = ingest_report(path, store_dir, env=env)
+        except REPORT_ERRORS as e:
+            if errors is None:
+                raise
+            errors[path] = f"{type(e).__name__}: {e}"
+    return run_ids
+
+
+def _read_results_parquet(path):
+    # Runs stored before a schema column existed get it derived here (e.g. tags)
+    return apply_result_schema(pd.read_parquet(path))
+
+
+def _read_run_file(path, columns=None):
+    df = cached_parse(path, _read_results_parquet)
+    # Columns added after a run was stored come back empty rather than failing
+    return df.reindex(columns=columns) if columns is not None else df
+
+
+def load_run(store_dir, run_id, columns=None):
+    """Load the test rows of a single run"""
+    runs = load_runs(store_dir)
+    match = runs[runs['run_id'] == run_id]
+    if match.empty:
+        return pd.DataFrame(columns=columns)
+    return _read_run_file(os.path.join(store_dir, match.iloc[0]['path']), columns)
+
+
+def select_runs(store_dir, envs=None, since=None, until=None):
+    """Rows of the run index matching environments and a start time range"""
+    runs = load_runs(store_dir)
+    if envs is not None:
+        runs = runs[runs['env'].isin(envs)]
+    if since is not None:
+        runs = runs[runs['start_time'] >= _utc_timestamp(since)]
+    if until is not None:
+        runs = runs[runs['start_time'] <= _utc_timestamp(until)]
+    return runs
+
+
+def load_history(store_dir, envs=None, since=None, until=None, columns=None):
+    """Load test rows across runs, pruning partitions through the run index"""
+    runs = select_runs(store_dir, envs, since, until)
+    if runs.empty:
+        return pd.DataFrame(columns=columns)
+
+    frames = [_read_run_file(os.path.join(store_dir, p), columns) for p in runs['path']]
+    return concat_results(frames)
+
+
+def iter_history(store_dir, envs=None, since=None, until=None, columns=None):
+    """Yield the test rows of each selected run, one run at a time.
+
+    Files are read directly rather than through the parse cache, so a full
+    pass over the history neither holds it in memory nor evicts cached runs.
+    """
+    for path in select_runs(store_dir, envs, since, until)['path']:
+        df = _read_results_parquet(os.path.join(store_dir, path))
+        yield df.reindex(columns=columns) if columns is not None else df
+
+
+def load_sketches(store_dir, envs=None, since=None, until=None):
+    """Duration digests of the selected runs, tagged with env and run_id.
+
+    Runs ingested before sketches existed get theirs built on first use.
+    """
+    runs = select_runs(store_dir, envs, since, until)
+    frames = []
+    for run in runs.itertuples():
+        path = os.path.join(store_dir, _sketch_rel_path(run.path))
+        if not os.path.exists(path):
+            _write_sketches(store_dir, run.path, _read_run_file(os.path.join(store_dir, run.path)))
+        frames.append(cached_parse(path, pd.read_parquet).assign(env=run.env, run_id=run.run_id))
+    if not frames:
+        return pd.DataFrame(columns=SKETCH_COLUMNS + ["env", "run_id"])
+    return pd.concat(frames, ignore_index=True)
+
+
+def load_failures(store_dir, envs=None, since=None, until=None):
+    """Failed tests of the selected runs with their normalized messages.
+
+    Runs ingested before failure files existed get theirs built on first
+    use, reading the run file directly rather than through the parse cache.
+    """
+    from signatures import failure_rows
+    runs = select_runs(store_dir, envs, since, until)
+    frames = []
+    for run in runs.itertuples():
+        path = os.path.join(store_dir, _failures_rel_path(run.path))
+        if not os.path.exists(path):
+            _write_failures(store_dir, run.path, _read_results_parquet(os.path.join(store_dir, run.path)))
+        failures = cached_parse(path, pd.read_parquet)
+        if not failures.empty:
+            frames.append(failures)
+    columns = failure_rows(empty_results()).columns
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    # Failure files are small: one concat and one schema conversion beat
+    # unioning every categorical column frame by frame (concat_results)
+    return apply_result_schema(pd.concat(frames, ignore_index=True)).reindex(columns=columns)
+
+
+def load_duration_percentiles(store_dir, level="module", envs=None, since=None, until=None):
+    """Duration percentiles per module, test or environment over a range of runs.
+
+    Merges the stored per-run digests; raw test rows are never loaded.
+    """
+    sketches = load_sketches(store_dir, envs, since, until)
+    if level == "environment":
+        return merge_sketches(sketches, "run", by="env")
+    return merge_sketches(sketches, level)
+
+
+def load_report_results(path, store_dir, env=DEFAULT_ENV):
+    """Ingest a single report if needed and return its run's rows"""
+    return load_run(store_dir, ingest_report(path, store_dir, env=env))
+
+
+def load_latest_results(data_dir, store_dir):
+    """Return the rows of the latest run (test-results.json or junit-report.xml).
+
+    Only the latest-run file is ingested here; environment files are left
+    for load_environment_results_df so they are read only when selected.
+    Falls back to parsing the raw files when nothing could be ingested.
+    """
+    for filename in ("test-results.json", "junit-report.xml"):
+        path = os.path.join(data_dir, filename)
+        if os.path.exists(path):
+            return load_report_results(path, store_dir)
+    return get_all_test_results(data_dir)
+
+
+def load_environment_results_df(data_dir, store_dir, env_name):
+    """Return the rows of an environment's latest run, ingesting it on first use"""
+    path = get_available_environments(data_dir).get(env_name)
+    if path is None:
+        return empty_results()
+    return load_report_results(path, store_dir, env=env_name)
@@ -1,12 +1,26 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-import json
-import os
+import time
 from datetime import datetime
 from pathlib import Path
-from parsers import get_all_test_results, calculate_metrics, load_environment_results
+from parsers import (
+    load_environment_summaries, load_test_results_summary, cached_parse, parse_cache_stats, empty_results
+)
+from cube import (
+    get_cube, get_view, dimension_values, slice_cube, filter_mask, cube_metrics,
+    cube_module_percentiles
+)
+from store import (
+    load_latest_results, load_environment_results_df, get_store_dir, load_duration_percentiles,
+    load_run_diff, load_run, RUNS_FILE
+)
+from perf import Profiler, perf_enabled, render_panel
+from search import get_index, page_rows
+from tags import get_tag_index, cube_tag_metrics
+from export import EXPORT_FORMATS, export_frame, export_history
+from diff import diff_runs, diff_counts
+from charts import status_chart, modules_chart, histogram_chart, module_time_chart
+from refresh import get_refresher
 
 # Configure Streamlit page
 st.set_page_config(
@@ -31,6 +45,9 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Stage timings for the debug panel (QA_PERF=1 or ?debug=perf)
+profiler = Profiler("main", perf_enabled(st.query_params))
+
 # Main title
 st.title(":rocket: QA Automation Dashboard - Dropea")
 st.markdown("---")
@@ -38,34 +55,113 @@ st.markdown("---")
 # Sidebar
 st.sidebar.header(":wrench: Configuracion")
 
-if st.sidebar.button(":arrows_counterclockwise: Actualizar Datos"):
-    st.cache_data.clear()
-    st.rerun()
+PERCENTILE_LEVELS = {"Modulo": "module", "Test": "test", "Ambiente": "environment"}
+DETAIL_COLUMNS = ['name', 'module', 'suite', 'status', 'time']
+SORT_OPTIONS = {"Orden original": None, "Tiempo": "time", "Nombre": "name", "Modulo": "module", "Estado": "status", "Suite": "suite"}
+PAGE_SIZES = [25, 50, 100, 250]
+STATUS_VIEWS = {"Todos": None, "Fallidos": "Failed", "Skipped": "Skipped"}
+CHANGE_LABELS = {
+    "newly_failing": "Nuevos fallos", "fixed": "Corregidos", "slower": "Mas lentos",
+    "added": "Tests nuevos", "removed": "Tests eliminados"
+}
+PERCENTILE_PERIODS = {"Ultimos 7 dias": 7, "Ultimos 30 dias": 30, "Ultimos 90 dias": 90, "Todo el historial": None}
 
 # Load test results
 DATA_DIR = Path(__file__).parent / "data"
+STORE_DIR = Path(get_store_dir(str(DATA_DIR)))
+
+# New reports are ingested by a background thread; the page always shows
+# the last complete version and never waits for the next one
+refresher = get_refresher(str(DATA_DIR), str(STORE_DIR))
+if st.sidebar.button(":arrows_counterclockwise: Actualizar Datos"):
+    refresher.poke()
+    st.rerun()
 
-@st.cache_data(ttl=60)
 def load_data():
-    return get_all_test_results(str(DATA_DIR))
+    return load_latest_results(str(DATA_DIR), str(STORE_DIR))
 
-@st.cache_data(ttl=60)
-def load_test_results_json():
+def load_latest_summary():
     path = DATA_DIR / "test-results.json"
     if path.exists():
-        with open(path, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return cached_parse(str(path), load_test_results_summary)
     return None
 
-@st.cache_data(ttl=60)
-def load_env_results():
-    return load_environment_results(str(DATA_DIR))
+def load_env_summaries():
+    return load_environment_summaries(str(DATA_DIR))
+
+def load_env_data(env_name):
+    run_id = snapshot['run_ids'].get(env_name) if snapshot else None
+    if run_id is not None:
+        # Already ingested by the refresher: one cached Parquet read
+        return load_run(str(STORE_DIR), run_id)
+    return load_environment_results_df(str(DATA_DIR), str(STORE_DIR), env_name)
+
+def format_age(seconds):
+    if seconds < 60:
+        return "menos de 1 min"
+    if seconds < 3600:
+        return f"{seconds // 60:.0f} min"
+    if seconds < 86400:
+        return f"{seconds // 3600:.0f} h"
+    return f"{seconds // 86400:.0f} dias"
+
+def render_diff(diff):
+    counts = diff_counts(diff)
+    for col, (change, label) in zip(st.columns(len(CHANGE_LABELS)), CHANGE_LABELS.items()):
+        col.metric(label, counts[change])
+    if not diff.empty:
+        st.dataframe(diff.assign(change=diff['change'].map(CHANGE_LABELS)), use_container_width=True, hide_index=True)
+
+# The snapshot answers the first load (summaries, run ids, cube) from memory
+with profiler.stage("snapshot"):
+    snapshot = refresher.snapshot()
+
+if snapshot:
+    st.sidebar.caption(
+        f"Datos version `{snapshot['data_version']}`, de hace {format_age(time.time() - snapshot['data_time'])}"
+        + (" (actualizando en segundo plano)" if refresher.refreshing else "")
+    )
+if refresher.error:
+    st.sidebar.warning(f"No se pudieron actualizar los datos: {refresher.error}")
+for name, error in (snapshot or {}).get('errors', {}).items():
+    st.sidebar.warning(f"Reporte `{name}` omitido: {error}")
+
+# Only summaries are read up front; an environment's tests load when it is selected
+with profiler.stage("load_summaries") as s:
+    if snapshot:
+        latest_summary, env_summaries = snapshot['latest_summary'], snapshot['env_summaries']
+    else:
+        latest_summary = load_latest_summary()
+        env_summaries = load_env_summaries()
+    s.rows = len(env_summaries)
 
-df = load_data()
-test_results = load_test_results_json()
-env_results = load_env_results()
+# Sidebar filters
+st.sidebar.subheader(":bar_chart: Filtros")
 
-if df.empty and test_results is None and not env_results:
+# Environment selector
+if env_summaries:
+    env_options = ['Ultima ejecucion'] + sorted(env_summaries.keys())
+    selected_env = st.sidebar.selectbox("Ambiente", env_options)
+else:
+    selected_env = 'Ultima ejecucion'
+
+from_snapshot = False
+with profiler.stage("load") as s:
+    if selected_env != 'Ultima ejecucion' and selected_env in env_summaries:
+        run_summary = env_summaries[selected_env]
+        df = load_env_data(selected_env)
+    elif snapshot:
+        # Already ingested by the refresher: one cached Parquet read
+        run_summary = latest_summary
+        latest_run_id = snapshot['latest_run_id']
+        df = load_run(str(STORE_DIR), latest_run_id) if latest_run_id is not None else empty_results()
+        from_snapshot = True
+    else:
+        run_summary = latest_summary
+        df = load_data()
+    s.rows = len(df)
+
+if df.empty and latest_summary is None and not env_summaries:
     st.warning("No se encontraron resultados de tests.")
     st.info("""
     Archivos esperados en `data/`:
@@ -75,12 +171,11 @@ if df.empty and test_results is None and not env_results:
     st.stop()
 
 # Environment comparison section
-if env_results and len(env_results) > 1:
+if env_summaries and len(env_summaries) > 1:
     st.subheader(":earth_americas: Comparacion por Ambiente")
 
-    env_cols = st.columns(len(env_results))
-    for i, (env_name, data) in enumerate(sorted(env_results.items())):
-        summary = data.get('summary', {})
+    env_cols = st.columns(len(env_summaries))
+    for i, (env_name, summary) in enumerate(sorted(env_summaries.items())):
         total = summary.get('total', 0)
         passed = summary.get('passed', 0)
         failed = summary.get('failed', 0)
@@ -98,47 +193,80 @@ if env_results and len(env_results) > 1:
             if 'startTime' in summary:
                 st.caption(f"Run: {summary['startTime'][:16]}")
 
-    st.markdown("---")
+    with st.expander(":twisted_rightwards_arrows: Diferencias de tests entre ambientes"):
+        env_names = sorted(env_summaries)
+        base_default = env_names.index('QA') if 'QA' in env_names else 0
+        col1, col2 = st.columns(2)
+        with col1:
+            base_env = st.selectbox("Base", env_names, index=base_default)
+        with col2:
+            compare_options = [e for e in env_names if e != base_env]
+            compare_env = st.selectbox("Comparar con", compare_options)
+        # Both environments' tests are only loaded when asked for
+        if st.toggle("Comparar tests"):
+            with profiler.stage("diff_envs") as s:
+                env_diff = diff_runs(load_env_data(base_env), load_env_data(compare_env))
+                s.rows = len(env_diff)
+                render_diff(env_diff)
 
-# Sidebar filters
-st.sidebar.subheader(":bar_chart: Filtros")
-
-# Environment selector
-if env_results:
-    env_options = ['Ultima ejecucion'] + sorted(env_results.keys())
-    selected_env = st.sidebar.selectbox("Ambiente", env_options)
-    if selected_env != 'Ultima ejecucion' and selected_env in env_results:
-        test_results = env_results[selected_env]
-else:
-    selected_env = 'Ultima ejecucion'
+    st.markdown("---")
 
-available_suites = ['Todos'] + list(df['suite'].unique())
+# Changes against the previous run of the same environment, computed at ingestion
+if 'run_id' in df.columns and not df.empty:
+    with profiler.stage("diff_previous") as s:
+        run_diff, previous_run_id = load_run_diff(str(STORE_DIR), str(df['run_id'].iloc[0]))
+        s.rows = len(run_diff)
+    if previous_run_id is not None:
+        with st.expander(f":arrows_counterclockwise: Cambios vs ejecucion anterior ({previous_run_id})"):
+            render_diff(run_diff)
+
+# Filters and metrics are answered from the aggregate cube, built once per data version
+with profiler.stage("cube") as s:
+    cube = snapshot['cube'] if from_snapshot else get_cube(df)
+    s.rows = len(cube)
+
+available_suites = ['Todos'] + dimension_values(cube, 'suite')
 selected_suite = st.sidebar.selectbox("Suite de Tests", available_suites)
 
-available_statuses = ['Todos'] + list(df['status'].unique())
+available_statuses = ['Todos'] + dimension_values(cube, 'status')
 selected_status = st.sidebar.selectbox("Estado", available_statuses)
 
 if 'browser' in df.columns:
-    available_browsers = ['Todos'] + list(df['browser'].unique())
+    available_browsers = ['Todos'] + dimension_values(cube, 'browser')
     selected_browser = st.sidebar.selectbox("Navegador/Tipo", available_browsers)
 else:
     selected_browser = 'Todos'
 
-# Apply filters
-filtered_df = df.copy()
-if selected_suite != 'Todos':
-    filtered_df = filtered_df[filtered_df['suite'] == selected_suite]
-if selected_status != 'Todos':
-    filtered_df = filtered_df[filtered_df['status'] == selected_status]
-if selected_browser != 'Todos' and 'browser' in filtered_df.columns:
-    filtered_df = filtered_df[filtered_df['browser'] == selected_browser]
+tag_index = get_tag_index(df)
+selected_tags = st.sidebar.multiselect("Tags", tag_index.tags(), help="Tests con todos los tags seleccionados")
+
+row_filters = {"suite": selected_suite, "status": selected_status, "browser": selected_browser}
+filters = {**row_filters, "tags": tag_index.matching_combinations(selected_tags)}
+# Views of the shared data for one filter selection (sliced cube, metrics,
+# figures) are computed once per process and shared by every session
+def view(name, compute):
+    return get_view(cube, filters, name, compute)
+
+with profiler.stage("filter") as s:
+    filtered_cube = view("slice", lambda: slice_cube(cube, **filters))
+
+    # Rows are only needed for the histogram, the detailed table and the export;
+    # the tag filter comes from the tag bitmaps. Sessions keep a mask over the
+    # shared frame rather than a filtered copy of it.
+    row_mask = filter_mask(df, **row_filters)
+    tag_mask = tag_index.mask(selected_tags)
+    if tag_mask is not None:
+        row_mask &= tag_mask
+    filtered_rows = int(row_mask.sum())
+    s.rows = filtered_rows
 
 # Calculate metrics
-metrics = calculate_metrics(filtered_df)
+with profiler.stage("metrics", rows=len(filtered_cube)):
+    metrics = view("metrics", lambda: cube_metrics(filtered_cube))
 
-# Display summary from test-results.json if available
-if test_results:
-    summary = test_results['summary']
+# Display summary of the selected run if available
+if run_summary:
+    summary = run_summary
     st.subheader(":chart_with_upwards_trend: Ultima Ejecucion")
 
     col1, col2, col3, col4, col5 = st.columns(5)
@@ -162,7 +290,7 @@ if test_results:
 # Key metrics
 st.subheader(":bar_chart: Metricas por Filtro")
 
-col1, col2, col3, col4 = st.columns(4)
+col1, col2, col3, col4, col5 = st.columns(5)
 
 with col1:
     st.metric("Total de Tests", metrics['total_tests'])
@@ -173,6 +301,15 @@ with col3:
     st.metric("Tests Fallidos", metrics['failed'])
 with col4:
     st.metric("Tiempo Promedio", f"{metrics['avg_execution_time']}s")
+with col5:
+    st.metric("Tiempo P95", f"{metrics['p95_execution_time']}s",
+              delta=f"max {metrics['max_execution_time']}s", delta_color="off")
+
+# Per-tag metrics
+tag_metrics = view("tag_metrics", lambda: cube_tag_metrics(filtered_cube))
+if not tag_metrics.empty:
+    with st.expander(":label: Metricas por Tag"):
+        st.dataframe(tag_metrics, use_container_width=True, hide_index=True)
 
 # Charts
 st.markdown("---")
@@ -181,115 +318,137 @@ st.subheader(":bar_chart: Analisis Visual")
 col1, col2 = st.columns(2)
 
 with col1:
-    if not filtered_df.empty:
-        status_counts = filtered_df['status'].value_counts()
-        fig_pie = px.pie(
-            values=status_counts.values,
-            names=status_counts.index,
-            title="Distribucion por Estado",
-            color_discrete_map={
-                'Passed': '#2ca02c',
-                'Failed': '#d62728',
-                'Skipped': '#ff7f0e',
-                'Error': '#8B0000'
-            }
-        )
-        fig_pie.update_traces(textposition='inside', textinfo='percent+label')
-        st.plotly_chart(fig_pie, use_container_width=True)
+    if filtered_rows:
+        with profiler.stage("chart_status", rows=len(filtered_cube)) as s:
+            fig_pie = view("status", lambda: status_chart(filtered_cube))
+            s.payload(fig_pie)
+            st.plotly_chart(fig_pie, use_container_width=True)
 
 with col2:
-    if not filtered_df.empty:
-        module_status = filtered_df.groupby(['module', 'status']).size().reset_index(name='count')
-        fig_bar = px.bar(
-            module_status,
-            x='module',
-            y='count',
-            color='status',
-            title="Tests por Modulo",
-            color_discrete_map={
-                'Passed': '#2ca02c',
-                'Failed': '#d62728',
-                'Skipped': '#ff7f0e',
-                'Error': '#8B0000'
-            }
-        )
-        fig_bar.update_layout(xaxis_tickangle=-45)
-        st.plotly_chart(fig_bar, use_container_width=True)
+    if filtered_rows:
+        with profiler.stage("chart_modules", rows=len(filtered_cube)) as s:
+            fig_bar = view("modules", lambda: modules_chart(filtered_cube))
+            s.payload(fig_bar)
+            st.plotly_chart(fig_bar, use_container_width=True)
 
 # Execution time analysis
-if not filtered_df.empty and 'time' in filtered_df.columns:
+if filtered_rows and 'time' in df.columns:
     st.subheader(":stopwatch: Analisis de Tiempos de Ejecucion")
 
     col1, col2 = st.columns(2)
 
     with col1:
-        fig_time = px.histogram(
-            filtered_df,
-            x='time',
-            nbins=20,
-            title="Distribucion de Tiempos de Ejecucion",
-            labels={'time': 'Tiempo (segundos)', 'count': 'Numero de Tests'}
-        )
-        st.plotly_chart(fig_time, use_container_width=True)
+        with profiler.stage("chart_histogram", rows=filtered_rows) as s:
+            fig_time = view("histogram", lambda: histogram_chart(df['time'].to_numpy()[row_mask]))
+            s.payload(fig_time)
+            st.plotly_chart(fig_time, use_container_width=True)
 
     with col2:
-        if len(filtered_df['module'].unique()) > 1:
-            avg_time = filtered_df.groupby('module')['time'].mean().reset_index()
-            avg_time = avg_time.sort_values('time', ascending=False).head(10)
-            fig_avg = px.bar(
-                avg_time,
-                x='module',
-                y='time',
-                title="Tiempo Promedio por Modulo (Top 10)",
-                labels={'time': 'Tiempo Promedio (s)'}
-            )
-            fig_avg.update_layout(xaxis_tickangle=-45)
-            st.plotly_chart(fig_avg, use_container_width=True)
+        with profiler.stage("chart_module_time", rows=len(filtered_cube)) as s:
+            fig_avg = view("module_time", lambda: module_time_chart(filtered_cube))
+            if fig_avg is not None:
+                s.payload(fig_avg)
+                st.plotly_chart(fig_avg, use_container_width=True)
+
+# Duration percentiles
+if filtered_rows:
+    with st.expander(":hourglass: Percentiles de Duracion"):
+        with profiler.stage("percentiles") as s:
+            st.markdown("**Seleccion actual por modulo**")
+            module_percentiles = view("module_percentiles", lambda: cube_module_percentiles(filtered_cube))
+            st.dataframe(module_percentiles, use_container_width=True, hide_index=True)
+
+            st.markdown("**Historial** (combinando los sketches guardados por ejecucion)")
+            hist_col1, hist_col2 = st.columns(2)
+            with hist_col1:
+                level_label = st.selectbox("Agrupar por", list(PERCENTILE_LEVELS.keys()))
+            with hist_col2:
+                period_label = st.selectbox("Periodo", list(PERCENTILE_PERIODS.keys()))
+            period_days = PERCENTILE_PERIODS[period_label]
+            since = pd.Timestamp.now(tz='UTC') - pd.Timedelta(days=period_days) if period_days else None
+            level = PERCENTILE_LEVELS[level_label]
+            envs = [selected_env] if selected_env in env_summaries and level != "environment" else None
+            history_percentiles = load_duration_percentiles(str(STORE_DIR), level=level, envs=envs, since=since)
+            s.rows = len(module_percentiles) + len(history_percentiles)
+            s.payload(module_percentiles)
+            s.payload(history_percentiles)
+            st.dataframe(history_percentiles, use_container_width=True, hide_index=True)
 
 # Detailed results table
 st.markdown("---")
 st.subheader(":clipboard: Resultados Detallados")
 
-if not filtered_df.empty:
-    failed_tests = filtered_df[filtered_df['status'] == 'Failed']
-    if not failed_tests.empty:
-        with st.expander(f"Tests Fallidos ({len(failed_tests)})"):
-            st.dataframe(
-                failed_tests[['name', 'module', 'suite', 'time']],
-                use_container_width=True
-            )
+if filtered_rows:
+    with profiler.stage("tables") as s:
+        # Only the visible page is sent; search and sorting run on the prebuilt index
+        index = get_index(df)
+        table_col1, table_col2, table_col3, table_col4 = st.columns([3, 2, 1, 1])
+        with table_col1:
+            query = st.text_input("Buscar", placeholder="Titulo, modulo o @tag")
+        with table_col2:
+            status_view = st.radio("Mostrar", list(STATUS_VIEWS.keys()), horizontal=True)
+        with table_col3:
+            sort_label = st.selectbox("Ordenar por", list(SORT_OPTIONS.keys()))
+            descending = st.checkbox("Descendente", value=SORT_OPTIONS[sort_label] == "time")
+        with table_col4:
+            page_size = st.selectbox("Filas", PAGE_SIZES)
+
+        table_mask = row_mask & filter_mask(df, status=STATUS_VIEWS[status_view])
+        matches = index.search(query)
+        if matches is not None:
+            table_mask &= matches
+        rows = index.ordered_rows(table_mask, SORT_OPTIONS[sort_label], descending)
+
+        page_count = max(1, -(-len(rows) // page_size))
+        page = st.number_input("Pagina", min_value=1, max_value=page_count, value=1, step=1)
+        page_df = df.iloc[page_rows(rows, int(page), page_size)][DETAIL_COLUMNS]
+        # A categorical page would ship every category of the shared frame
+        page_df = page_df.astype({c: str for c in page_df.select_dtypes('category').columns})
+        st.caption(f"{len(rows)} resultados - pagina {int(page)} de {page_count}")
+        s.rows = len(rows)
+        s.payload(page_df)
+        st.dataframe(page_df, use_container_width=True, hide_index=True)
 
-    skipped_tests = filtered_df[filtered_df['status'] == 'Skipped']
-    if not skipped_tests.empty:
-        with st.expander(f"Tests Skipped ({len(skipped_tests)})"):
-            st.dataframe(
-                skipped_tests[['name', 'module', 'suite', 'time']],
-                use_container_width=True
+# Export
+st.markdown("---")
+if filtered_rows:
+    with profiler.stage("export", rows=filtered_rows):
+        export_format = st.radio("Formato", list(EXPORT_FORMATS), horizontal=True)
+        extension, mime = EXPORT_FORMATS[export_format]
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        # Files are generated only when a button is clicked, not on every rerun
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button(
+                label=f":floppy_disk: Descargar resultados filtrados ({export_format})",
+                data=lambda: export_frame(df[row_mask], export_format),
+                file_name=f"qa_results_{timestamp}.{extension}",
+                mime=mime
+            )
+        with col2:
+            st.download_button(
+                label=f":file_cabinet: Descargar historial completo ({export_format})",
+                data=lambda: export_history(str(STORE_DIR), export_format),
+                file_name=f"qa_history_{timestamp}.{extension}",
+                mime=mime,
+                disabled=not (STORE_DIR / RUNS_FILE).exists()
             )
 
-    st.dataframe(
-        filtered_df[['name', 'module', 'suite', 'status', 'time']],
-        use_container_width=True,
-        hide_index=True
-    )
+# Parse cache statistics
+cache_stats = parse_cache_stats()
+st.sidebar.caption(
+    f"Cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+    f"({cache_stats['bytes'] / 1024 / 1024:.1f} MB)"
+)
 
-# Export
-st.markdown("---")
-if not filtered_df.empty:
-    csv = filtered_df.to_csv(index=False)
-    st.download_button(
-        label=":floppy_disk: Descargar CSV",
-        data=csv,
-        file_name=f"qa_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-        mime="text/csv"
-    )
+render_panel(profiler)
 
 # Footer
 st.markdown("---")
 st.markdown(
     f"""
     <div style='text-align: center; color: #666; font-size: 0.8em;'>
-        QA Automation Dashboard - Dropea | Ultima actualizacion: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+        QA Automation Dashboard - Dropea | Datos: {datetime.fromtimestamp(snapshot['data_time']).strftime('%Y-%m-%d %H:%M:%S') if snapshot else '-'}
     </div>
     """,
     unsafe_allow_html=True
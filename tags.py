@@ -0,0 +1,104 @@
+import pandas as pd
+import numpy as np
+import weakref
+from sketches import merge_digests
+
+
+TAG_METRIC_COLUMNS = ["tag", "total", "passed", "failed", "pass_rate", "avg_time", "p95_time"]
+
+_indexes = {}
+
+
+def split_tags(label):
+    """Tags of a tags-column value ('@smoke @stable' -> ['@smoke', '@stable'])"""
+    return str(label).split() if label else []
+
+
+class TagIndex:
+    """Inverted index from tag to a packed bitmap of the rows carrying it.
+
+    The tags column holds one category per tag combination, so each bitmap
+    is built from a lookup over category codes, never from the titles.
+    Bitmaps take one bit per row and combine with bitwise AND before a
+    single unpack into a row mask.
+    """
+
+    def __init__(self, df):
+        self.size = len(df)
+        self.bitmaps = {}
+        self.combinations = {}
+        if 'tags' not in df.columns or self.size == 0:
+            return
+        tags = df['tags'].astype('category')
+        codes = tags.cat.codes.to_numpy()
+        by_tag = {}
+        for code, label in enumerate(tags.cat.categories):
+            for tag in split_tags(label):
+                by_tag.setdefault(tag, []).append(code)
+        for tag, tag_codes in by_tag.items():
+            hit = np.zeros(len(tags.cat.categories) + 1, dtype=bool)
+            hit[tag_codes] = True
+            self.bitmaps[tag] = np.packbits(hit[codes])
+            self.combinations[tag] = [tags.cat.categories[c] for c in tag_codes]
+
+    def tags(self):
+        return sorted(self.bitmaps)
+
+    def mask(self, tags):
+        """Row mask of rows carrying every tag in tags; None when no tag is selected"""
+        if not tags:
+            return None
+        bits = None
+        for tag in tags:
+            tag_bits = self.bitmaps.get(tag)
+            if tag_bits is None:
+                return np.zeros(self.size, dtype=bool)
+            bits = tag_bits if bits is None else bits & tag_bits
+        return np.unpackbits(bits, count=self.size).astype(bool)
+
+    def matching_combinations(self, tags):
+        """Values of the tags column that include every tag in tags, for cube filters"""
+        if not tags:
+            return None
+        return [c for c in self.combinations.get(tags[0], []) if set(tags) <= set(split_tags(c))]
+
+
+def get_tag_index(df):
+    """TagIndex for df, built once per DataFrame object (see cube.get_cube)"""
+    key = id(df)
+    index = _indexes.get(key)
+    if index is None:
+        index = TagIndex(df)
+        _indexes[key] = index
+        weakref.finalize(df, _indexes.pop, key, None)
+    return index
+
+
+def cube_tag_metrics(cube):
+    """Pass rate, mean and p95 duration per tag, answered from cube cells.
+
+    A test with several tags counts towards each of them.
+    """
+    if cube.empty or 'tags' not in cube.columns:
+        return pd.DataFrame(columns=TAG_METRIC_COLUMNS)
+
+    rows = []
+    cells_by_tag = {}
+    for label, cells in cube.groupby('tags', observed=True, sort=False):
+        for tag in split_tags(label):
+            cells_by_tag.setdefault(tag, []).append(cells)
+    for tag, frames in cells_by_tag.items():
+        cells = pd.concat(frames)
+        total = int(cells['count'].sum())
+        by_status = cells.groupby('status', observed=True)['count'].sum()
+        passed = int(by_status.get('Passed', 0))
+        rows.append({
+            "tag": tag,
+            "total": total,
+            "passed": passed,
+            "failed": int(by_status.get('Failed', 0)),
+            "pass_rate": round(passed / total * 100, 2) if total else 0,
+            "avg_time": round(float(cells['time_sum'].sum()) / total, 2) if total else 0,
+            "p95_time": round(merge_digests(cells['sketch']).quantile(0.95), 2)
+        })
+    return pd.DataFrame(rows, columns=TAG_METRIC_COLUMNS).sort_values('total', ascending=False, ignore_index=True)
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+from flaky import compute_flakiness, build_flaky_state, rank_flakiness, append_flaky_run
+
+
+def make_runs(n_runs=150, n_tests=12, envs=("QA", "DEV"), seed=3):
+    """(env, run_id, df) of each run in start order, tests failing at random rates"""
+    rng = np.random.default_rng(seed)
+    fail_rate = rng.uniform(0, 0.6, n_tests)
+    start = pd.Timestamp("2026-01-01", tz="UTC")
+    runs = []
+    for i in range(n_runs):
+        env = envs[i % len(envs)]
+        # Every test runs in most runs; a few repeat (retries) or are skipped
+        tests = np.r_[np.arange(n_tests)[rng.random(n_tests) < 0.9], rng.integers(0, n_tests, 2)]
+        status = np.where(rng.random(len(tests)) < fail_rate[tests], "Failed", "Passed")
+        status[rng.random(len(tests)) < 0.05] = "Skipped"
+        runs.append((env, f"run{i:03d}-{env}", pd.DataFrame({
+            "file": [f"tests/t{t % 4}.spec.js" for t in tests],
+            "line": tests * 10,
+            "name": [f"test {t}" for t in tests],
+            "module": [f"t{t % 4}.spec.js" for t in tests],
+            "status": status,
+            "env": env,
+            "timestamp": start + pd.to_timedelta(i * 3600 + np.arange(len(tests)), unit="s")
+        })))
+    return runs
+
+
+def test_state_ranking_matches_full_history():
+    runs = make_runs()
+    history = pd.concat([df for _, _, df in runs], ignore_index=True)
+    states = {env: build_flaky_state((run_id, df) for e, run_id, df in runs if e == env) for env in ("QA", "DEV")}
+
+    expected = compute_flakiness(history)
+    ranked = rank_flakiness(states)
+    key = ["file", "line", "name"]
+    expected, ranked = expected.sort_values(key, ignore_index=True), ranked.sort_values(key, ignore_index=True)
+    pd.testing.assert_frame_equal(ranked[expected.columns], expected, check_dtype=False)
+
+
+def test_state_survives_parquet_round_trip(tmp_path):
+    runs = [(run_id, df) for env, run_id, df in make_runs(n_runs=40, envs=("QA",))]
+    path = tmp_path / "state.parquet"
+    state = None
+    for run_id, df in runs:
+        state = append_flaky_run(state, run_id, df)
+        state.to_parquet(path, index=False)
+        state = pd.read_parquet(path)
+    pd.testing.assert_frame_equal(state, build_flaky_state(runs), check_dtype=False)
@@ -0,0 +1,59 @@
+import os
+import shutil
+import refresh
+from refresh import DataRefresher
+from snapshot import build_snapshot
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+
+
+def make_data_dir(tmp_path):
+    """Copy of the sample reports plus a truncated environment report"""
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    for name in ("test-results.json", "test-results-qa.json", "test-results-dev.json"):
+        shutil.copy(os.path.join(DATA_DIR, name), data_dir / name)
+    with open(os.path.join(DATA_DIR, "test-results-qa.json"), 'rb') as f:
+        (data_dir / "test-results-stg.json").write_bytes(f.read(5000))
+    return str(data_dir)
+
+
+def test_malformed_report_is_skipped(tmp_path):
+    data_dir = make_data_dir(tmp_path)
+    snapshot = build_snapshot(data_dir, str(tmp_path / "store"))
+    assert sorted(snapshot['run_ids']) == ["DEV", "QA"]
+    assert sorted(snapshot['env_summaries']) == ["DEV", "QA"]
+    assert list(snapshot['errors']) == ["test-results-stg.json"]
+    assert snapshot['latest_run_id'] is not None
+
+
+def test_failed_build_waits_for_changed_reports(tmp_path, monkeypatch):
+    data_dir = make_data_dir(tmp_path)
+    builds = []
+
+    def failing_write(data_dir, store_dir):
+        builds.append(data_dir)
+        raise OSError("disk full")
+
+    monkeypatch.setattr(refresh, "write_snapshot", failing_write)
+    refresher = DataRefresher(data_dir, str(tmp_path / "store"))
+    for _ in range(3):
+        try:
+            refresher.check()
+        except OSError:
+            pass
+    assert len(builds) == 1
+
+    os.remove(os.path.join(data_dir, "test-results-stg.json"))
+    try:
+        refresher.check()
+    except OSError:
+        pass
+    assert len(builds) == 2
+
+    refresher.poke()
+    try:
+        refresher.check()
+    except OSError:
+        pass
+    assert len(builds) == 3
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+from regressions import detect_regressions, STATE_KEY_COLUMNS
+
+
+def make_state(series):
+    """Duration state of one test per series, one column per run"""
+    series = np.asarray(series, dtype='float64')
+    runs = [f"2026010{i // 10}T{i % 10:02d}0000000Z" for i in range(series.shape[1])]
+    keys = pd.DataFrame({
+        "key": np.arange(len(series), dtype='uint64'),
+        "name": [f"test {i}" for i in range(len(series))],
+        "module": [f"module{i}" for i in range(len(series))],
+        "file": [f"tests/module{i}.spec.js" for i in range(len(series))],
+        "line": 1
+    })
+    return pd.concat([keys, pd.DataFrame(series, columns=runs)], axis=1)[STATE_KEY_COLUMNS + runs]
+
+
+def test_gradual_ramp_is_a_regression():
+    rng = np.random.default_rng(0)
+    ramp = np.linspace(3, 12, 30) * rng.normal(1, 0.03, 30)
+    result = detect_regressions(make_state([ramp]), "QA")
+    test = result[result['level'] == 'test'].iloc[0]
+    assert test['regression']
+    assert test['change_score'] >= 5
+
+
+def test_step_is_a_regression_and_noise_is_not():
+    rng = np.random.default_rng(1)
+    step = np.r_[np.full(22, 4.0), np.full(8, 8.0)] * rng.normal(1, 0.03, 30)
+    noise = 4.0 * rng.normal(1, 0.1, 30)
+    result = detect_regressions(make_state([step, noise]), "QA")
+    tests = result[result['level'] == 'test'].set_index('name')
+    assert tests.loc['test 0', 'regression']
+    assert not tests.loc['test 1', 'regression']
+
+
+def test_small_sub_second_shift_is_not_a_regression():
+    fast = np.r_[np.full(15, 0.2), np.full(15, 0.4)]
+    result = detect_regressions(make_state([fast]), "QA")
+    assert not result['regression'].any()
@@ -0,0 +1,39 @@
+from signatures import normalize_message, cluster_messages
+
+
+def clusters(messages):
+    """Cluster id of each raw message"""
+    return list(cluster_messages([normalize_message(m) for m in messages]))
+
+
+def visible_failure(locator, timeout=5000):
+    return (f"Error: expect(locator).toBeVisible() failed\n\nLocator: {locator}\n"
+            f"Expected: visible\nReceived: hidden\nTimeout: {timeout}ms\n\nCall log:\n  - waiting for {locator}")
+
+
+def test_same_matcher_and_locator_merge():
+    locator = "locator('text=Historial de Estados').first()"
+    a, b = clusters([visible_failure(locator, 5000), visible_failure(locator, 60000)])
+    assert a == b
+
+
+def test_different_locators_stay_separate():
+    a, b = clusters([
+        visible_failure("locator('text=Historial de Estados').first()"),
+        visible_failure("locator('text=Historial de Pagos').first()")
+    ])
+    assert a != b
+
+
+def test_different_matchers_stay_separate():
+    template = ("Error: expect(locator).{matcher}(expected) failed\n\nLocator: locator('#titulo')\n"
+                "Expected string: \"Pedidos\"\nReceived string: \"Inicio\"\nTimeout: 5000ms")
+    a, b = clusters([template.format(matcher="toHaveText"), template.format(matcher="toContainText")])
+    assert a != b
+
+
+def test_call_log_locator_keeps_timeouts_apart():
+    template = "TimeoutError: locator.click: Timeout 15000ms exceeded.\nCall log:\n  - waiting for {}\n"
+    a, b = clusters([template.format("getByRole('button', { name: 'Guardar' })"),
+                     template.format("getByRole('button', { name: 'Borrar' })")])
+    assert a != b
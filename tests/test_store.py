@@ -0,0 +1,62 @@
+import glob
+import os
+import shutil
+from store import ingest_report, load_runs, load_run, load_failures, _read_manifest, DEFAULT_ENV
+from signatures import failure_rows
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+
+
+def copy_report(tmp_path, name):
+    """A sample report copied under tmp_path"""
+    return shutil.copy(os.path.join(DATA_DIR, "test-results-qa.json"), tmp_path / name)
+
+
+def test_same_report_under_two_environments_is_two_runs(tmp_path):
+    store_dir = str(tmp_path / "store")
+    path = copy_report(tmp_path, "report.json")
+    qa = ingest_report(path, store_dir, env="QA")
+    dev = ingest_report(path, store_dir, env="DEV")
+
+    assert qa != dev
+    assert sorted(load_runs(store_dir)['env']) == ["DEV", "QA"]
+    assert set(load_run(store_dir, qa)['env']) == {"QA"}
+    assert set(load_run(store_dir, dev)['env']) == {"DEV"}
+    assert ingest_report(path, store_dir, env="QA") == qa
+
+
+def test_latest_copy_moves_to_its_environment(tmp_path):
+    store_dir = str(tmp_path / "store")
+    latest = copy_report(tmp_path, "test-results.json")
+    env_file = copy_report(tmp_path, "test-results-qa.json")
+    default_run = ingest_report(latest, store_dir)
+    qa = ingest_report(env_file, store_dir, env="QA")
+
+    runs = load_runs(store_dir)
+    assert list(runs['run_id']) == [qa] and list(runs['env']) == ["QA"]
+    assert qa != default_run
+    assert set(load_run(store_dir, qa)['run_id']) == {qa}
+    # The copy resolves to the moved run without a second one under DEFAULT_ENV
+    assert ingest_report(latest, store_dir, env=DEFAULT_ENV) == qa
+
+
+def test_relabel_leaves_cached_manifest_untouched(tmp_path):
+    store_dir = str(tmp_path / "store")
+    latest = copy_report(tmp_path, "test-results.json")
+    default_run = ingest_report(latest, store_dir)
+    before = _read_manifest(store_dir)
+    ingest_report(copy_report(tmp_path, "test-results-qa.json"), store_dir, env="QA")
+    assert before[os.path.abspath(latest)]['run_id'] == default_run
+
+
+def test_relabelled_run_keeps_its_failures(tmp_path):
+    store_dir = str(tmp_path / "store")
+    ingest_report(copy_report(tmp_path, "test-results.json"), store_dir)
+    qa = ingest_report(copy_report(tmp_path, "test-results-qa.json"), store_dir, env="QA")
+
+    failures = load_failures(store_dir)
+    expected = failure_rows(load_run(store_dir, qa))
+    assert len(failures) == len(expected) > 0
+    assert set(failures['env']) == {"QA"}
+    assert list(failures['fingerprint']) == list(expected['fingerprint'])
+    assert not glob.glob(os.path.join(store_dir, "failures", f"env={DEFAULT_ENV}", "*", "*.parquet"))
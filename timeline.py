@@ -0,0 +1,278 @@
+import heapq
+import re
+import numpy as np
+import pandas as pd
+
+
+# Playwright setup projects (auth.setup.js, auth-admin.setup.ts, ...) run
+# one after another before any other test starts.
+SETUP_FILE_PATTERN = re.compile(r"\.setup\.[cm]?[jt]s$", re.IGNORECASE)
+
+# Idle time on a worker shorter than this is scheduling noise, not a gap
+MIN_IDLE_GAP = 1.0
+
+# Most bars sent to the browser for one timeline. Lanes with more tests
+# than their share have neighbouring tests merged into one bar.
+MAX_TIMELINE_BARS = 2000
+MIN_LANE_BARS = 50
+
+SCHEDULE_COLUMNS = ["lane", "worker", "shard", "start", "end", "name", "module", "file", "status", "setup"]
+SEGMENT_COLUMNS = ["lane", "start", "end", "tests", "label", "status", "setup", "critical"]
+GAP_COLUMNS = ["lane", "start", "end", "seconds"]
+
+# Status of a merged bar: the worst status among its tests
+STATUS_SEVERITY = {"Error": 3, "Failed": 2, "Skipped": 1, "Passed": 0}
+
+
+def setup_files(files):
+    """Whether each file is a setup project, matched once per distinct file"""
+    files = files.astype("category")
+    matches = np.array([bool(SETUP_FILE_PATTERN.search(str(f))) for f in files.cat.categories], dtype=bool)
+    codes = files.cat.codes.to_numpy()
+    return np.where(codes >= 0, matches[codes] if len(matches) else False, False)
+
+
+def _executed(df):
+    tests = df[(df['status'] != 'Skipped') & (df['time'] > 0)]
+    return pd.DataFrame({
+        "worker": tests['worker'].to_numpy(dtype='int64'),
+        "shard": tests['shard'].to_numpy(dtype='int64'),
+        "start": tests['start_offset'].to_numpy(dtype='float64'),
+        "time": tests['time'].to_numpy(dtype='float64'),
+        "name": tests['name'].astype(str).to_numpy(),
+        "module": tests['module'].astype(str).to_numpy(),
+        "file": tests['file'].astype(str).to_numpy(),
+        "status": tests['status'].astype(str).to_numpy(),
+        "setup": setup_files(tests['file'])
+    })
+
+
+def _assign_lanes(start, end):
+    """Fewest lanes for measured intervals without worker ids (interval partitioning)"""
+    lanes = np.zeros(len(start), dtype='int64')
+    free = []
+    for i in np.argsort(start, kind='stable'):
+        if free and free[0][0] <= start[i] + 1e-6:
+            _, lane = heapq.heappop(free)
+        else:
+            lane = len(free)
+        lanes[i] = lane
+        heapq.heappush(free, (end[i], lane))
+    return lanes
+
+
+def _min_workers(tests, wall, fully_parallel=False):
+    """Fewest workers that could fit the tests into the wall-clock time, and the most useful"""
+    setup = tests['setup'].to_numpy()
+    groups = (~setup).sum() if fully_parallel else tests.loc[~setup, 'file'].nunique()
+    files = max(1, int(groups))
+    window = wall - tests.loc[setup, 'time'].sum() if wall else 0
+    work = tests.loc[~setup, 'time'].sum()
+    if window <= 0 or work <= 0:
+        return 1, 1
+    return int(np.clip(np.floor(work / window), 1, files)), files
+
+
+def _reconstruct(tests, workers, fully_parallel=False):
+    """Start and worker of each test, replaying Playwright's scheduling.
+
+    Setup projects run first, one after another; then each spec file runs
+    whole on the first free worker, in report order. With fully_parallel
+    every test is scheduled on its own.
+    """
+    durations = tests['time'].to_numpy()
+    setup = tests['setup'].to_numpy()
+    start = np.zeros(len(tests))
+    lane = np.zeros(len(tests), dtype='int64')
+
+    setup_rows = np.flatnonzero(setup)
+    setup_ends = np.cumsum(durations[setup_rows])
+    start[setup_rows] = setup_ends - durations[setup_rows]
+    ready = setup_ends[-1] if len(setup_rows) else 0.0
+
+    rest = np.flatnonzero(~setup)
+    if fully_parallel:
+        codes = np.arange(len(rest))
+    else:
+        codes, _ = pd.factorize(tests['file'].to_numpy()[rest])
+    order = np.argsort(codes, kind='stable')
+    free = [(ready, w) for w in range(workers)]
+    for group in np.split(rest[order], np.flatnonzero(np.diff(codes[order])) + 1):
+        if not len(group):
+            continue
+        at, worker = heapq.heappop(free)
+        ends = at + np.cumsum(durations[group])
+        start[group] = ends - durations[group]
+        lane[group] = worker
+        heapq.heappush(free, (ends[-1], worker))
+    return start, lane
+
+
+def _replay(tests, wall):
+    """Reconstructed schedule with the fewest workers that finish within the wall-clock time.
+
+    Spec files are kept whole first; when even one worker per file cannot
+    finish in time, the run must have been fully parallel.
+    """
+    durations = tests['time'].to_numpy()
+    for fully_parallel in (False, True):
+        workers, most = _min_workers(tests, wall, fully_parallel)
+        start, lane = _reconstruct(tests, workers, fully_parallel)
+        while wall and workers < most and (start + durations).max() > wall:
+            workers += 1
+            start, lane = _reconstruct(tests, workers, fully_parallel)
+        if not wall or (start + durations).max() <= wall:
+            break
+    return start, lane
+
+
+def build_schedule(df, wall=None):
+    """When and where each executed test of a run ran.
+
+    Uses the start offsets and worker slots of the report when every test
+    has them; otherwise the schedule is reconstructed from durations with
+    the worker count the run's wall-clock time implies. Returns the
+    schedule (SCHEDULE_COLUMNS, one lane per shard and worker) and whether
+    it was measured.
+    """
+    if df.empty:
+        return pd.DataFrame(columns=SCHEDULE_COLUMNS), False
+    tests = _executed(df)
+    measured = len(tests) > 0 and not np.isnan(tests['start'].to_numpy()).any()
+
+    if measured:
+        start = tests['start'].to_numpy()
+        if (tests['worker'] < 0).any():
+            tests['worker'] = _assign_lanes(start, start + tests['time'].to_numpy())
+    else:
+        start, lane = _replay(tests, wall)
+        tests['worker'] = lane
+
+    lane_keys = pd.MultiIndex.from_arrays([tests['shard'], tests['worker']])
+    lanes, _ = pd.factorize(lane_keys, sort=True)
+    schedule = tests.assign(lane=lanes, start=start, end=start + tests['time'].to_numpy())
+    return schedule[SCHEDULE_COLUMNS].sort_values(['lane', 'start'], ignore_index=True), measured
+
+
+def lane_labels(schedule):
+    """Display name of each lane: worker, and shard when the run was sharded"""
+    lanes = schedule.drop_duplicates('lane').set_index('lane').sort_index()
+    sharded = lanes['shard'].nunique() > 1
+    return {
+        lane: f"Shard {row.shard} - Worker {row.worker}" if sharded else f"Worker {row.worker}"
+        for lane, row in lanes.iterrows()
+    }
+
+
+def idle_gaps(schedule, wall=None, min_gap=MIN_IDLE_GAP):
+    """Stretches of at least min_gap seconds where a lane ran nothing, longest first"""
+    if schedule.empty:
+        return pd.DataFrame(columns=GAP_COLUMNS)
+    end = max(wall or 0, schedule['end'].max())
+    lane = schedule['lane'].to_numpy()
+    busy_until = schedule.groupby('lane')['end'].cummax().to_numpy()
+    first = np.r_[True, lane[1:] != lane[:-1]]
+    last = np.r_[lane[1:] != lane[:-1], True]
+    # Before each test: since the lane's previous test ended (or the run started)
+    gap_start = np.where(first, 0.0, np.r_[0.0, busy_until[:-1]])
+    gaps = pd.DataFrame({"lane": lane, "start": gap_start, "end": schedule['start'].to_numpy()})
+    tail = pd.DataFrame({"lane": lane[last], "start": busy_until[last], "end": end})
+    gaps = pd.concat([gaps, tail], ignore_index=True)
+    gaps['seconds'] = gaps['end'] - gaps['start']
+    gaps = gaps[gaps['seconds'] >= min_gap]
+    return gaps.sort_values('seconds', ascending=False, ignore_index=True)[GAP_COLUMNS]
+
+
+def critical_path(schedule):
+    """Chain of tests that bounds the wall-clock time however many workers run.
+
+    Setup projects run serially and every other test waits for them. A
+    spec file whose tests all ran on one worker runs serially, so its chain
+    is their total; a file spread over workers ran in parallel and its
+    chain is its longest test. The critical path is every setup test
+    followed by the longest file chain. Returns its length in seconds, the
+    setup part and that spec file.
+    """
+    if schedule.empty:
+        return 0.0, 0.0, None
+    durations = schedule['end'] - schedule['start']
+    setup = schedule['setup'].to_numpy()
+    setup_seconds = float(durations[setup].sum())
+    by_file = pd.DataFrame({
+        "time": durations[~setup].to_numpy(), "lane": schedule.loc[~setup, 'lane'].to_numpy()
+    }).groupby(schedule.loc[~setup, 'file'].to_numpy())
+    if not by_file.ngroups:
+        return setup_seconds, setup_seconds, None
+    chains = by_file['time'].sum().where(by_file['lane'].nunique() == 1, by_file['time'].max())
+    return setup_seconds + float(chains.max()), setup_seconds, chains.idxmax()
+
+
+def critical_tests(schedule):
+    """Whether each test of a schedule is on its critical path"""
+    path_file = critical_path(schedule)[2]
+    in_file = (schedule['file'] == path_file).to_numpy()
+    if schedule.loc[in_file, 'lane'].nunique() > 1:
+        # The file ran in parallel: only its longest test is on the path
+        longest = (schedule['end'] - schedule['start']).where(in_file).idxmax()
+        in_file = schedule.index == longest
+    return schedule['setup'].to_numpy() | in_file
+
+
+def analyze_schedule(schedule, wall=None):
+    """Utilisation and the bounds on wall-clock time of a schedule"""
+    if schedule.empty:
+        return {}
+    lanes = int(schedule['lane'].nunique())
+    makespan = max(wall or 0, float(schedule['end'].max()))
+    durations = schedule['end'] - schedule['start']
+    busy = float(durations.sum())
+    path_seconds, setup_seconds, path_file = critical_path(schedule)
+    work = busy - setup_seconds
+    # Best case with the same workers: a perfect split after the setup
+    balanced = max(path_seconds, setup_seconds + work / lanes)
+    return {
+        "lanes": lanes,
+        "wall": makespan,
+        "busy": busy,
+        "idle": lanes * makespan - busy,
+        "utilization": busy / (lanes * makespan) if makespan else 0.0,
+        "setup_seconds": setup_seconds,
+        "critical_path": path_seconds,
+        "critical_file": path_file,
+        "balanced_wall": balanced,
+        "workers_for_critical_path": int(np.ceil(work / max(path_seconds - setup_seconds, 1e-9))) if work > 0 else lanes
+    }
+
+
+def lane_segments(schedule, max_bars=MAX_TIMELINE_BARS, min_lane_bars=MIN_LANE_BARS):
+    """Bars to draw for a schedule, at most about max_bars of them.
+
+    A lane within its share of bars keeps one bar per test. Busier lanes
+    are cut into equal time slots and the tests starting in the same slot
+    become one bar spanning them, labelled with their count and coloured by
+    their worst status.
+    """
+    if schedule.empty:
+        return pd.DataFrame(columns=SEGMENT_COLUMNS)
+    critical = critical_tests(schedule)
+
+    lanes = schedule['lane'].to_numpy()
+    budget = max(min_lane_bars, max_bars // max(1, schedule['lane'].nunique()))
+    per_lane = np.bincount(lanes)
+    resolution = max(float(schedule['end'].max()), 1e-9) / budget
+    slot = np.where(per_lane[lanes] > budget, np.floor(schedule['start'].to_numpy() / resolution), np.arange(len(lanes)))
+
+    grouped = schedule.assign(
+        slot=slot,
+        severity=schedule['status'].map(STATUS_SEVERITY).fillna(2).to_numpy(),
+        critical=critical
+    ).groupby(['lane', 'slot'], sort=True)
+    segments = grouped.agg(
+        start=('start', 'min'), end=('end', 'max'), tests=('name', 'size'), name=('name', 'first'),
+        severity=('severity', 'max'), setup=('setup', 'any'), critical=('critical', 'any')
+    ).reset_index()
+    statuses = {v: k for k, v in STATUS_SEVERITY.items()}
+    return segments.assign(
+        label=np.where(segments['tests'] > 1, segments['tests'].astype(str) + " tests", segments['name']),
+        status=segments['severity'].map(statuses)
+    )[SEGMENT_COLUMNS]
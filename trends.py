@@ -0,0 +1,140 @@
+"""Long-range trends: per-run series and their downsampling for charts.
+
+Run-level series (pass rate, failures, duration) come from the run index;
+per-module average times from a per-run module summary the store keeps
+for each environment. Series longer than a chart can show are reduced
+server-side with Largest-Triangle-Three-Buckets, which keeps the peaks and
+dips a plain stride would skip.
+"""
+import numpy as np
+import pandas as pd
+from store import load_runs, select_runs, load_module_trends
+
+
+# Module summary kept per environment: one row per run and module
+TREND_COLUMNS = ["run_id", "start_time", "module", "tests", "failed", "seconds"]
+
+RUN_METRICS = {
+    "pass_rate": "Tasa de exito (%)",
+    "failed": "Fallos",
+    "duration": "Duracion (s)"
+}
+
+# Points per series for a chart of CHART_WIDTH pixels: more than one point
+# per PIXELS_PER_POINT pixels is drawn on top of its neighbours.
+CHART_WIDTH = 1200
+PIXELS_PER_POINT = 2
+MIN_POINTS = 10
+
+
+def point_budget(width=CHART_WIDTH, pixels_per_point=PIXELS_PER_POINT):
+    """Most points worth sending for a series drawn across width pixels"""
+    return max(MIN_POINTS, int(width // pixels_per_point))
+
+
+def module_summary(run_id, start_time, df):
+    """Tests, failures and total seconds of each module in one run (TREND_COLUMNS)"""
+    ran = df[df['status'] != 'Skipped']
+    if ran.empty:
+        return pd.DataFrame(columns=TREND_COLUMNS)
+    summary = pd.DataFrame({
+        "module": ran['module'].astype(str).to_numpy(),
+        "failed": ran['status'].isin(['Failed', 'Error']).to_numpy(),
+        "seconds": ran['time'].to_numpy(dtype='float64')
+    }).groupby('module', sort=True).agg(
+        tests=('seconds', 'size'), failed=('failed', 'sum'), seconds=('seconds', 'sum')
+    ).reset_index()
+    return summary.assign(run_id=run_id, start_time=start_time)[TREND_COLUMNS]
+
+
+def run_series(runs):
+    """Run-level trend metrics, one row per run in start order"""
+    runs = runs.sort_values('start_time')
+    total = runs['total'].to_numpy(dtype='float64')
+    return pd.DataFrame({
+        "run_id": runs['run_id'].to_numpy(),
+        "env": runs['env'].to_numpy(),
+        "start_time": runs['start_time'].to_numpy(),
+        "pass_rate": np.where(total > 0, runs['passed'].to_numpy(dtype='float64') / np.maximum(total, 1) * 100, np.nan),
+        "failed": runs['failed'].to_numpy(dtype='float64'),
+        "duration": runs['duration'].to_numpy(dtype='float64')
+    })
+
+
+def module_series(trends, modules):
+    """Average seconds per test of each module in each run"""
+    rows = trends[trends['module'].isin(modules) & (trends['tests'] > 0)]
+    return pd.DataFrame({
+        "start_time": rows['start_time'].to_numpy(),
+        "module": rows['module'].to_numpy(),
+        "avg_time": (rows['seconds'] / rows['tests']).to_numpy(dtype='float64')
+    }).sort_values('start_time', ignore_index=True)
+
+
+def top_modules(trends, n=5):
+    """Modules with the most seconds in the latest run"""
+    if trends.empty:
+        return []
+    latest = trends[trends['start_time'] == trends['start_time'].max()]
+    return list(latest.nlargest(n, 'seconds')['module'])
+
+
+def lttb(x, y, threshold):
+    """Indices of the points Largest-Triangle-Three-Buckets keeps.
+
+    The first and last points are always kept; the points between are
+    split into threshold - 2 buckets and each keeps the point forming the
+    largest triangle with the point kept before it and the mean of the next
+    bucket.
+    """
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    every = (n - 2) / (threshold - 2)
+    edges = (np.floor(np.arange(threshold - 1) * every) + 1).astype('int64')
+    counts = np.diff(edges)
+    # Mean of each bucket; after the last bucket comes the last point
+    next_x = np.r_[np.add.reduceat(x[:n - 1], edges[:-1])[1:] / counts[1:], x[-1]]
+    next_y = np.r_[np.add.reduceat(y[:n - 1], edges[:-1])[1:] / counts[1:], y[-1]]
+
+    keep = np.empty(threshold, dtype='int64')
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        area = np.abs((x[a] - next_x[i]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (next_y[i] - y[a]))
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+
+def downsample(series, value, budget, start=None, end=None):
+    """Rows of a time series within [start, end], reduced to at most budget points.
+
+    Rows with no value are dropped. Zooming into a narrower range yields
+    finer data, since the budget is spent on that range alone.
+    """
+    rows = series[series[value].notna()]
+    if start is not None:
+        rows = rows[rows['start_time'] >= start]
+    if end is not None:
+        rows = rows[rows['start_time'] <= end]
+    if len(rows) <= budget:
+        return rows
+    x = (rows['start_time'] - rows['start_time'].iloc[0]).dt.total_seconds().to_numpy()
+    return rows.iloc[lttb(x, rows[value].to_numpy(), budget)]
+
+
+def trends_from_store(store_dir, envs=None):
+    """Run-level series of the selected environments, from the run index"""
+    runs = load_runs(store_dir) if envs is None else select_runs(store_dir, envs)
+    return run_series(runs)
+
+
+def module_trends_from_store(store_dir, env):
+    """Module summary of every run of an environment (TREND_COLUMNS)"""
+    trends = load_module_trends(store_dir, env)
+    return trends if trends is not None else pd.DataFrame(columns=TREND_COLUMNS)